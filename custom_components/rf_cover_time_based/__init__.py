@@ -5,11 +5,41 @@ from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.typing import ConfigType
+
+from .const import DOMAIN
+from .runtime import async_get_runtime_data
+from .services import async_register_services
+from .websocket_api import async_register_websocket_commands
 
 # Define the platforms that this integration will create.
 PLATFORMS: list[Platform] = [Platform.COVER]
 
+# The integration is only configured through config entries.
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the pieces shared by all config entries."""
+    runtime_data = async_get_runtime_data(hass)
+    await runtime_data.learning.async_load()
+    if hass.state is not CoreState.running:
+        # Restore all covers from a single read of the saved states.
+        runtime_data.async_load_restored_positions()
+
+        @callback
+        def _async_started(hass: HomeAssistant) -> None:
+            runtime_data.restored_positions = None
+
+        async_at_started(hass, _async_started)
+    async_register_websocket_commands(hass)
+    async_register_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up from a config entry."""
     # This is the central point to forward the setup to the platforms.
@@ -26,6 +56,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget what was learned about a removed config entry."""
+    async_get_runtime_data(hass).learning.async_remove(entry.entry_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle an options update by reloading the entry."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,178 @@
+"""Ways of handing the commands of a gateway over to the transmitter."""
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.remote import (
+    ATTR_COMMAND,
+    ATTR_DELAY_SECS,
+    ATTR_NUM_REPEATS,
+    DEFAULT_DELAY_SECS,
+    DEFAULT_HOLD_SECS,
+    SERVICE_SEND_COMMAND,
+)
+from homeassistant.components.remote import DOMAIN as REMOTE_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import TRANSMIT_ENTITY, TRANSMIT_MQTT, TRANSMIT_SERVICE
+
+if TYPE_CHECKING:
+    from homeassistant.components.remote import RemoteEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TransmitBackend(abc.ABC):
+    """
+    Transmits the commands of one gateway.
+
+    A command is sent once, plus some extra repetitions, and the call only
+    returns once the transmitter is done with it, so the gateway queue does
+    not send the next command on top of it.
+    """
+
+    name: str
+    topic: str | None = None
+
+    def __init__(self, hass: HomeAssistant, entity_id: str) -> None:
+        """Initialize the backend of a remote entity."""
+        self.hass = hass
+        self.entity_id = entity_id
+
+    @abc.abstractmethod
+    async def async_send(self, command: str, repeats: int, delay: float) -> None:
+        """Transmit a command, repeated some extra times, delay seconds apart."""
+
+
+class ServiceCallBackend(TransmitBackend):
+    """Calls remote.send_command, the way any automation would."""
+
+    name = TRANSMIT_SERVICE
+
+    async def async_send(self, command: str, repeats: int, delay: float) -> None:
+        """Transmit a command through the service of the remote integration."""
+        data = {ATTR_ENTITY_ID: self.entity_id, ATTR_COMMAND: [command]}
+        if repeats:
+            data[ATTR_NUM_REPEATS] = repeats + 1
+            data[ATTR_DELAY_SECS] = delay
+        await self.hass.services.async_call(
+            REMOTE_DOMAIN, SERVICE_SEND_COMMAND, data, blocking=True
+        )
+
+
+class EntityBackend(TransmitBackend):
+    """
+    Calls the remote entity directly.
+
+    This skips the service registry, the schema validation and the
+    call_service event fired for every command. The entity is looked up
+    once, and again only after it has been removed, e.g. when its
+    integration reloads.
+    """
+
+    name = TRANSMIT_ENTITY
+
+    def __init__(self, hass: HomeAssistant, entity_id: str) -> None:
+        """Initialize the backend."""
+        super().__init__(hass, entity_id)
+        self._entity: RemoteEntity | None = None
+
+    @callback
+    def _async_resolve(self) -> RemoteEntity:
+        """Return the remote entity, looking it up on first use."""
+        if self._entity is None:
+            component = self.hass.data.get(REMOTE_DOMAIN)
+            if component is None or (
+                entity := component.get_entity(self.entity_id)
+            ) is None:
+                raise HomeAssistantError(f"{self.entity_id} is not a remote entity")
+            self._entity = entity
+            entity.async_on_remove(self._async_forget)
+        return self._entity
+
+    @callback
+    def _async_forget(self) -> None:
+        """Drop the entity once it is removed."""
+        self._entity = None
+
+    async def async_send(self, command: str, repeats: int, delay: float) -> None:
+        """Transmit a command through the remote entity."""
+        entity = self._async_resolve()
+        # Like the service, which skips unavailable entities.
+        if not entity.available:
+            _LOGGER.debug("Not sending '%s', %s is unavailable", command, entity)
+            return
+        # With every argument, as the service schema would fill them in.
+        await entity.async_send_command(
+            [command],
+            num_repeats=repeats + 1,
+            delay_secs=delay if repeats else DEFAULT_DELAY_SECS,
+            hold_secs=DEFAULT_HOLD_SECS,
+        )
+
+
+class MqttBackend(TransmitBackend):
+    """
+    Publishes the commands to an MQTT topic, e.g. for ESPHome or
+    OpenMQTTGateway transmitters.
+
+    A command holding a JSON object, such as an OpenMQTTGateway payload, is
+    published once, with its "repeat" count set when it is repeated. Any
+    other command is published as is, once per repetition.
+    """
+
+    name = TRANSMIT_MQTT
+
+    def __init__(self, hass: HomeAssistant, entity_id: str, topic: str) -> None:
+        """Initialize the backend publishing to a topic."""
+        super().__init__(hass, entity_id)
+        self.topic = topic
+
+    async def async_send(self, command: str, repeats: int, delay: float) -> None:
+        """Publish a command to the topic of the transmitter."""
+        # Imported on first use, only by the installations publishing to MQTT.
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components import mqtt
+
+        if (payload := _json_object(command)) is not None:
+            if repeats:
+                payload["repeat"] = repeats + 1
+            await mqtt.async_publish(self.hass, self.topic, json.dumps(payload))
+            return
+        for repeat in range(repeats + 1):
+            if repeat:
+                await asyncio.sleep(delay)
+            await mqtt.async_publish(self.hass, self.topic, command)
+
+
+def _json_object(command: str) -> dict[str, Any] | None:
+    """Return the JSON object a command holds, or None for a plain code."""
+    if not command.startswith("{"):
+        return None
+    try:
+        payload = json.loads(command)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+@callback
+def async_create_backend(
+    hass: HomeAssistant, name: str, entity_id: str, topic: str | None = None
+) -> TransmitBackend:
+    """Create the backend of a gateway from its configuration."""
+    if name == TRANSMIT_ENTITY:
+        return EntityBackend(hass, entity_id)
+    if name == TRANSMIT_MQTT:
+        if topic:
+            return MqttBackend(hass, entity_id, topic)
+        _LOGGER.warning(
+            "No MQTT topic set for %s, calling its service instead", entity_id
+        )
+    return ServiceCallBackend(hass, entity_id)
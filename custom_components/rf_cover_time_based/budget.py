@@ -0,0 +1,94 @@
+"""An integration-wide budget for the position updates of moving covers."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+if TYPE_CHECKING:
+    from .time_based_cover import TimeBasedCover
+
+# How often a moving cover publishes its position, when the budget allows.
+UPDATE_INTERVAL = timedelta(seconds=0.1)
+
+
+class WriteBudget:
+    """
+    Shares a number of state writes per second among all moving covers.
+
+    A single timer ticks for all the moving covers. On each tick, the covers
+    that published least recently go first, one write each, for as long as
+    the budget lasts, so the rate of each cover shrinks as more of them move
+    while the total stays flat. The writes at the start, stop, arrival and
+    reversal of a movement are made by the covers themselves, and never held
+    back. Without a budget, every moving cover publishes on every tick.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the budget, unlimited until some cover sets one."""
+        self.hass = hass
+        self._covers: OrderedDict[str, TimeBasedCover] = OrderedDict()
+        # The writes per second set by each config entry, 0 for none.
+        self._limits: dict[str, float] = {}
+        self._allowance = 0.0
+        self._unsub_tick: CALLBACK_TYPE | None = None
+
+    @property
+    def rate(self) -> float:
+        """Return the writes per second allowed, 0 for no limit."""
+        # Every cover publishing within the strictest budget set keeps it.
+        return min((limit for limit in self._limits.values() if limit), default=0)
+
+    @callback
+    def async_set_limit(self, entry_id: str, rate: float) -> CALLBACK_TYPE:
+        """Set the budget asked for by a config entry, until the callback."""
+        self._limits[entry_id] = rate
+
+        @callback
+        def _remove_limit() -> None:
+            self._limits.pop(entry_id, None)
+
+        return _remove_limit
+
+    @callback
+    def async_add(self, cover: TimeBasedCover) -> CALLBACK_TYPE:
+        """Publish the position of a moving cover, until the callback."""
+        self._covers[cover.entity_id] = cover
+        if self._unsub_tick is None:
+            self._allowance = 0.0
+            self._unsub_tick = async_track_time_interval(
+                self.hass, self._async_tick, UPDATE_INTERVAL
+            )
+
+        @callback
+        def _remove() -> None:
+            if self._covers.get(cover.entity_id) is cover:
+                del self._covers[cover.entity_id]
+            if not self._covers and self._unsub_tick is not None:
+                self._unsub_tick()
+                self._unsub_tick = None
+
+        return _remove
+
+    @callback
+    def _async_tick(self, *args: Any) -> None:
+        """Let the covers that waited longest publish, within the budget."""
+        if not (rate := self.rate):
+            for cover in list(self._covers.values()):
+                cover.async_update_position()
+            return
+
+        # Unused writes carry over, up to a tick's worth, so a low budget
+        # still gets through and a quiet spell does not end in a burst.
+        per_tick = rate * UPDATE_INTERVAL.total_seconds()
+        self._allowance = min(self._allowance + per_tick, max(per_tick, 1.0))
+        for entity_id, cover in list(self._covers.items()):
+            if self._allowance < 1:
+                break
+            self._allowance -= 1
+            if entity_id in self._covers:
+                self._covers.move_to_end(entity_id)
+            cover.async_update_position()
@@ -0,0 +1,439 @@
+"""
+Offline travel-time calibration for RF Cover Time Based.
+
+Reads the Home Assistant recorder database (SQLite) and pairs the commands
+sent to each cover with the transitions of its end-stop or contact sensors,
+to suggest per-direction travelling times, the latency between a command and
+the motor starting, and their confidence intervals. The covers are analyzed
+in parallel across a process pool.
+
+The commands are read from the command_sent events the gateways fire for
+every transmit backend while the record_commands service records them, and
+from the remote.send_command calls, which only the service backend makes.
+A call following an event of the same command is the same transmission.
+
+Usage:
+    python -m custom_components.rf_cover_time_based.calibrate /config \
+        sensors.json [--database PATH] [--workers N] [--output FILE]
+
+The covers, with their remote, commands and current travelling times, are
+read from the configuration directory. The sensors file maps the covers to
+their end-stop sensors:
+
+    {"cover.living_room": {"closed_sensor": "binary_sensor.lr_closed",
+                           "closed_state": "on",
+                           "open_sensor": "binary_sensor.lr_open"}}
+
+Either sensor may be omitted; the states default to "on". The output file
+holds the suggested travelling times as data for the apply_calibration
+service. Only the recorder schema of Home Assistant 2023.4 and later is
+supported.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import math
+import sqlite3
+import statistics
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+from .const import (
+    ATTR_COMMAND,
+    CONF_CLOSE_COMMAND,
+    CONF_DEVICE_CLASS,
+    CONF_OPEN_COMMAND,
+    CONF_REMOTE_ENTITY,
+    CONF_STOP_COMMAND,
+    CONF_TRAVELLING_TIME_DOWN,
+    CONF_TRAVELLING_TIME_UP,
+    DOMAIN,
+    EVENT_COMMAND_SENT,
+)
+
+OPENING = "opening"
+CLOSING = "closing"
+STOP = "stop"
+
+# A cover is assumed to have reached the end stop, without a sensor to tell,
+# once its last movement ran this much longer than the configured time.
+END_STOP_MARGIN = 1.2
+
+DEFAULT_MIN_SAMPLES = 3
+
+# Seconds within which a service call and a command_sent event of the same
+# command are taken for one transmission.
+DUPLICATE_WINDOW = 1.0
+
+# Two-sided 95% quantiles of Student's t distribution, by degrees of freedom.
+_T_QUANTILES = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)  # fmt: skip
+
+_STATES_QUERY = """
+    SELECT states.state, states.last_updated_ts
+    FROM states JOIN states_meta USING (metadata_id)
+    WHERE states_meta.entity_id = ?
+    ORDER BY states.last_updated_ts
+"""
+
+_COMMAND_EVENTS_QUERY = """
+    SELECT events.time_fired_ts, event_types.event_type, event_data.shared_data
+    FROM events
+    JOIN event_types USING (event_type_id)
+    JOIN event_data USING (data_id)
+    WHERE event_types.event_type IN ('call_service', ?)
+    AND event_data.shared_data LIKE ?
+    ORDER BY events.time_fired_ts
+"""
+
+
+@dataclass
+class CoverDefinition:
+    """A cover to calibrate, with its commands and end-stop sensors."""
+
+    entity_id: str
+    remote_entity: str
+    commands: dict[str, str]
+    travel_times: dict[str, float]
+    closed_sensor: str | None = None
+    closed_state: str = "on"
+    open_sensor: str | None = None
+    open_state: str = "on"
+
+
+@dataclass
+class Estimate:
+    """The mean of a set of samples, with its 95% confidence interval."""
+
+    samples: int
+    mean: float
+    stdev: float
+    ci95: float
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float]) -> Estimate | None:
+        """Estimate the mean of the samples, None if there are none."""
+        if not samples:
+            return None
+        if len(samples) == 1:
+            return cls(1, samples[0], 0.0, math.inf)
+        stdev = statistics.stdev(samples)
+        degrees = len(samples) - 1
+        quantile = (
+            _T_QUANTILES[degrees - 1] if degrees <= len(_T_QUANTILES) else 1.96
+        )
+        return cls(
+            len(samples),
+            statistics.fmean(samples),
+            stdev,
+            quantile * stdev / math.sqrt(len(samples)),
+        )
+
+
+@dataclass
+class CoverCalibration:
+    """The calibration found for one cover."""
+
+    entity_id: str
+    travel_times: dict[str, Estimate] = field(default_factory=dict)
+    latency: Estimate | None = None
+
+
+def _load_states(
+    connection: sqlite3.Connection, entity_id: str | None
+) -> list[tuple[float, str]]:
+    """Return the state changes of an entity, as (time, state)."""
+    if entity_id is None:
+        return []
+    changes: list[tuple[float, str]] = []
+    for state, updated in connection.execute(_STATES_QUERY, (entity_id,)):
+        if not changes or changes[-1][1] != state:
+            changes.append((updated, state))
+    return changes
+
+
+def _service_call_codes(data: dict[str, Any], remote_entity: str) -> list[str]:
+    """Return the codes of a remote.send_command call through a remote."""
+    if data.get("domain") != "remote" or data.get("service") != "send_command":
+        return []
+    service_data = data.get("service_data", {})
+    targets = service_data.get("entity_id", [])
+    if isinstance(targets, str):
+        targets = [targets]
+    if remote_entity not in targets:
+        return []
+    codes = service_data.get("command", [])
+    return [codes] if isinstance(codes, str) else codes
+
+
+def _load_commands(
+    connection: sqlite3.Connection, cover: CoverDefinition
+) -> list[tuple[float, str]]:
+    """
+    Return the commands sent to a cover, as (time, action).
+
+    The service calls made along with a command_sent event are left out, as
+    the event already holds them.
+    """
+    sent: list[tuple[float, str]] = []
+    called: list[tuple[float, str]] = []
+    pattern = f"%{cover.remote_entity}%"
+    for fired, event_type, shared_data in connection.execute(
+        _COMMAND_EVENTS_QUERY, (EVENT_COMMAND_SENT, pattern)
+    ):
+        data = json.loads(shared_data)
+        if event_type == EVENT_COMMAND_SENT:
+            if data.get("entity_id") == cover.remote_entity:
+                sent.append((fired, data.get(ATTR_COMMAND)))
+        else:
+            called.extend(
+                (fired, code) for code in _service_call_codes(data, cover.remote_entity)
+            )
+    sent_times: dict[str, list[float]] = {}
+    for fired, code in sent:
+        sent_times.setdefault(code, []).append(fired)
+    called = [
+        (fired, code)
+        for fired, code in called
+        if not _near(sent_times.get(code, []), fired, DUPLICATE_WINDOW)
+    ]
+    return sorted(
+        (fired, action)
+        for fired, code in called + sent
+        if (action := cover.commands.get(code)) is not None
+    )
+
+
+def _near(times: Sequence[float], moment: float, window: float) -> bool:
+    """Return if any of the sorted times is within window seconds of a moment."""
+    index = bisect.bisect_left(times, moment - window)
+    return index < len(times) and times[index] <= moment + window
+
+
+def _first_transition(
+    changes: Sequence[tuple[float, str]],
+    start: float,
+    end: float,
+    state: str,
+    entering: bool,
+) -> float | None:
+    """Return when a sensor first enters (or leaves) a state in a window."""
+    first = bisect.bisect_right(changes, start, key=itemgetter(0))
+    for changed, new_state in islice(changes, first, None):
+        if changed >= end:
+            return None
+        if (new_state == state) == entering:
+            return changed
+    return None
+
+
+def _state_at(changes: Sequence[tuple[float, str]], moment: float) -> str | None:
+    """Return the state of a sensor at a moment."""
+    index = bisect.bisect_right(changes, moment, key=itemgetter(0))
+    return changes[index - 1][1] if index else None
+
+
+def analyze_cover(database: str, cover: CoverDefinition) -> CoverCalibration:
+    """
+    Calibrate one cover from the recorder database.
+
+    Every open or close command that starts from the opposite end stop and
+    runs into the target end stop, without another command in between, gives
+    a travelling time sample: from the command to the sensor entering its end
+    state. Leaving the starting end stop gives a latency sample.
+    """
+    connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    try:
+        commands = _load_commands(connection, cover)
+        end_stops = {
+            OPENING: (_load_states(connection, cover.open_sensor), cover.open_state),
+            CLOSING: (
+                _load_states(connection, cover.closed_sensor),
+                cover.closed_state,
+            ),
+        }
+    finally:
+        connection.close()
+
+    samples: dict[str, list[float]] = {OPENING: [], CLOSING: []}
+    latencies: list[float] = []
+    for index, (sent, action) in enumerate(commands):
+        if action == STOP:
+            continue
+        until = commands[index + 1][0] if index + 1 < len(commands) else math.inf
+        opposite = CLOSING if action == OPENING else OPENING
+        arrival_changes, arrival_state = end_stops[action]
+        start_changes, start_state = end_stops[opposite]
+
+        if start_changes:
+            at_start = _state_at(start_changes, sent) == start_state
+            if at_start and (
+                left := _first_transition(
+                    start_changes, sent, until, start_state, entering=False
+                )
+            ):
+                latencies.append(left - sent)
+        else:
+            # Without a sensor, trust a long enough uninterrupted movement
+            # in the opposite direction.
+            previous = commands[index - 1] if index else None
+            at_start = (
+                previous is not None
+                and previous[1] == opposite
+                and sent - previous[0]
+                >= cover.travel_times[opposite] * END_STOP_MARGIN
+            )
+
+        if at_start and arrival_changes and (
+            arrived := _first_transition(
+                arrival_changes, sent, until, arrival_state, entering=True
+            )
+        ):
+            samples[action].append(arrived - sent)
+
+    calibration = CoverCalibration(cover.entity_id)
+    for direction, durations in samples.items():
+        if estimate := Estimate.from_samples(durations):
+            calibration.travel_times[direction] = estimate
+    calibration.latency = Estimate.from_samples(latencies)
+    return calibration
+
+
+def load_covers(
+    config_dir: Path, sensors: dict[str, dict[str, Any]]
+) -> list[CoverDefinition]:
+    """Load the covers of the integration from the configuration directory."""
+    storage = config_dir / ".storage"
+    entries = json.loads((storage / "core.config_entries").read_text("utf-8"))
+    registry = json.loads((storage / "core.entity_registry").read_text("utf-8"))
+    entity_ids = {
+        entity["config_entry_id"]: entity["entity_id"]
+        for entity in registry["data"]["entities"]
+        if entity["platform"] == DOMAIN and entity["entity_id"].startswith("cover.")
+    }
+
+    covers = []
+    for entry in entries["data"]["entries"]:
+        if entry["domain"] != DOMAIN:
+            continue
+        entity_id = entity_ids.get(entry["entry_id"])
+        if entity_id is None or entity_id not in sensors:
+            continue
+        config = {**entry["data"], **entry["options"]}
+        is_awning = config.get(CONF_DEVICE_CLASS) == "awning"
+        covers.append(
+            CoverDefinition(
+                entity_id=entity_id,
+                remote_entity=config[CONF_REMOTE_ENTITY],
+                commands={
+                    config[CONF_OPEN_COMMAND]: CLOSING if is_awning else OPENING,
+                    config[CONF_CLOSE_COMMAND]: OPENING if is_awning else CLOSING,
+                    config[CONF_STOP_COMMAND]: STOP,
+                },
+                travel_times={
+                    OPENING: config[CONF_TRAVELLING_TIME_UP],
+                    CLOSING: config[CONF_TRAVELLING_TIME_DOWN],
+                },
+                **sensors[entity_id],
+            )
+        )
+    return covers
+
+
+def calibrate(
+    database: str, covers: Sequence[CoverDefinition], workers: int | None = None
+) -> list[CoverCalibration]:
+    """Calibrate the covers, in parallel unless a single worker is asked for."""
+    analyze = partial(analyze_cover, database)
+    if workers == 1:
+        return [analyze(cover) for cover in covers]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze, covers))
+
+
+def suggestions(
+    calibrations: Sequence[CoverCalibration], min_samples: int = DEFAULT_MIN_SAMPLES
+) -> list[dict[str, Any]]:
+    """Return the travelling times to apply, as apply_calibration data."""
+    keys = {OPENING: CONF_TRAVELLING_TIME_UP, CLOSING: CONF_TRAVELLING_TIME_DOWN}
+    result = []
+    for calibration in calibrations:
+        suggestion = {
+            keys[direction]: round(estimate.mean, 1)
+            for direction, estimate in calibration.travel_times.items()
+            if estimate.samples >= min_samples
+        }
+        if suggestion:
+            result.append({"entity_id": calibration.entity_id, **suggestion})
+    return result
+
+
+def _format_estimate(estimate: Estimate | None) -> str:
+    """Format an estimate for the terminal."""
+    if estimate is None:
+        return "n/a"
+    return f"{estimate.mean:.2f} s ±{estimate.ci95:.2f} (n={estimate.samples})"
+
+
+def format_report(calibrations: Sequence[CoverCalibration]) -> str:
+    """Format the calibrations for the terminal."""
+    return "\n".join(
+        f"{calibration.entity_id}:"
+        f" down {_format_estimate(calibration.travel_times.get(CLOSING))},"
+        f" up {_format_estimate(calibration.travel_times.get(OPENING))},"
+        f" latency {_format_estimate(calibration.latency)}"
+        for calibration in calibrations
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the calibration from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Suggest travelling times from the recorder history."
+    )
+    parser.add_argument("config_dir", type=Path, help="Home Assistant config dir")
+    parser.add_argument("sensors", type=Path, help="JSON file of end-stop sensors")
+    parser.add_argument(
+        "--database",
+        help="recorder database (default: home-assistant_v2.db in config_dir)",
+    )
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=DEFAULT_MIN_SAMPLES,
+        help="samples needed before a travelling time is suggested",
+    )
+    parser.add_argument("--output", type=Path, help="write apply_calibration data")
+    args = parser.parse_args(argv)
+
+    database = args.database or str(args.config_dir / "home-assistant_v2.db")
+    covers = load_covers(args.config_dir, json.loads(args.sensors.read_text("utf-8")))
+    calibrations = calibrate(database, covers, args.workers)
+    print(format_report(calibrations))
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {"suggestions": suggestions(calibrations, args.min_samples)},
+                indent=2,
+            ),
+            "utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
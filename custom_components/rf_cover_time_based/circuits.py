@@ -0,0 +1,118 @@
+"""Staggering of the motor starts of covers sharing an electrical circuit."""
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from collections import defaultdict, deque
+from itertools import accumulate
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+# Seconds left between a motor stopping and another starting in its place,
+# for the inrush current to settle and the predicted stops to be late.
+START_GAP = 0.5
+
+
+class CircuitScheduler:
+    """
+    Caps the number of motors running at once on each electrical circuit.
+
+    The movements of the covers of a circuit are known in advance, from
+    their plans, so each one reserves its run as a time interval. A start
+    that would run more motors than the circuit allows is pushed back to the
+    earliest time at which it stays within the limit for its whole run,
+    which keeps as many motors running as the limit allows. The limit of a
+    circuit is the strictest set by its covers, none when no cover sets one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler, without any circuit."""
+        # The motors allowed by each config entry, by circuit, 0 for no limit.
+        self._limits: defaultdict[str, dict[str, int]] = defaultdict(dict)
+        # The start and end of the run of each cover, by circuit, on the
+        # time.monotonic() clock.
+        self._runs: defaultdict[str, dict[str, tuple[float, float]]] = defaultdict(
+            dict
+        )
+
+    def limit(self, circuit: str) -> int:
+        """Return the motors allowed to run at once on a circuit, 0 for any."""
+        return min(
+            (limit for limit in self._limits[circuit].values() if limit), default=0
+        )
+
+    @callback
+    def async_set_limit(
+        self, circuit: str, entry_id: str, limit: int
+    ) -> CALLBACK_TYPE:
+        """Set the limit asked for by a config entry, until the callback."""
+        self._limits[circuit][entry_id] = limit
+
+        @callback
+        def _remove_limit() -> None:
+            self._limits[circuit].pop(entry_id, None)
+
+        return _remove_limit
+
+    def next_start(
+        self, circuit: str, entity_id: str, now: float, duration: float
+    ) -> float:
+        """
+        Return the earliest time a cover can run its motor for a while.
+
+        A run of the cover itself, superseded by the new one, is left out.
+        """
+        if not (limit := self.limit(circuit)):
+            return now
+        runs = self._runs[circuit]
+        for other in [other for other, (_, end) in runs.items() if end <= now]:
+            del runs[other]
+        intervals = [
+            (start, end + START_GAP)
+            for other, (start, end) in runs.items()
+            if other != entity_id
+        ]
+        if len(intervals) < limit:
+            return now
+
+        # The motors running change at the starts and ends of the runs: from
+        # times[i] on, counts[i] of them run, none before the first run.
+        changes: defaultdict[float, int] = defaultdict(int)
+        for start, end in intervals:
+            changes[start] += 1
+            changes[end] -= 1
+        times = [-math.inf, *sorted(changes)]
+        counts = [0, *accumulate(changes[at] for at in times[1:])]
+
+        # A slot can only open when some run ends. The runs overlapping each
+        # candidate run are swept once, the window holding the steps it
+        # spans with their decreasing maxima.
+        candidates = sorted({now, *(end for _, end in intervals if end > now)})
+        window: deque[int] = deque()
+        added = 0
+        for start in candidates:
+            first = bisect_right(times, start) - 1
+            while added < len(times) and (
+                added <= first or times[added] < start + duration
+            ):
+                while window and counts[window[-1]] <= counts[added]:
+                    window.pop()
+                window.append(added)
+                added += 1
+            while window[0] < first:
+                window.popleft()
+            if counts[window[0]] < limit:
+                return start
+        return candidates[-1]
+
+    @callback
+    def async_reserve(
+        self, circuit: str, entity_id: str, start: float, end: float
+    ) -> None:
+        """Reserve the run of a cover, replacing any earlier one."""
+        self._runs[circuit][entity_id] = (start, end)
+
+    @callback
+    def async_release(self, circuit: str, entity_id: str) -> None:
+        """Free the slot of a cover whose motor stopped."""
+        self._runs[circuit].pop(entity_id, None)
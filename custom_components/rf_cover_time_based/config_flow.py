@@ -8,34 +8,68 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.components.cover import CoverDeviceClass
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.selector import (
-    EntitySelector,
-    EntitySelectorConfig,
-    SelectSelector,
-    SelectSelectorConfig,
-    SelectSelectorMode,
-)
 
 from .const import (
+    CONF_CIRCUIT,
+    CONF_CIRCUIT_LIMIT,
     CONF_CLOSE_COMMAND,
+    CONF_CLOSED_SENSOR,
     CONF_DEVICE_CLASS,
+    CONF_INTERMEDIATE_UPDATES,
+    CONF_MQTT_TOPIC,
     CONF_NAME,
     CONF_OPEN_COMMAND,
+    CONF_OPEN_SENSOR,
+    CONF_RECEIVER_ENTITY,
     CONF_REMOTE_ENTITY,
+    CONF_REPEAT_DELAY,
+    CONF_REPEATS,
+    CONF_RESYNC_THRESHOLD,
+    CONF_RESYNC_WINDOW_END,
+    CONF_RESYNC_WINDOW_START,
     CONF_STOP_COMMAND,
+    CONF_TILT_TIME,
+    CONF_TRACK_REMOTE_PRESSES,
+    CONF_TRANSMIT_BACKEND,
     CONF_TRAVELLING_TIME_DOWN,
     CONF_TRAVELLING_TIME_UP,
+    CONF_WRITE_BUDGET,
+    DEFAULT_CIRCUIT_LIMIT,
+    DEFAULT_INTERMEDIATE_UPDATES,
+    DEFAULT_REPEAT_DELAY,
+    DEFAULT_REPEATS,
+    DEFAULT_RESYNC_THRESHOLD,
+    DEFAULT_RESYNC_WINDOW_END,
+    DEFAULT_RESYNC_WINDOW_START,
+    DEFAULT_TILT_TIME,
+    DEFAULT_TRACK_REMOTE_PRESSES,
+    DEFAULT_TRANSMIT_BACKEND,
+    DEFAULT_WRITE_BUDGET,
     DOMAIN,
+    TRANSMIT_BACKENDS,
+    TRANSMIT_MQTT,
 )
+from .delivery import MAX_REPEATS
 
 _LOGGER = logging.getLogger(__name__)
 
 
 def _build_options_schema(options: dict[str, Any]) -> vol.Schema:
     """Build the schema for the options form, pre-populating with existing values."""
+    # Imported when a flow runs rather than when Home Assistant starts.
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.cover import CoverDeviceClass
+    from homeassistant.helpers.selector import (
+        EntitySelector,
+        EntitySelectorConfig,
+        SelectSelector,
+        SelectSelectorConfig,
+        SelectSelectorMode,
+        TimeSelector,
+    )
+
     return vol.Schema(
         {
             vol.Required(
@@ -55,11 +89,15 @@ def _build_options_schema(options: dict[str, Any]) -> vol.Schema:
             vol.Required(
                 CONF_TRAVELLING_TIME_DOWN,
                 default=options.get(CONF_TRAVELLING_TIME_DOWN, 10),
-            ): int,
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
             vol.Required(
                 CONF_TRAVELLING_TIME_UP,
                 default=options.get(CONF_TRAVELLING_TIME_UP, 10),
-            ): int,
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_TILT_TIME,
+                default=options.get(CONF_TILT_TIME, DEFAULT_TILT_TIME),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
             vol.Required(
                 CONF_DEVICE_CLASS,
                 default=options.get(CONF_DEVICE_CLASS, "shutter"),
@@ -69,10 +107,88 @@ def _build_options_schema(options: dict[str, Any]) -> vol.Schema:
                     mode=SelectSelectorMode.DROPDOWN,
                 )
             ),
+            vol.Optional(
+                CONF_INTERMEDIATE_UPDATES,
+                default=options.get(
+                    CONF_INTERMEDIATE_UPDATES, DEFAULT_INTERMEDIATE_UPDATES
+                ),
+            ): bool,
+            vol.Optional(
+                CONF_WRITE_BUDGET,
+                default=options.get(CONF_WRITE_BUDGET, DEFAULT_WRITE_BUDGET),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_CIRCUIT,
+                description={"suggested_value": options.get(CONF_CIRCUIT)},
+            ): str,
+            vol.Optional(
+                CONF_CIRCUIT_LIMIT,
+                default=options.get(CONF_CIRCUIT_LIMIT, DEFAULT_CIRCUIT_LIMIT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            vol.Optional(
+                CONF_RESYNC_THRESHOLD,
+                default=options.get(CONF_RESYNC_THRESHOLD, DEFAULT_RESYNC_THRESHOLD),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            vol.Optional(
+                CONF_RESYNC_WINDOW_START,
+                default=options.get(
+                    CONF_RESYNC_WINDOW_START, DEFAULT_RESYNC_WINDOW_START
+                ),
+            ): TimeSelector(),
+            vol.Optional(
+                CONF_RESYNC_WINDOW_END,
+                default=options.get(CONF_RESYNC_WINDOW_END, DEFAULT_RESYNC_WINDOW_END),
+            ): TimeSelector(),
+            vol.Optional(
+                CONF_TRACK_REMOTE_PRESSES,
+                default=options.get(
+                    CONF_TRACK_REMOTE_PRESSES, DEFAULT_TRACK_REMOTE_PRESSES
+                ),
+            ): bool,
+            vol.Optional(
+                CONF_RECEIVER_ENTITY,
+                description={"suggested_value": options.get(CONF_RECEIVER_ENTITY)},
+            ): EntitySelector(EntitySelectorConfig(domain="sensor")),
+            vol.Optional(
+                CONF_CLOSED_SENSOR,
+                description={"suggested_value": options.get(CONF_CLOSED_SENSOR)},
+            ): EntitySelector(EntitySelectorConfig(domain="binary_sensor")),
+            vol.Optional(
+                CONF_OPEN_SENSOR,
+                description={"suggested_value": options.get(CONF_OPEN_SENSOR)},
+            ): EntitySelector(EntitySelectorConfig(domain="binary_sensor")),
+            vol.Optional(
+                CONF_REPEATS, default=options.get(CONF_REPEATS, DEFAULT_REPEATS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_REPEATS)),
+            vol.Optional(
+                CONF_REPEAT_DELAY,
+                default=options.get(CONF_REPEAT_DELAY, DEFAULT_REPEAT_DELAY),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+            vol.Optional(
+                CONF_TRANSMIT_BACKEND,
+                default=options.get(CONF_TRANSMIT_BACKEND, DEFAULT_TRANSMIT_BACKEND),
+            ): SelectSelector(
+                SelectSelectorConfig(
+                    options=TRANSMIT_BACKENDS, mode=SelectSelectorMode.DROPDOWN
+                )
+            ),
+            vol.Optional(
+                CONF_MQTT_TOPIC,
+                description={"suggested_value": options.get(CONF_MQTT_TOPIC)},
+            ): str,
         }
     )
 
 
+def _validate_options(user_input: dict[str, Any]) -> dict[str, str]:
+    """Return the errors of the submitted options, keyed by field."""
+    if user_input.get(CONF_TRANSMIT_BACKEND) == TRANSMIT_MQTT and not user_input.get(
+        CONF_MQTT_TOPIC
+    ):
+        return {CONF_MQTT_TOPIC: "mqtt_topic_required"}
+    return {}
+
+
 class RfCoverTimeBasedConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for RF Cover Time Based."""
 
@@ -82,10 +198,12 @@ class RfCoverTimeBasedConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
-        if not self.hass.states.async_all("remote"):
+        # Counting does not build a list of every remote state.
+        if not self.hass.states.async_entity_ids_count("remote"):
             return self.async_abort(reason="no_remotes_found")
 
-        if user_input is not None:
+        errors: dict[str, str] = {}
+        if user_input is not None and not (errors := _validate_options(user_input)):
             # Set the unique_id based on the name to prevent duplicates.
             await self.async_set_unique_id(user_input[CONF_NAME])
             self._abort_if_unique_id_configured()
@@ -108,7 +226,11 @@ class RfCoverTimeBasedConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _build_options_schema({}).schema
         )
 
-        return self.async_show_form(step_id="user", data_schema=user_schema)
+        if user_input is not None:
+            user_schema = self.add_suggested_values_to_schema(user_schema, user_input)
+        return self.async_show_form(
+            step_id="user", data_schema=user_schema, errors=errors
+        )
 
     @staticmethod
     @callback
@@ -126,11 +248,14 @@ class RfCoverTimeBasedOptionsFlow(config_entries.OptionsFlowWithConfigEntry):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
-        if user_input is not None:
+        errors: dict[str, str] = {}
+        if user_input is not None and not (errors := _validate_options(user_input)):
             # This creates an entry in the `options` dictionary of the ConfigEntry
             return self.async_create_entry(title="", data=user_input)
 
         # Reuse the schema builder, passing the existing options
-        options_schema = _build_options_schema(self.options)
+        options_schema = _build_options_schema({**self.options, **(user_input or {})})
 
-        return self.async_show_form(step_id="init", data_schema=options_schema)
+        return self.async_show_form(
+            step_id="init", data_schema=options_schema, errors=errors
+        )
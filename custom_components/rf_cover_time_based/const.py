@@ -14,7 +14,110 @@ CONF_NAME = "name"
 CONF_REMOTE_ENTITY = "remote_entity"
 CONF_TRAVELLING_TIME_DOWN = "travelling_time_down"
 CONF_TRAVELLING_TIME_UP = "travelling_time_up"
+CONF_TILT_TIME = "tilt_time"
 CONF_OPEN_COMMAND = "open_command"
 CONF_CLOSE_COMMAND = "close_command"
 CONF_STOP_COMMAND = "stop_command"
 CONF_DEVICE_CLASS = "device_class"
+CONF_INTERMEDIATE_UPDATES = "intermediate_updates"
+CONF_RESYNC_THRESHOLD = "resync_threshold"
+CONF_RESYNC_WINDOW_START = "resync_window_start"
+CONF_RESYNC_WINDOW_END = "resync_window_end"
+CONF_TRACK_REMOTE_PRESSES = "track_remote_presses"
+CONF_RECEIVER_ENTITY = "receiver_entity"
+CONF_CLOSED_SENSOR = "closed_sensor"
+CONF_OPEN_SENSOR = "open_sensor"
+CONF_REPEATS = "repeats"
+CONF_REPEAT_DELAY = "repeat_delay"
+CONF_TRANSMIT_BACKEND = "transmit_backend"
+CONF_MQTT_TOPIC = "mqtt_topic"
+CONF_WRITE_BUDGET = "write_budget"
+CONF_CIRCUIT = "circuit"
+CONF_CIRCUIT_LIMIT = "circuit_limit"
+
+# Defaults for optional configuration keys
+# Seconds the slats of a venetian blind take to turn, 0 for covers without.
+DEFAULT_TILT_TIME = 0
+DEFAULT_INTERMEDIATE_UPDATES = True
+DEFAULT_RESYNC_THRESHOLD = 0
+DEFAULT_RESYNC_WINDOW_START = "02:00:00"
+DEFAULT_RESYNC_WINDOW_END = "05:00:00"
+DEFAULT_TRACK_REMOTE_PRESSES = False
+DEFAULT_REPEATS = 0
+# Seconds between the repetitions of a command, as remote.send_command does.
+DEFAULT_REPEAT_DELAY = 0.4
+
+# How the commands reach the transmitter
+TRANSMIT_SERVICE = "service"
+TRANSMIT_ENTITY = "entity"
+TRANSMIT_MQTT = "mqtt"
+TRANSMIT_BACKENDS = [TRANSMIT_SERVICE, TRANSMIT_ENTITY, TRANSMIT_MQTT]
+DEFAULT_TRANSMIT_BACKEND = TRANSMIT_SERVICE
+
+# State writes per second shared by all moving covers, 0 for no limit.
+DEFAULT_WRITE_BUDGET = 0
+
+# Motors allowed to run at once on the circuit of a cover, 0 for no limit.
+DEFAULT_CIRCUIT_LIMIT = 0
+
+# Extra travel time, as a fraction of a full stroke, used when driving into an
+# end stop to resynchronize the position.
+RESYNC_OVERTRAVEL = 0.1
+
+# Motion-plan state attributes published once when a movement starts
+ATTR_TRAVEL_START_POSITION = "travel_start_position"
+ATTR_TRAVEL_TARGET_POSITION = "travel_target_position"
+ATTR_TRAVEL_STARTED_AT = "travel_started_at"
+ATTR_TRAVEL_ARRIVAL_AT = "travel_arrival_at"
+ATTR_TRAVEL_SPEED = "travel_speed"
+ATTR_TRAVEL_PROFILE = "travel_profile"
+ATTR_SEQUENCE_STEP = "sequence_step"
+ATTR_SEQUENCE_STEPS = "sequence_steps"
+ATTR_POSITION_UNCERTAINTY = "position_uncertainty"
+
+# Event carrying an RF code heard by a receiver, in its "code" field
+EVENT_CODE_RECEIVED = f"{DOMAIN}_code_received"
+ATTR_CODE = "code"
+
+# Event fired as each command is handed to the transmitter, whatever the
+# backend, while a recording asked for by the record_commands service runs,
+# with the remote in its "entity_id" field and the command in its "command"
+# field. The recorder keeps them for the offline calibration.
+EVENT_COMMAND_SENT = f"{DOMAIN}_command_sent"
+ATTR_COMMAND = "command"
+
+# Services
+SERVICE_RUN_SEQUENCE = "run_sequence"
+ATTR_STEPS = "steps"
+ATTR_DWELL = "dwell"
+SERVICE_EXPORT_TRACE = "export_trace"
+SERVICE_APPLY_CALIBRATION = "apply_calibration"
+ATTR_SUGGESTIONS = "suggestions"
+SERVICE_EMERGENCY_RETRACT = "emergency_retract"
+ATTR_LOCKOUT = "lockout"
+DEFAULT_LOCKOUT = 300
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
+ATTR_MODE = "mode"
+ATTR_INTERVAL = "interval"
+MODE_DETERMINISTIC = "deterministic"
+MODE_SAMPLING = "sampling"
+DEFAULT_SAMPLE_INTERVAL = 0.001
+SERVICE_SNAPSHOT_SCENE = "snapshot_scene"
+SERVICE_RESTORE_SCENE = "restore_scene"
+ATTR_SCENE_ID = "scene_id"
+ATTR_DEADBAND = "deadband"
+DEFAULT_DEADBAND = 2
+SERVICE_POSITION_HISTORY = "position_history"
+ATTR_START = "start"
+ATTR_END = "end"
+DEFAULT_HISTORY_INTERVAL = 60
+SERVICE_EXPORT_DIAGNOSTICS = "export_diagnostics"
+SERVICE_RECORD_COMMANDS = "record_commands"
+DEFAULT_RECORD_DURATION = 86400
+SERVICE_CORRECT_POSITION = "correct_position"
+SERVICE_START_SHADOW = "start_shadow"
+SERVICE_SHADOW_REPORT = "shadow_report"
+SERVICE_PROMOTE_SHADOW = "promote_shadow"
+ATTR_CANDIDATES = "candidates"
+ATTR_LATENCY = "latency"
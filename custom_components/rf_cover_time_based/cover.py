@@ -1,13 +1,68 @@
 """The cover platform for the RF Cover Time Based integration."""
 from __future__ import annotations
 
+import voluptuous as vol
+
+from homeassistant.components.cover import ATTR_POSITION
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_NAME
+from homeassistant.core import HomeAssistant, SupportsResponse
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import (
+    ATTR_CANDIDATES,
+    ATTR_DWELL,
+    ATTR_END,
+    ATTR_INTERVAL,
+    ATTR_LATENCY,
+    ATTR_START,
+    ATTR_STEPS,
+    CONF_TRAVELLING_TIME_DOWN,
+    CONF_TRAVELLING_TIME_UP,
+    DEFAULT_HISTORY_INTERVAL,
+    SERVICE_CORRECT_POSITION,
+    SERVICE_EXPORT_TRACE,
+    SERVICE_POSITION_HISTORY,
+    SERVICE_PROMOTE_SHADOW,
+    SERVICE_RUN_SEQUENCE,
+    SERVICE_SHADOW_REPORT,
+    SERVICE_START_SHADOW,
+)
+
 # Import the actual entity class from your main implementation file.
 from .time_based_cover import TimeBasedCover
 
+# The finest sampling of the position history, in seconds.
+MIN_HISTORY_INTERVAL = 0.1
+
+SEQUENCE_STEP_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_POSITION): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(ATTR_DWELL, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+SHADOW_CANDIDATE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(CONF_TRAVELLING_TIME_DOWN): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(CONF_TRAVELLING_TIME_UP): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_LATENCY, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=10)
+        ),
+    }
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -23,3 +78,62 @@ async def async_setup_entry(
     # The fix is here: Pass both `hass` and `config_entry` to the constructor,
     # which resolves the TypeError seen in the test logs.
     async_add_entities([TimeBasedCover(hass, config_entry)])
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_RUN_SEQUENCE,
+        {
+            vol.Required(ATTR_STEPS): vol.All(
+                cv.ensure_list, [SEQUENCE_STEP_SCHEMA], vol.Length(min=1)
+            )
+        },
+        "async_run_sequence",
+    )
+    platform.async_register_entity_service(
+        SERVICE_EXPORT_TRACE,
+        {},
+        "async_export_trace",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_POSITION_HISTORY,
+        {
+            vol.Required(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_INTERVAL, default=DEFAULT_HISTORY_INTERVAL): vol.All(
+                vol.Coerce(float), vol.Range(min=MIN_HISTORY_INTERVAL)
+            ),
+        },
+        "async_position_history",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_CORRECT_POSITION,
+        {
+            vol.Required(ATTR_POSITION): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=100)
+            )
+        },
+        "async_correct_position",
+    )
+    platform.async_register_entity_service(
+        SERVICE_START_SHADOW,
+        {
+            vol.Required(ATTR_CANDIDATES): vol.All(
+                cv.ensure_list, [SHADOW_CANDIDATE_SCHEMA], vol.Length(min=1)
+            )
+        },
+        "async_start_shadow",
+    )
+    platform.async_register_entity_service(
+        SERVICE_SHADOW_REPORT,
+        {},
+        "async_shadow_report",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_PROMOTE_SHADOW,
+        {vol.Optional(ATTR_NAME): cv.string},
+        "async_promote_shadow",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
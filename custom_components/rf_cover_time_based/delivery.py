@@ -0,0 +1,71 @@
+"""Adaptive repetition of the commands, driven by delivery feedback."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+# Most repetitions of a command that adaptation may go up to.
+MAX_REPEATS = 5
+
+# Number of recent outcomes the delivery rate is measured over.
+DELIVERY_WINDOW = 20
+
+# After this many deliveries in a row, one repetition less is tried.
+STEP_DOWN_AFTER = 10
+
+# Seconds past the predicted arrival before a move nobody confirmed is
+# counted as a lost command.
+DELIVERY_GRACE = 5.0
+
+
+@dataclass
+class DeliveryTracker:
+    """
+    Tracks whether the commands of one cover land, and adapts repetition.
+
+    A lost command adds a repetition right away. A run of delivered commands
+    takes one away, to probe whether fewer still get through, so the airtime
+    settles at what the environment actually needs.
+    """
+
+    repeats: int
+    confirmed: int = 0
+    lost: int = 0
+    streak: int = 0
+    recent: deque[bool] = field(
+        default_factory=lambda: deque(maxlen=DELIVERY_WINDOW)
+    )
+
+    def record(self, delivered: bool) -> None:
+        """Record whether a command landed, and adapt the repetitions."""
+        self.recent.append(delivered)
+        if not delivered:
+            self.lost += 1
+            self.streak = 0
+            self.repeats = min(self.repeats + 1, MAX_REPEATS)
+            return
+
+        self.confirmed += 1
+        self.streak += 1
+        if self.streak >= STEP_DOWN_AFTER and self.repeats:
+            self.repeats -= 1
+            self.streak = 0
+
+    @property
+    def delivery_rate(self) -> float | None:
+        """Return the share of recent commands that landed, if any was seen."""
+        if not self.recent:
+            return None
+        return sum(self.recent) / len(self.recent)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics, for diagnostics."""
+        rate = self.delivery_rate
+        return {
+            "repeats": self.repeats,
+            "confirmed": self.confirmed,
+            "lost": self.lost,
+            "delivery_rate": None if rate is None else round(rate, 3),
+            "window": len(self.recent),
+        }
@@ -1,7 +1,9 @@
 """Diagnostics support for RF Cover Time Based."""
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Mapping
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, State
@@ -14,8 +16,25 @@ from homeassistant.helpers.entity_registry import (
 from homeassistant.helpers.entity_registry import (
     async_get as async_get_entity_registry,
 )
+from homeassistant.helpers.json import json_dumps
+
+from .const import (
+    CONF_REMOTE_ENTITY,
+    CONF_TILT_TIME,
+    CONF_TRAVELLING_TIME_DOWN,
+    CONF_TRAVELLING_TIME_UP,
+    DEFAULT_TILT_TIME,
+    DOMAIN,
+)
+from .runtime import async_get_runtime_data
+
+if TYPE_CHECKING:
+    from .time_based_cover import TimeBasedCover
+    from .travelcalculator import TravelCalculator
 
-from .const import CONF_REMOTE_ENTITY, DOMAIN
+# The lines of an export are handed over to the file in batches of this
+# many, so the memory used stays the same however many covers there are.
+EXPORT_BATCH = 50
 
 
 def _get_entity_diagnostic_data(entity_state: State | None) -> dict[str, Any]:
@@ -37,20 +56,17 @@ def _get_redacted_config_entry(entry: ConfigEntry) -> dict[str, Any]:
     """
     entry_dict = entry.as_dict()
     if "data" in entry_dict:
-        entry_dict["data"] = {
-            key: value
-            for key, value in entry_dict["data"].items()
-            if "command" not in key
-        }
+        entry_dict["data"] = _redact(entry_dict["data"])
     if "options" in entry_dict:
-        entry_dict["options"] = {
-            key: value
-            for key, value in entry_dict["options"].items()
-            if "command" not in key
-        }
+        entry_dict["options"] = _redact(entry_dict["options"])
     return entry_dict
 
 
+def _redact(config: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a configuration without its "command" keys."""
+    return {key: value for key, value in config.items() if "command" not in key}
+
+
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry
 ) -> dict[str, Any]:
@@ -74,6 +90,24 @@ async def async_get_config_entry_diagnostics(
         hass.states.get(remote_entity_id) if remote_entity_id else None
     )
 
+    cover = next(
+        (
+            cover
+            for cover in async_get_runtime_data(hass).covers.values()
+            if cover.config_entry.entry_id == entry.entry_id
+        ),
+        None,
+    )
+    trace = (
+        cover.trace.as_dict(
+            config[CONF_TRAVELLING_TIME_DOWN],
+            config[CONF_TRAVELLING_TIME_UP],
+            config.get(CONF_TILT_TIME, DEFAULT_TILT_TIME),
+        )
+        if cover
+        else None
+    )
+
     return {
         "config_entry": _get_redacted_config_entry(entry),
         "cover_entity": {
@@ -84,6 +118,8 @@ async def async_get_config_entry_diagnostics(
             "entity_id": remote_entity_id,
             **_get_entity_diagnostic_data(remote_entity_state),
         },
+        "trace": trace,
+        "delivery": cover.delivery.as_dict() if cover else None,
     }
 
 
@@ -99,3 +135,106 @@ def _find_entity_for_device(
             return entity.entity_id
 
     return None
+
+
+def _calculator_state(calculator: TravelCalculator) -> dict[str, Any]:
+    """Return where a calculator places its cover, without updating it."""
+    if calculator.is_opening():
+        status = "opening"
+    elif calculator.is_closing():
+        status = "closing"
+    else:
+        status = "stopped"
+    plan = calculator.travel_plan()
+    return {
+        "position": round(calculator.estimated_position(), 1),
+        "tilt": (
+            round(calculator.estimated_tilt(), 1) if calculator.supports_tilt else None
+        ),
+        "status": status,
+        "target_position": plan.target_position if plan else None,
+        "time_remaining": round(calculator.time_remaining(), 2),
+        "uncertainty": round(calculator.uncertainty, 2),
+    }
+
+
+def _export_line(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    entity_id: str | None,
+    cover: TimeBasedCover | None,
+) -> dict[str, Any]:
+    """Return the diagnostics of one entry, as a line of an export."""
+    config = {**entry.data, **entry.options}
+    remote_entity_id = config.get(CONF_REMOTE_ENTITY)
+    remote_state = hass.states.get(remote_entity_id) if remote_entity_id else None
+    cover_state = hass.states.get(entity_id) if entity_id else None
+    line: dict[str, Any] = {
+        "entry_id": entry.entry_id,
+        "title": entry.title,
+        "config": _redact(config),
+        "entity_id": entity_id,
+        "state": cover_state.state if cover_state else None,
+        "remote": {
+            "entity_id": remote_entity_id,
+            "state": remote_state.state if remote_state else None,
+        },
+        "calculator": None,
+    }
+    if cover is not None:
+        gateway = async_get_runtime_data(hass).gateways.get(remote_entity_id)
+        line |= {
+            "calculator": _calculator_state(cover.travel_calculator),
+            "gateway": gateway.as_dict() if gateway else None,
+            "delivery": cover.delivery.as_dict(),
+            "counters": {
+                "trace": len(cover.trace),
+                "history": len(cover.travel_calculator.history),
+            },
+        }
+    return line
+
+
+async def async_export_diagnostics(hass: HomeAssistant, path: str) -> int:
+    """
+    Stream the diagnostics of every entry to a file, as JSON Lines.
+
+    The entries are walked once, the covers and entities looked up through
+    indexes rather than registry scans, and the lines written in batches
+    from the executor as they are made. Returns the number of lines.
+    """
+    runtime_data = async_get_runtime_data(hass)
+    entity_registry = async_get_entity_registry(hass)
+    covers = {
+        cover.config_entry.entry_id: cover for cover in runtime_data.covers.values()
+    }
+    file = await hass.async_add_executor_job(
+        partial(open, path, "w", encoding="utf-8")
+    )
+    lines = 0
+    batch: list[str] = []
+    try:
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            entity_id = next(
+                (
+                    entity.entity_id
+                    for entity in (
+                        entity_registry.entities.get_entries_for_config_entry_id(
+                            entry.entry_id
+                        )
+                    )
+                    if entity.domain == "cover"
+                ),
+                None,
+            )
+            line = _export_line(hass, entry, entity_id, covers.get(entry.entry_id))
+            batch.append(json_dumps(line) + "\n")
+            lines += 1
+            if len(batch) == EXPORT_BATCH:
+                await hass.async_add_executor_job(file.writelines, batch)
+                batch = []
+        if batch:
+            await hass.async_add_executor_job(file.writelines, batch)
+    finally:
+        await hass.async_add_executor_job(file.close)
+    return lines
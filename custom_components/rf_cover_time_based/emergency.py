@@ -0,0 +1,87 @@
+"""Emergency retraction of many covers at once, e.g. when the wind picks up."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+from .gateway import CommandPriority
+
+if TYPE_CHECKING:
+    from .gateway import RemoteGateway
+    from .time_based_cover import TimeBasedCover
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_emergency_retract(
+    covers: Iterable[TimeBasedCover], lockout: float
+) -> dict[str, Any]:
+    """
+    Retract covers across all gateways, and report how long it took.
+
+    Every cover drops what it was doing and starts retracting, at once
+    unless it has to wait for a free slot on its circuit. Covers sharing a
+    code on the same gateway and starting together, such as a group channel,
+    get a single transmission, with the most repetitions any of them uses.
+    The gateways send in parallel, each ahead of its queued commands, and
+    the covers waiting for their circuit are sent their command once their
+    slot comes.
+    """
+    started = time.monotonic()
+    locked_until = started + lockout
+    transmissions: dict[
+        tuple[RemoteGateway, str, float | None],
+        tuple[int, float, float, dict[str, int]],
+    ] = {}
+    retracted = []
+    delayed = []
+    for cover in covers:
+        move = cover.async_start_emergency_retract(locked_until)
+        retracted.append(cover.entity_id)
+        if move.slot is not None:
+            delayed.append(cover.entity_id)
+        key = (move.gateway, move.command, move.slot)
+        repeats, delay, wait, senders = transmissions.get(key, (0, 0.0, 0.0, {}))
+        transmissions[key] = (
+            max(repeats, move.repeats),
+            max(delay, move.repeat_delay),
+            max(wait, move.delay),
+            {**senders, cover.entity_id: move.intent},
+        )
+
+    for (gateway, command, slot), (repeats, delay, wait, senders) in (
+        transmissions.items()
+    ):
+        if slot is not None:
+            # Dropped if the covers are retracted again before their slot.
+            gateway.async_send_later(
+                wait, command, CommandPriority.EMERGENCY, senders, repeats, delay
+            )
+    await asyncio.gather(
+        *(
+            gateway.async_send_emergency(command, repeats, delay)
+            for (gateway, command, slot), (repeats, delay, _, _) in (
+                transmissions.items()
+            )
+            if slot is None
+        )
+    )
+    latency = time.monotonic() - started
+    _LOGGER.warning(
+        "Emergency retract of %s covers sent in %s transmissions, %.3f s after"
+        " the trigger, %s waiting for their circuit",
+        len(retracted),
+        len(transmissions),
+        latency,
+        len(delayed),
+    )
+    return {
+        "covers": sorted(retracted),
+        "delayed": sorted(delayed),
+        "transmissions": len(transmissions),
+        "gateways": len({gateway for gateway, _, _ in transmissions}),
+        "latency": round(latency, 3),
+    }
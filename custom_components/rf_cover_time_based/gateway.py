@@ -0,0 +1,268 @@
+"""Command queues for the remote entities (RF/IR gateways) used by the covers."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Generic, NamedTuple, TypeVar
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .backends import ServiceCallBackend, TransmitBackend
+from .const import ATTR_COMMAND, DEFAULT_REPEAT_DELAY, EVENT_COMMAND_SENT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Give up on a transmission if the gateway does not answer in time, so a hung
+# gateway cannot block its queue forever.
+SEND_TIMEOUT = 10
+
+# Receivers also hear the gateway's own transmissions. A code heard within this
+# many seconds after sending it is considered an echo.
+ECHO_WINDOW = 2.0
+
+_T = TypeVar("_T")
+
+
+class CommandPriority(IntEnum):
+    """The priority of a queued command. Lower values are sent first."""
+
+    EMERGENCY = -1
+    INTERACTIVE = 0
+    MAINTENANCE = 1
+
+
+class GatewayQueue(Generic[_T]):
+    """
+    A priority queue of commands waiting for one gateway.
+
+    Commands of the same priority keep their submission order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the queue."""
+        self._heap: list[tuple[int, int, _T]] = []
+        self._counter = itertools.count()
+        self.peak_depth = 0
+
+    def __len__(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._heap)
+
+    def push(self, item: _T, priority: CommandPriority) -> None:
+        """Queue a command."""
+        heapq.heappush(self._heap, (priority, next(self._counter), item))
+        self.peak_depth = max(self.peak_depth, len(self._heap))
+
+    def pop(self) -> _T | None:
+        """Return the next command to send, or None if the queue is empty."""
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+
+class QueuedCommand(NamedTuple):
+    """A command waiting for a remote entity."""
+
+    command: str
+    # The intent of each sender the command is sent for, if any.
+    senders: Mapping[str, int]
+    # Extra transmissions of the command, after the first one.
+    repeats: int
+    delay: float
+    # Resolved once the command has been transmitted, for callers waiting on it.
+    done: asyncio.Future[None] | None = None
+
+
+class RemoteGateway:
+    """
+    Serializes the commands sent through one remote entity.
+
+    Gateways can only transmit one burst at a time, so commands are queued
+    by priority and sent one after the other, each waiting for the previous
+    transmission to finish.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_id: str,
+        backend: TransmitBackend | None = None,
+    ) -> None:
+        """Initialize the gateway, calling the service of the remote by default."""
+        self.hass = hass
+        self.entity_id = entity_id
+        self.backend = backend or ServiceCallBackend(hass, entity_id)
+        self._queue: GatewayQueue[QueuedCommand] = GatewayQueue()
+        self._worker: asyncio.Task | None = None
+        self._last_sent: dict[str, float] = {}
+        # Until when echoes of each command may still be heard.
+        self._echo_until: dict[str, float] = {}
+        # The current intent of each sender.
+        self._intents: dict[str, int] = {}
+        # Until when the commands sent are fired as events, for the offline
+        # calibration, on the time.monotonic() clock.
+        self.record_until = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the queue, for diagnostics."""
+        return {
+            "entity_id": self.entity_id,
+            "backend": self.backend.name,
+            "queued": len(self._queue),
+            "peak_depth": self._queue.peak_depth,
+        }
+
+    @callback
+    def async_send(
+        self,
+        command: str,
+        priority: CommandPriority = CommandPriority.INTERACTIVE,
+        senders: Mapping[str, int] | None = None,
+        repeats: int = 0,
+        delay: float = DEFAULT_REPEAT_DELAY,
+    ) -> None:
+        """
+        Queue a command for transmission, repeated some extra times.
+
+        The command is sent for some senders, each with its intent. It
+        supersedes their queued commands of other intents, which are dropped
+        instead of being sent. A command shared by several senders, such as
+        a group channel, is only dropped once all of them moved on.
+        """
+        senders = dict(senders or {})
+        self._intents.update(senders)
+        self._queue.push(QueuedCommand(command, senders, repeats, delay), priority)
+        self._async_start_worker()
+
+    @callback
+    def async_supersede(self, sender: str, intent: int) -> None:
+        """Drop the commands of a sender for intents other than its new one."""
+        self._intents[sender] = intent
+
+    @callback
+    def async_send_later(
+        self,
+        wait: float,
+        command: str,
+        priority: CommandPriority = CommandPriority.INTERACTIVE,
+        senders: Mapping[str, int] | None = None,
+        repeats: int = 0,
+        delay: float = DEFAULT_REPEAT_DELAY,
+    ) -> None:
+        """
+        Queue a command once wait seconds passed, like async_send.
+
+        Senders moving on in the meantime are left out, and the command is
+        dropped if all of them did.
+        """
+
+        @callback
+        def _async_send(_now: datetime) -> None:
+            current = {
+                sender: intent
+                for sender, intent in (senders or {}).items()
+                if self._intents.get(sender, intent) == intent
+            }
+            if senders and not current:
+                _LOGGER.debug(
+                    "Dropping superseded command of %s", ", ".join(senders)
+                )
+                return
+            self.async_send(command, priority, current, repeats, delay)
+
+        async_call_later(self.hass, wait, _async_send)
+
+    async def async_send_emergency(
+        self, command: str, repeats: int = 0, delay: float = DEFAULT_REPEAT_DELAY
+    ) -> None:
+        """
+        Send a command ahead of every queued one, and wait until it is sent.
+
+        Only a transmission already in progress is finished first.
+        """
+        done = self.hass.loop.create_future()
+        self._queue.push(
+            QueuedCommand(command, {}, repeats, delay, done),
+            CommandPriority.EMERGENCY,
+        )
+        self._async_start_worker()
+        await done
+
+    @callback
+    def _async_start_worker(self) -> None:
+        """Start sending the queued commands, unless already doing so."""
+        if self._worker is None:
+            self._worker = self.hass.async_create_task(
+                self._async_drain(), f"rf_cover_time_based gateway {self.entity_id}"
+            )
+
+    def last_sent(self, command: str) -> float | None:
+        """Return when a command was last sent, on the time.monotonic() clock."""
+        return self._last_sent.get(command)
+
+    def sent_recently(self, command: str) -> bool:
+        """Return True if a command was sent within the echo window."""
+        return time.monotonic() < self._echo_until.get(command, 0.0)
+
+    async def _async_drain(self) -> None:
+        """
+        Send the queued commands until the queue is empty.
+
+        A command failing in an unexpected way is logged, and handed to the
+        caller waiting on it, if any; the commands queued behind it are
+        still sent.
+        """
+        try:
+            while (queued := self._queue.pop()) is not None:
+                if queued.senders and all(
+                    self._intents[sender] != intent
+                    for sender, intent in queued.senders.items()
+                ):
+                    _LOGGER.debug(
+                        "Dropping superseded command of %s", ", ".join(queued.senders)
+                    )
+                    continue
+                try:
+                    await self._async_transmit(queued)
+                except Exception as err:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Unexpected error sending command through %s", self.entity_id
+                    )
+                    if queued.done is not None:
+                        queued.done.set_exception(err)
+                    continue
+                if queued.done is not None:
+                    queued.done.set_result(None)
+        finally:
+            self._worker = None
+
+    async def _async_transmit(self, queued: QueuedCommand) -> None:
+        """Send one command and wait for the gateway to finish it."""
+        sent_at = self._last_sent[queued.command] = time.monotonic()
+        self._echo_until[queued.command] = (
+            sent_at + queued.repeats * queued.delay + ECHO_WINDOW
+        )
+        if sent_at < self.record_until:
+            self.hass.bus.async_fire(
+                EVENT_COMMAND_SENT,
+                {ATTR_ENTITY_ID: self.entity_id, ATTR_COMMAND: queued.command},
+            )
+        try:
+            # The transmitter sends the repetitions itself, within one call.
+            async with asyncio.timeout(SEND_TIMEOUT + queued.repeats * queued.delay):
+                await self.backend.async_send(
+                    queued.command, queued.repeats, queued.delay
+                )
+        except (HomeAssistantError, TimeoutError) as err:
+            _LOGGER.warning(
+                "Failed to send command through %s: %s", self.entity_id, err
+            )
@@ -0,0 +1,126 @@
+"""A bounded, append-only index of the motion segments of a cover."""
+from __future__ import annotations
+
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+DEFAULT_CAPACITY = 1024
+
+# The most positions a single query may sample per cover.
+MAX_SAMPLES = 10_000
+
+
+class MotionHistory:
+    """
+    The motion segments of a cover, to tell where it was at any past time.
+
+    Each transition of the travel calculator appends a segment: the start
+    of a movement, with its speed and target, or a stop, with a speed of
+    0. A segment lasts until the next one starts, so the position at a time
+    is found by bisecting the start times, then evaluating that segment,
+    in O(log n). The segments are stored in typed arrays, one column each,
+    and once full, the oldest half is dropped, so appending stays
+    amortized O(1) and the memory stays bounded.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize the history."""
+        if capacity < 2:
+            raise ValueError("History capacity must be at least 2.")
+
+        self.capacity = capacity
+        # Start times, on the calculator's clock, in ascending order.
+        self._start = array("d")
+        self._position = array("f")
+        self._speed = array("f")
+        self._target = array("f")
+        # Seconds before the cover travels, while the slats turn.
+        self._delay = array("f")
+
+    @property
+    def _columns(self) -> tuple[array, ...]:
+        """Return the columns, which always have the same length."""
+        return (self._start, self._position, self._speed, self._target, self._delay)
+
+    def __len__(self) -> int:
+        """Return the number of segments held."""
+        return len(self._start)
+
+    def append(
+        self,
+        start: float,
+        position: float,
+        speed: float = 0.0,
+        target: float | None = None,
+        delay: float = 0.0,
+    ) -> None:
+        """Append a segment, starting no earlier than the last one."""
+        if len(self._start) == self.capacity:
+            half = self.capacity // 2
+            for column in self._columns:
+                del column[:half]
+        self._start.append(start)
+        self._position.append(position)
+        self._speed.append(speed)
+        self._target.append(position if target is None else target)
+        self._delay.append(delay)
+
+    def truncate(self, after: float) -> None:
+        """Drop the segments starting after a time, which never happened."""
+        index = bisect_right(self._start, after)
+        if index < len(self._start):
+            for column in self._columns:
+                del column[index:]
+
+    def position_at(self, when: float) -> float | None:
+        """Return the position at a time, None if before the oldest segment."""
+        index = bisect_right(self._start, when) - 1
+        if index < 0:
+            return None
+        position = self._position[index]
+        speed = self._speed[index]
+        if speed == 0:
+            return position
+        moved = speed * max(when - self._start[index] - self._delay[index], 0.0)
+        target = self._target[index]
+        if speed > 0:
+            return min(position + moved, target)
+        return max(position + moved, target)
+
+    def sample(self, start: float, interval: float, count: int) -> list[float | None]:
+        """Return the positions at count times, interval seconds apart."""
+        return [
+            None if (position := self.position_at(start + step * interval)) is None
+            else round(position, 1)
+            for step in range(count)
+        ]
+
+
+def sample_history(
+    history: MotionHistory, start: datetime, end: datetime, interval: float
+) -> dict[str, object]:
+    """
+    Sample the positions between two wall-clock times, on the monotonic clock.
+
+    Raises ValueError for ranges that are reversed or take too many samples.
+    Times without a time zone are in the time zone of Home Assistant.
+    """
+    start, end = dt_util.as_utc(start), dt_util.as_utc(end)
+    if end < start:
+        raise ValueError("The end of the range is before its start")
+    count = int((end - start).total_seconds() // interval) + 1
+    if count > MAX_SAMPLES:
+        raise ValueError(
+            f"The range takes {count} samples, more than {MAX_SAMPLES}"
+        )
+    # Anchor the wall clock to the monotonic clock of the calculators.
+    offset = time.monotonic() - dt_util.utcnow().timestamp()
+    return {
+        "start": start.isoformat(),
+        "interval": interval,
+        "positions": history.sample(start.timestamp() + offset, interval, count),
+    }
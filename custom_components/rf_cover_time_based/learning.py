@@ -0,0 +1,162 @@
+"""Online learning of the travel times from end-stop sensor feedback."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_KEY = f"{DOMAIN}.learned_travel_times"
+STORAGE_VERSION = 1
+
+# Learned parameters are written at most once per this many seconds, however
+# many covers observed an arrival in the meantime.
+SAVE_DELAY = 60
+
+# Weight of each new sample in the running estimates.
+LEARNING_RATE = 0.2
+
+# Once an estimate has this many samples, samples further off than this ratio
+# are ignored, e.g. a move cut short by the handheld remote.
+OUTLIER_MIN_SAMPLES = 3
+OUTLIER_RATIO = 0.5
+
+# Latency samples longer than this, in seconds, are not a delayed start.
+MAX_LATENCY = 5.0
+
+# Partial moves shorter than this, in percent, are too imprecise to learn from.
+MIN_LEARNING_DISTANCE = 20
+
+
+@dataclass(frozen=True)
+class TrackedMove:
+    """A movement sent by the integration, followed to learn from its timing."""
+
+    opening: bool
+    command: str
+    start_position: float
+    target_position: int
+    # When the command was queued, on the time.monotonic() clock.
+    queued_at: float
+    # Seconds spent turning the slats before the cover travels.
+    tilt_duration: float = 0.0
+
+
+@dataclass
+class RunningEstimate:
+    """An exponentially weighted estimate, updated in constant time and memory."""
+
+    value: float
+    samples: int = 0
+
+    def update(self, sample: float) -> bool:
+        """Add a sample. Returns False if it was rejected as an outlier."""
+        if (
+            self.samples >= OUTLIER_MIN_SAMPLES
+            and abs(sample - self.value) > OUTLIER_RATIO * self.value
+        ):
+            return False
+        self.value += LEARNING_RATE * (sample - self.value)
+        self.samples += 1
+        return True
+
+
+@dataclass
+class LearnedTravelTimes:
+    """
+    The travel times and latency learned for one cover.
+
+    The estimates start from the configured travel times, which are kept to
+    notice when the user configures new ones.
+    """
+
+    configured: tuple[float, float]
+    down: RunningEstimate
+    up: RunningEstimate
+    latency: RunningEstimate = field(default_factory=lambda: RunningEstimate(0.0))
+
+    @classmethod
+    def from_configured(
+        cls, travel_time_down: float, travel_time_up: float
+    ) -> LearnedTravelTimes:
+        """Return fresh estimates, starting from the configured travel times."""
+        return cls(
+            (travel_time_down, travel_time_up),
+            RunningEstimate(travel_time_down),
+            RunningEstimate(travel_time_up),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LearnedTravelTimes:
+        """Restore the estimates from storage."""
+        return cls(
+            tuple(data["configured"]),
+            RunningEstimate(**data["down"]),
+            RunningEstimate(**data["up"]),
+            RunningEstimate(**data["latency"]),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the estimates for storage."""
+        return {
+            "configured": list(self.configured),
+            "down": asdict(self.down),
+            "up": asdict(self.up),
+            "latency": asdict(self.latency),
+        }
+
+
+class TravelTimeStore:
+    """Persists the learned travel times of all covers in one storage file."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._learned: dict[str, LearnedTravelTimes] = {}
+
+    async def async_load(self) -> None:
+        """Load the learned travel times."""
+        data = await self._store.async_load() or {}
+        self._learned = {
+            entry_id: LearnedTravelTimes.from_dict(learned)
+            for entry_id, learned in data.items()
+        }
+
+    @callback
+    def async_get(
+        self, entry_id: str, travel_time_down: float, travel_time_up: float
+    ) -> LearnedTravelTimes:
+        """
+        Return the learned travel times of a config entry.
+
+        Learning starts over when the configured travel times have changed.
+        """
+        learned = self._learned.get(entry_id)
+        if learned is None or learned.configured != (travel_time_down, travel_time_up):
+            learned = self._learned[entry_id] = LearnedTravelTimes.from_configured(
+                travel_time_down, travel_time_up
+            )
+        return learned
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget the learned travel times of a removed config entry."""
+        if self._learned.pop(entry_id, None) is not None:
+            self.async_schedule_save()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the learned travel times, batched with other changes."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {
+            entry_id: learned.as_dict() for entry_id, learned in self._learned.items()
+        }
@@ -0,0 +1,128 @@
+"""The motor of a cover: when its movements start, and what stops them."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+from .circuits import CircuitScheduler
+from .travelcalculator import TravelCalculator, TravelStatus
+
+
+class MotorStart(NamedTuple):
+    """A movement just started, and when its motor starts."""
+
+    direction: TravelStatus | None
+    # Seconds the motor waits for a free slot on its circuit.
+    delay: float = 0.0
+    # The start of that slot, None when the motor starts at once. Movements
+    # waiting for the same slot start together.
+    slot: float | None = None
+
+
+class CoverMotor:
+    """
+    The motor of one cover, on its electrical circuit.
+
+    Starts movements once the circuit has a slot free for them, holds their
+    slots, and tells which stops and arrivals need a stop command. The entity
+    and the offline simulator both drive their covers through it, so they
+    follow the same rules.
+    """
+
+    def __init__(
+        self,
+        calculator: TravelCalculator,
+        circuits: CircuitScheduler,
+        name: str,
+        circuit: str | None,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        """Initialize the motor of a cover, on the clock of its calculator."""
+        self.calculator = calculator
+        self.circuits = circuits
+        self.name = name
+        self.circuit = circuit
+        self._clock = clock
+
+    def _now(self) -> float:
+        """Return the current time of the motor's clock."""
+        # time.monotonic() is looked up on every call, so it can be frozen.
+        return self._clock() if self._clock else time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        """Return if the motor runs, not stopped nor waiting for its circuit."""
+        plan = self.calculator.travel_plan()
+        return plan is not None and plan.start_time <= self._now()
+
+    def start_travel(self, target_position: int) -> MotorStart:
+        """Start a movement to a position, once its circuit has a slot free."""
+        delay, slot = self._slot(self.calculator.travel_duration(target_position))
+        return MotorStart(
+            self.calculator.start_travel(target_position, delay), delay, slot
+        )
+
+    def start_tilt(self, target_tilt: int) -> MotorStart:
+        """Start turning the slats, once the circuit has a slot free."""
+        delay, slot = self._slot(
+            self.calculator.travel_duration(target_tilt=target_tilt)
+        )
+        return MotorStart(self.calculator.start_tilt(target_tilt, delay), delay, slot)
+
+    def stop(self) -> bool | None:
+        """
+        Stop the movement where it is.
+
+        Returns None if the cover was not moving, otherwise if the motor has
+        to be told to stop: one still waiting for its circuit never started.
+        """
+        running = self.running
+        if not self.calculator.stop_travel():
+            return None
+        return running
+
+    def arrive(self) -> tuple[int, bool]:
+        """
+        Finish the movement at its predicted arrival time.
+
+        Returns the position reached, and if the motor has to be told to
+        stop: the end stops halt it by themselves, but anywhere else, and
+        once the slats are turned, it runs on.
+        """
+        tilt_only = self.calculator.tilt_only
+        target_position = self.calculator.finish_travel()
+        self.reserve()
+        return target_position, tilt_only or target_position not in (0, 100)
+
+    def reserve(self) -> None:
+        """Hold the slot of the current movement on the circuit, or free it."""
+        if self.circuit is None:
+            return
+        if plan := self.calculator.travel_plan():
+            self.circuits.async_reserve(
+                self.circuit, self.name, plan.start_time, plan.arrival_time
+            )
+        else:
+            self.circuits.async_release(self.circuit, self.name)
+
+    def release(self) -> None:
+        """Free the slot of the movement on the circuit."""
+        if self.circuit is not None:
+            self.circuits.async_release(self.circuit, self.name)
+
+    def _slot(self, duration: float) -> tuple[float, float | None]:
+        """
+        Return how long a movement must wait for a free slot on the circuit.
+
+        Returns the delay, and the start of the slot, None for no delay. A
+        motor already running holds a slot, and is never delayed: while
+        waiting, it would run on in its old direction.
+        """
+        if self.circuit is None or self.running:
+            return 0.0, None
+        now = self._now()
+        slot = self.circuits.next_start(self.circuit, self.name, now, duration)
+        if slot <= now:
+            return 0.0, None
+        return slot - now, slot
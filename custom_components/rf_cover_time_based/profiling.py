@@ -0,0 +1,281 @@
+"""
+On-demand profiling of the integration's own callbacks.
+
+While a session runs, the profiled methods are swapped on their class for
+wrappers that only measure while one of them is executing, so the rest of the
+event loop is left out. The original methods are put back when the session
+stops, so there is no overhead at all outside of a session.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import marshal
+import os
+import sys
+import threading
+from collections import Counter
+from collections.abc import Callable, Generator, Iterable
+from typing import Any
+
+from .const import DEFAULT_SAMPLE_INTERVAL, MODE_DETERMINISTIC, MODE_SAMPLING
+
+# Guards against cycles and runaway depth when expanding pstats into stacks.
+MAX_STACK_DEPTH = 64
+
+_FunctionKey = tuple[str, int, str]
+
+
+class _ProfiledCoroutine:
+    """Runs a coroutine, measuring only the steps it executes itself."""
+
+    def __init__(self, session: ProfileSession, coro: Any) -> None:
+        """Initialize the wrapper."""
+        self._session = session
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Step through the coroutine, entering the session at every step."""
+        send: Any = None
+        error: BaseException | None = None
+        while True:
+            self._session.enter()
+            try:
+                if error is None:
+                    yielded = self._coro.send(send)
+                else:
+                    yielded = self._coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._session.exit()
+            try:
+                send, error = (yield yielded), None
+            except BaseException as err:  # pylint: disable=broad-except
+                send, error = None, err
+
+
+class ProfileSession:
+    """A profiling session around some methods of a class."""
+
+    def __init__(
+        self,
+        cls: type,
+        method_names: Iterable[str],
+        mode: str = MODE_DETERMINISTIC,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        """Initialize the session."""
+        self._cls = cls
+        self._originals = {name: cls.__dict__[name] for name in method_names}
+        self.mode = mode
+        self._interval = interval
+        self._active = False
+        self._depth = 0
+        self._profiler = cProfile.Profile() if mode == MODE_DETERMINISTIC else None
+        self._samples: Counter[tuple[_FunctionKey, ...]] = Counter()
+        self._sampler: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._thread_id: int | None = None
+
+    def start(self) -> None:
+        """Swap in the profiled methods. Must run in the profiled thread."""
+        self._active = True
+        for name, original in self._originals.items():
+            setattr(self._cls, name, self._wrap(original))
+        if self.mode == MODE_SAMPLING:
+            self._thread_id = threading.get_ident()
+            self._sampler = threading.Thread(
+                target=self._sample, name="rf_cover_time_based profiler", daemon=True
+            )
+            self._sampler.start()
+
+    def stop(self) -> None:
+        """Put the original methods back."""
+        # Timers scheduled during the session may still hold a wrapper.
+        self._active = False
+        for name, original in self._originals.items():
+            setattr(self._cls, name, original)
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def enter(self) -> None:
+        """Start measuring, unless already inside a profiled method."""
+        if not self._active:
+            return
+        if self._depth == 0 and self._profiler is not None:
+            self._profiler.enable()
+        self._depth += 1
+
+    def exit(self) -> None:
+        """Stop measuring when leaving the outermost profiled method."""
+        if not self._active:
+            return
+        self._depth -= 1
+        if self._depth == 0 and self._profiler is not None:
+            self._profiler.disable()
+
+    def _wrap(self, original: Callable[..., Any]) -> Callable[..., Any]:
+        """Return a profiled version of a method."""
+        if asyncio.iscoroutinefunction(original):
+
+            @functools.wraps(original)
+            async def profiled_coroutine(*args: Any, **kwargs: Any) -> Any:
+                return await _ProfiledCoroutine(self, original(*args, **kwargs))
+
+            return _rename(profiled_coroutine, original)
+
+        # functools.wraps also keeps the @callback marker of the original.
+        @functools.wraps(original)
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            self.enter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.exit()
+
+        return _rename(profiled, original)
+
+    def _sample(self) -> None:
+        """Sample the stack of the profiled thread inside profiled methods."""
+        while not self._stopped.wait(self._interval):
+            if self._depth == 0:
+                continue
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self._thread_id
+            )
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self._samples[tuple(reversed(stack))] += 1
+
+    def stats(self) -> dict[_FunctionKey, tuple]:
+        """Return the aggregated stats, in the marshalled pstats layout."""
+        if self._profiler is not None:
+            self._profiler.create_stats()
+            return _without_bookkeeping(self._profiler.stats)
+
+        stats: dict[_FunctionKey, list] = {}
+        for stack, count in self._samples.items():
+            seconds = count * self._interval
+            for depth, function in enumerate(stack):
+                entry = stats.setdefault(function, [0, 0, 0.0, 0.0, {}])
+                if function not in stack[:depth]:
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if depth:
+                    caller = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += count
+                    caller[1] += count
+                    caller[3] += seconds
+            stats[stack[-1]][2] += seconds
+            if len(stack) > 1:
+                stats[stack[-1]][4][stack[-2]][2] += seconds
+        return {
+            function: (cc, nc, tt, ct, {key: tuple(e) for key, e in calls.items()})
+            for function, (cc, nc, tt, ct, calls) in stats.items()
+        }
+
+    def collapsed(self) -> dict[str, int]:
+        """Return the stacks, flamegraph-collapsed, weighted in microseconds."""
+        if self._profiler is None:
+            return {
+                ";".join(map(_label, stack)): round(count * self._interval * 1e6)
+                for stack, count in self._samples.items()
+            }
+        return _collapse_stats(self.stats())
+
+    def write(self, path: str) -> tuple[str, str]:
+        """Write the stats in pstats and collapsed formats, next to a path."""
+        pstats_path = f"{path}.pstats"
+        collapsed_path = f"{path}.collapsed"
+        with open(pstats_path, "wb") as file:
+            marshal.dump(self.stats(), file)
+        with open(collapsed_path, "w", encoding="utf-8") as file:
+            for stack, weight in sorted(self.collapsed().items()):
+                if weight:
+                    file.write(f"{stack} {weight}\n")
+        return pstats_path, collapsed_path
+
+
+def _rename(wrapper: Callable[..., Any], original: Callable[..., Any]) -> Any:
+    """Name the code of a wrapper after the original, to tell wrappers apart."""
+    wrapper.__code__ = wrapper.__code__.replace(
+        co_name=original.__name__, co_qualname=original.__qualname__
+    )
+    return wrapper
+
+
+def _without_bookkeeping(
+    stats: dict[_FunctionKey, tuple]
+) -> dict[_FunctionKey, tuple]:
+    """Drop the calls made by the session itself to stop measuring."""
+    hidden = {
+        key
+        for key in stats
+        if key[0] == __file__
+        and key[2] in ("enter", "exit")
+        or key[2] == "<method 'disable' of '_lsprof.Profiler' objects>"
+    }
+    return {
+        function: (
+            cc,
+            nc,
+            tt,
+            ct,
+            {key: edge for key, edge in calls.items() if key not in hidden},
+        )
+        for function, (cc, nc, tt, ct, calls) in stats.items()
+        if function not in hidden
+    }
+
+
+def _label(function: _FunctionKey) -> str:
+    """Return a readable label of a function, for flamegraphs."""
+    filename, line, name = function
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def _collapse_stats(stats: dict[_FunctionKey, tuple]) -> dict[str, int]:
+    """
+    Expand deterministic stats into collapsed stacks.
+
+    cProfile only keeps caller/callee pairs, so the own time of a function is
+    split among the paths leading to it in proportion to the time spent
+    through each caller.
+    """
+    callees: dict[_FunctionKey, list[tuple[_FunctionKey, float]]] = {}
+    # Calls made while measuring started, e.g. resuming a coroutine, have no
+    # recorded caller and start a stack of their own.
+    roots: list[tuple[_FunctionKey, float]] = []
+    for function, (_, nc, _, ct, callers) in stats.items():
+        called = 0
+        for caller, (edge_nc, _, _, edge_ct) in callers.items():
+            if caller in stats and ct:
+                callees.setdefault(caller, []).append((function, edge_ct / ct))
+            called += edge_nc
+        if called < nc:
+            roots.append((function, (nc - called) / nc))
+
+    collapsed: dict[str, int] = {}
+
+    def walk(function: _FunctionKey, path: tuple[str, ...], share: float) -> None:
+        path = (*path, _label(function))
+        stack = ";".join(path)
+        collapsed[stack] = collapsed.get(stack, 0) + round(
+            stats[function][2] * share * 1e6
+        )
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, fraction in callees.get(function, ()):
+            if _label(callee) not in path:
+                walk(callee, path, share * fraction)
+
+    for root, share in roots:
+        walk(root, (), share)
+    return collapsed
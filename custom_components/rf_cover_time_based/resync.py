@@ -0,0 +1,77 @@
+"""Scheduled end-stop resynchronization of covers whose position drifted."""
+from __future__ import annotations
+
+from datetime import time, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    from .time_based_cover import TimeBasedCover
+
+# How often the pending covers are checked against their quiet windows.
+CHECK_INTERVAL = timedelta(minutes=1)
+
+
+def is_in_window(now: time, start: time, end: time) -> bool:
+    """Return True if a time of day is inside a window, which may wrap midnight."""
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end
+
+
+class ResyncScheduler:
+    """
+    Batches the resynchronizations of covers whose position drifted.
+
+    Covers ask for a resync once their position uncertainty goes past their
+    threshold. The scheduler starts all the covers whose quiet window is open
+    together, and only checks the clock while some cover is waiting.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._pending: dict[str, TimeBasedCover] = {}
+        self._unsub_check: CALLBACK_TYPE | None = None
+
+    @property
+    def pending(self) -> list[str]:
+        """Return the entity_ids of the covers waiting for a resync."""
+        return list(self._pending)
+
+    @callback
+    def async_request(self, cover: TimeBasedCover) -> None:
+        """Queue a resync for a cover, to run in its next quiet window."""
+        self._pending[cover.entity_id] = cover
+        if self._unsub_check is None:
+            self._unsub_check = async_track_time_interval(
+                self.hass, self._async_check, CHECK_INTERVAL
+            )
+        self._async_check()
+
+    @callback
+    def async_cancel(self, cover: TimeBasedCover) -> None:
+        """Drop the pending resync of a cover, if any."""
+        self._pending.pop(cover.entity_id, None)
+        if not self._pending and self._unsub_check is not None:
+            self._unsub_check()
+            self._unsub_check = None
+
+    @callback
+    def _async_check(self, *args: Any) -> None:
+        """Start the resyncs of every idle cover inside its quiet window."""
+        now = dt_util.now().time()
+        batch = [
+            cover
+            for cover in self._pending.values()
+            if not cover.travel_calculator.is_moving()
+            and is_in_window(now, *cover.resync_window)
+        ]
+        for cover in batch:
+            self.async_cancel(cover)
+            self.hass.async_create_task(
+                cover.async_resync(), f"rf_cover_time_based resync {cover.entity_id}"
+            )
@@ -0,0 +1,108 @@
+"""Track presses of the physical remotes through sniffed RF codes."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import ATTR_CODE, EVENT_CODE_RECEIVED
+from .travelcalculator import TravelStatus
+
+if TYPE_CHECKING:
+    from .time_based_cover import TimeBasedCover
+
+
+class RemotePressListener:
+    """
+    Feed the codes heard by RF receivers into the matching covers.
+
+    Codes arrive either as the state of receiver sensors or as
+    EVENT_CODE_RECEIVED events. All covers share one subscription of each
+    kind, and a code is resolved with a single lookup in an index built from
+    the commands of every tracked cover.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the listener."""
+        self.hass = hass
+        self._covers: dict[str, TimeBasedCover] = {}
+        self._index: dict[str, list[tuple[TimeBasedCover, TravelStatus]]] | None = (
+            None
+        )
+        self._receivers: set[str] = set()
+        self._unsub_event: CALLBACK_TYPE | None = None
+        self._unsub_receivers: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_register(self, cover: TimeBasedCover) -> CALLBACK_TYPE:
+        """Start tracking the presses of a cover's remote."""
+        self._covers[cover.entity_id] = cover
+        self._async_update_subscriptions()
+
+        @callback
+        def _async_unregister() -> None:
+            self._covers.pop(cover.entity_id, None)
+            self._async_update_subscriptions()
+
+        return _async_unregister
+
+    @callback
+    def _async_update_subscriptions(self) -> None:
+        """Match the subscriptions to the tracked covers."""
+        self._index = None
+
+        if self._covers and self._unsub_event is None:
+            self._unsub_event = self.hass.bus.async_listen(
+                EVENT_CODE_RECEIVED, self._async_handle_event
+            )
+        elif not self._covers and self._unsub_event is not None:
+            self._unsub_event()
+            self._unsub_event = None
+
+        receivers = {
+            receiver
+            for cover in self._covers.values()
+            if (receiver := cover.receiver_entity_id)
+        }
+        if receivers == self._receivers:
+            return
+        if self._unsub_receivers is not None:
+            self._unsub_receivers()
+            self._unsub_receivers = None
+        self._receivers = receivers
+        if receivers:
+            self._unsub_receivers = async_track_state_change_event(
+                self.hass, receivers, self._async_handle_receiver_state
+            )
+
+    def _build_index(self) -> dict[str, list[tuple[TimeBasedCover, TravelStatus]]]:
+        """Map every command of the tracked covers to what it does."""
+        index: dict[str, list[tuple[TimeBasedCover, TravelStatus]]] = {}
+        for cover in self._covers.values():
+            for command, action in cover.remote_actions().items():
+                index.setdefault(command, []).append((cover, action))
+        return index
+
+    @callback
+    def async_handle_code(self, code: str) -> None:
+        """Apply a received code to every cover it drives."""
+        if self._index is None:
+            self._index = self._build_index()
+        for cover, action in self._index.get(code, ()):
+            cover.async_handle_remote_press(code, action)
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        """Handle a code received as an event."""
+        if isinstance(code := event.data.get(ATTR_CODE), str):
+            self.async_handle_code(code)
+
+    @callback
+    def _async_handle_receiver_state(self, event: Event) -> None:
+        """Handle a code received as the state of a receiver sensor."""
+        new_state = event.data["new_state"]
+        if new_state is None or new_state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return
+        self.async_handle_code(new_state.state)
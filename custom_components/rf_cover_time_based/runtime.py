@@ -0,0 +1,141 @@
+"""Integration-wide runtime data shared by all RF Cover Time Based entries."""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from homeassistant.components.cover import (
+    ATTR_CURRENT_POSITION,
+    ATTR_CURRENT_TILT_POSITION,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import restore_state
+
+from .backends import async_create_backend
+from .budget import WriteBudget
+from .circuits import CircuitScheduler
+from .const import DEFAULT_TRANSMIT_BACKEND, DOMAIN
+from .gateway import RemoteGateway
+from .learning import TravelTimeStore
+from .resync import ResyncScheduler
+from .rf_receiver import RemotePressListener
+
+if TYPE_CHECKING:
+    from .profiling import ProfileSession
+    from .time_based_cover import TimeBasedCover
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class RfCoverRuntimeData:
+    """State shared across all config entries of the integration."""
+
+    hass: HomeAssistant
+    resync: ResyncScheduler
+    presses: RemotePressListener
+    learning: TravelTimeStore
+    writes: WriteBudget
+    circuits: CircuitScheduler
+    # Every cover entity currently added to hass, keyed by entity_id.
+    covers: dict[str, TimeBasedCover] = field(default_factory=dict)
+    # One command queue per remote entity, shared by the covers using it.
+    gateways: dict[str, RemoteGateway] = field(default_factory=dict)
+    # The profiling session in progress, if any.
+    profile: ProfileSession | None = None
+    # The last positions and tilts of all covers, read at once while Home
+    # Assistant starts, keyed by entity_id. None once it has started.
+    restored_positions: dict[str, tuple[int, int | None]] | None = None
+    # The positions of the covers in each scene snapshot, by scene_id. Like
+    # the scenes created by scene.create, they are lost on restart.
+    scenes: dict[str, dict[str, int]] = field(default_factory=dict)
+    # Until when the gateways fire an event for every command they send, on
+    # the time.monotonic() clock.
+    record_commands_until: float = 0.0
+
+    @callback
+    def async_get_gateway(
+        self,
+        remote_entity_id: str,
+        backend: str = DEFAULT_TRANSMIT_BACKEND,
+        topic: str | None = None,
+    ) -> RemoteGateway:
+        """
+        Return the gateway of a remote entity, creating it on first use.
+
+        The covers of a gateway share its queue, and so its backend: the
+        latest cover set up picks it, so a changed option applies on reload.
+        """
+        if (gateway := self.gateways.get(remote_entity_id)) is None:
+            gateway = self.gateways[remote_entity_id] = RemoteGateway(
+                self.hass,
+                remote_entity_id,
+                async_create_backend(self.hass, backend, remote_entity_id, topic),
+            )
+            gateway.record_until = self.record_commands_until
+        elif (gateway.backend.name, gateway.backend.topic) != (backend, topic):
+            _LOGGER.info(
+                "%s now transmits through the %s backend", remote_entity_id, backend
+            )
+            gateway.backend = async_create_backend(
+                self.hass, backend, remote_entity_id, topic
+            )
+        return gateway
+
+    @callback
+    def async_record_commands(self, duration: float) -> None:
+        """
+        Have every gateway fire an event for each command it sends, for a while.
+
+        The recorder keeps the events for the offline calibration. Outside of
+        a recording, the commands cost no event nor recorder row.
+        """
+        self.record_commands_until = time.monotonic() + duration
+        for gateway in self.gateways.values():
+            gateway.record_until = self.record_commands_until
+
+    @callback
+    def async_load_restored_positions(self) -> None:
+        """Read the last positions and tilts of all covers at once."""
+        entity_registry = er.async_get(self.hass)
+        last_states = restore_state.async_get(self.hass).last_states
+        self.restored_positions = {}
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            for entity in entity_registry.entities.get_entries_for_config_entry_id(
+                entry.entry_id
+            ):
+                if (stored := last_states.get(entity.entity_id)) is not None and (
+                    position := stored.state.attributes.get(ATTR_CURRENT_POSITION)
+                ) is not None:
+                    tilt = stored.state.attributes.get(ATTR_CURRENT_TILT_POSITION)
+                    self.restored_positions[entity.entity_id] = (
+                        int(position),
+                        None if tilt is None else int(tilt),
+                    )
+
+    @callback
+    def async_pop_restored_position(
+        self, entity_id: str
+    ) -> tuple[int, int | None] | None:
+        """Return the position and tilt read for a cover on startup, once."""
+        if self.restored_positions is None:
+            return None
+        return self.restored_positions.pop(entity_id, None)
+
+
+@callback
+def async_get_runtime_data(hass: HomeAssistant) -> RfCoverRuntimeData:
+    """Return the runtime data, creating it on first use."""
+    if (runtime_data := hass.data.get(DOMAIN)) is None:
+        runtime_data = hass.data[DOMAIN] = RfCoverRuntimeData(
+            hass=hass,
+            resync=ResyncScheduler(hass),
+            presses=RemotePressListener(hass),
+            learning=TravelTimeStore(hass),
+            writes=WriteBudget(hass),
+            circuits=CircuitScheduler(),
+        )
+    return runtime_data
@@ -0,0 +1,125 @@
+"""Scene snapshots of many covers, restored with as few moves as possible."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util import dt as dt_util
+
+from .gateway import CommandPriority
+from .travelcalculator import TravelCalculator
+
+if TYPE_CHECKING:
+    from .gateway import RemoteGateway
+    from .time_based_cover import TimeBasedCover
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def snapshot_positions(covers: Iterable[TimeBasedCover]) -> dict[str, int]:
+    """Return the current position of every cover, keyed by entity_id."""
+    return {
+        cover.entity_id: round(cover.travel_calculator.estimated_position())
+        for cover in covers
+    }
+
+
+def needs_move(calculator: TravelCalculator, target: int, deadband: float) -> bool:
+    """
+    Return if a cover has to move to end up within the deadband of a target.
+
+    A moving cover is judged by where it is heading, not where it is now.
+    """
+    plan = calculator.travel_plan()
+    destination = (
+        calculator.current_position() if plan is None else plan.target_position
+    )
+    return abs(destination - target) > deadband
+
+
+async def async_restore_scene(
+    targets: Iterable[tuple[TimeBasedCover, int]], deadband: float
+) -> dict[str, Any]:
+    """
+    Move covers back to the positions of a scene, and report what it took.
+
+    Covers already within the deadband of their position are left alone, as
+    are covers locked out by an emergency retract. Covers sharing a code on
+    the same gateway and starting together, such as a group channel, get a
+    single transmission of their command, sent once their circuit has a slot
+    free for them. Covers stopping away from the end stops each take a stop
+    command on arrival. The transmissions are sent for the covers, so a
+    command given to all of them before it goes out drops it. The motor of
+    each cover moved is reported with the time it starts, later than the
+    call for the covers waiting for their circuit.
+    """
+    now = dt_util.utcnow()
+    transmissions: dict[
+        tuple[RemoteGateway, str, float | None],
+        tuple[int, float, float, dict[str, int]],
+    ] = {}
+    moved: list[str] = []
+    motor_starts: dict[str, datetime] = {}
+    skipped: list[str] = []
+    locked: list[str] = []
+    passing: list[TimeBasedCover] = []
+    stops = 0
+    for cover, target in targets:
+        if cover.locked_out:
+            locked.append(cover.entity_id)
+            continue
+        if not needs_move(cover.travel_calculator, target, deadband):
+            skipped.append(cover.entity_id)
+            continue
+        if (move := cover.async_start_scene_move(target)) is None:
+            # Moving through its position right now: stopping is enough.
+            passing.append(cover)
+            continue
+        moved.append(cover.entity_id)
+        motor_starts[cover.entity_id] = now + timedelta(seconds=move.delay)
+        stops += target not in (0, 100)
+        key = (move.gateway, move.command, move.slot)
+        repeats, delay, wait, senders = transmissions.get(key, (0, 0.0, 0.0, {}))
+        transmissions[key] = (
+            max(repeats, move.repeats),
+            max(delay, move.repeat_delay),
+            max(wait, move.delay),
+            {**senders, cover.entity_id: move.intent},
+        )
+
+    for (gateway, command, slot), (repeats, delay, wait, senders) in (
+        transmissions.items()
+    ):
+        if slot is None:
+            gateway.async_send(
+                command, CommandPriority.INTERACTIVE, senders, repeats, delay
+            )
+        else:
+            gateway.async_send_later(
+                wait, command, CommandPriority.INTERACTIVE, senders, repeats, delay
+            )
+    await asyncio.gather(*(cover.async_stop_cover() for cover in passing))
+
+    _LOGGER.debug(
+        "Scene restored with %s motor starts until %s, %s skipped within %s%%",
+        len(moved),
+        max(motor_starts.values(), default=now),
+        len(skipped),
+        deadband,
+    )
+    return {
+        "moved": sorted(moved),
+        "stopped": sorted(cover.entity_id for cover in passing),
+        "skipped": sorted(skipped),
+        "locked": sorted(locked),
+        "motor_starts": {
+            entity_id: start.isoformat()
+            for entity_id, start in sorted(
+                motor_starts.items(), key=lambda item: (item[1], item[0])
+            )
+        },
+        "transmissions": len(transmissions) + stops + len(passing),
+    }
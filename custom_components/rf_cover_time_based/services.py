@@ -0,0 +1,352 @@
+"""Integration-wide services of RF Cover Time Based."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from functools import partial
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_CLASS, ATTR_ENTITY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DEADBAND,
+    ATTR_DURATION,
+    ATTR_INTERVAL,
+    ATTR_LOCKOUT,
+    ATTR_MODE,
+    ATTR_SCENE_ID,
+    ATTR_SUGGESTIONS,
+    CONF_TRAVELLING_TIME_DOWN,
+    CONF_TRAVELLING_TIME_UP,
+    DEFAULT_DEADBAND,
+    DEFAULT_LOCKOUT,
+    DEFAULT_RECORD_DURATION,
+    DEFAULT_SAMPLE_INTERVAL,
+    DOMAIN,
+    MODE_DETERMINISTIC,
+    MODE_SAMPLING,
+    SERVICE_APPLY_CALIBRATION,
+    SERVICE_EMERGENCY_RETRACT,
+    SERVICE_EXPORT_DIAGNOSTICS,
+    SERVICE_PROFILE,
+    SERVICE_RECORD_COMMANDS,
+    SERVICE_RESTORE_SCENE,
+    SERVICE_SNAPSHOT_SCENE,
+)
+from .diagnostics import async_export_diagnostics
+from .emergency import async_emergency_retract
+from .runtime import async_get_runtime_data
+from .scenes import async_restore_scene, snapshot_positions
+
+_LOGGER = logging.getLogger(__name__)
+
+# The entity methods run by every command and position update.
+PROFILED_METHODS = (
+    "async_update_position",
+    "_async_trigger_travel",
+    "_async_handle_command",
+)
+
+TRAVEL_TIME = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+APPLY_CALIBRATION_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SUGGESTIONS): [
+            vol.Schema(
+                {
+                    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+                    vol.Optional(CONF_TRAVELLING_TIME_DOWN): TRAVEL_TIME,
+                    vol.Optional(CONF_TRAVELLING_TIME_UP): TRAVEL_TIME,
+                }
+            )
+        ]
+    }
+)
+
+EMERGENCY_RETRACT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_CLASS, default=["awning"]): vol.All(
+            cv.ensure_list, [cv.string]
+        ),
+        vol.Optional(ATTR_LOCKOUT, default=DEFAULT_LOCKOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=86400)
+        ),
+    }
+)
+
+SNAPSHOT_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SCENE_ID): cv.string,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+RESTORE_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SCENE_ID): cv.string,
+        vol.Optional(ATTR_DEADBAND, default=DEFAULT_DEADBAND): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=50)
+        ),
+    }
+)
+
+RECORD_COMMANDS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_RECORD_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=30 * 86400)
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_MODE, default=MODE_DETERMINISTIC): vol.In(
+            [MODE_DETERMINISTIC, MODE_SAMPLING]
+        ),
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_SAMPLE_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0.0001, max=1)
+        ),
+    }
+)
+
+
+async def async_apply_calibration(hass: HomeAssistant, call: ServiceCall) -> None:
+    """
+    Apply suggested travelling times to many covers at once.
+
+    The options are updated as the options flow would, which reloads
+    each entry. All suggestions are checked before any is applied.
+    """
+    entity_registry = async_get_entity_registry(hass)
+    updates = []
+    for suggestion in call.data[ATTR_SUGGESTIONS]:
+        entity_id = suggestion[ATTR_ENTITY_ID]
+        entity = entity_registry.async_get(entity_id)
+        entry = (
+            hass.config_entries.async_get_entry(entity.config_entry_id)
+            if entity and entity.platform == DOMAIN and entity.config_entry_id
+            else None
+        )
+        if entry is None:
+            raise ServiceValidationError(
+                f"{entity_id} is not an RF Cover Time Based cover"
+            )
+        updates.append(
+            (
+                entry,
+                {
+                    key: value
+                    for key, value in suggestion.items()
+                    if key != ATTR_ENTITY_ID
+                },
+            )
+        )
+
+    for entry, travel_times in updates:
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, **travel_times}
+        )
+
+
+async def async_emergency_retract_service(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """
+    Retract every cover of the given device classes at once.
+
+    The covers then refuse other commands for the lockout period. The
+    response reports the end-to-end latency of the broadcast.
+    """
+    device_classes = call.data[ATTR_DEVICE_CLASS]
+    return await async_emergency_retract(
+        [
+            cover
+            for cover in async_get_runtime_data(hass).covers.values()
+            if cover.device_class in device_classes
+        ],
+        call.data[ATTR_LOCKOUT],
+    )
+
+
+async def async_snapshot_scene(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """
+    Save the positions of the given covers, or of all covers, as a scene.
+
+    A snapshot replaces any earlier one of the same scene_id.
+    """
+    covers = async_get_runtime_data(hass).covers
+    entity_ids = call.data.get(ATTR_ENTITY_ID, list(covers))
+    unknown = [entity_id for entity_id in entity_ids if entity_id not in covers]
+    if unknown:
+        raise ServiceValidationError(
+            f"Not RF Cover Time Based covers: {', '.join(unknown)}"
+        )
+    positions = snapshot_positions(covers[entity_id] for entity_id in entity_ids)
+    async_get_runtime_data(hass).scenes[call.data[ATTR_SCENE_ID]] = positions
+    return {"positions": positions}
+
+
+async def async_restore_scene_service(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """
+    Move the covers of a scene back to their saved positions.
+
+    The response reports the motor starts and transmissions it took.
+    Covers removed since the snapshot are ignored.
+    """
+    runtime_data = async_get_runtime_data(hass)
+    scene_id = call.data[ATTR_SCENE_ID]
+    if (positions := runtime_data.scenes.get(scene_id)) is None:
+        raise ServiceValidationError(f"No snapshot of scene {scene_id}")
+    return await async_restore_scene(
+        (
+            (runtime_data.covers[entity_id], position)
+            for entity_id, position in positions.items()
+            if entity_id in runtime_data.covers
+        ),
+        call.data[ATTR_DEADBAND],
+    )
+
+
+async def async_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """
+    Profile the cover callbacks for a while.
+
+    The stats are written to the configuration directory, in pstats and
+    flamegraph-collapsed formats, when the session ends.
+    """
+    # Only loaded when profiling, to keep it out of the startup.
+    # pylint: disable-next=import-outside-toplevel
+    from .profiling import ProfileSession
+
+    # pylint: disable-next=import-outside-toplevel
+    from .time_based_cover import TimeBasedCover
+
+    runtime_data = async_get_runtime_data(hass)
+    if runtime_data.profile is not None:
+        raise HomeAssistantError("A profiling session is already running")
+
+    session = runtime_data.profile = ProfileSession(
+        TimeBasedCover,
+        PROFILED_METHODS,
+        call.data[ATTR_MODE],
+        call.data[ATTR_INTERVAL],
+    )
+    session.start()
+    _LOGGER.warning(
+        "Profiling the cover callbacks for %s seconds", call.data[ATTR_DURATION]
+    )
+
+    async def async_finish(_now: datetime) -> None:
+        """End the session and write its stats."""
+        session.stop()
+        runtime_data.profile = None
+        path = hass.config.path(
+            f"{DOMAIN}_profile_{dt_util.utcnow():%Y%m%d%H%M%S}"
+        )
+        written = await hass.async_add_executor_job(session.write, path)
+        _LOGGER.warning("Profile written to %s and %s", *written)
+
+    async_call_later(hass, call.data[ATTR_DURATION], async_finish)
+
+
+async def async_record_commands(hass: HomeAssistant, call: ServiceCall) -> None:
+    """
+    Fire an event for every command sent, for the offline calibration.
+
+    The recording lasts for the given duration, 0 ending it, and is lost on
+    restart.
+    """
+    async_get_runtime_data(hass).async_record_commands(call.data[ATTR_DURATION])
+    _LOGGER.info(
+        "Recording the commands sent for %s seconds", call.data[ATTR_DURATION]
+    )
+
+
+async def async_export_diagnostics_service(
+    hass: HomeAssistant, call: ServiceCall
+) -> None:
+    """
+    Export the diagnostics of every cover at once.
+
+    They are written to the configuration directory, one JSON line per
+    config entry, instead of one download per entry.
+    """
+    path = hass.config.path(
+        f"{DOMAIN}_diagnostics_{dt_util.utcnow():%Y%m%d%H%M%S}.jsonl"
+    )
+    lines = await async_export_diagnostics(hass, path)
+    _LOGGER.warning("Diagnostics of %s covers written to %s", lines, path)
+
+
+# The services of the integration, with their schema and response support.
+SERVICES = (
+    (
+        SERVICE_APPLY_CALIBRATION,
+        async_apply_calibration,
+        APPLY_CALIBRATION_SCHEMA,
+        SupportsResponse.NONE,
+    ),
+    (
+        SERVICE_EMERGENCY_RETRACT,
+        async_emergency_retract_service,
+        EMERGENCY_RETRACT_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    ),
+    (
+        SERVICE_SNAPSHOT_SCENE,
+        async_snapshot_scene,
+        SNAPSHOT_SCENE_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    ),
+    (
+        SERVICE_RESTORE_SCENE,
+        async_restore_scene_service,
+        RESTORE_SCENE_SCHEMA,
+        SupportsResponse.OPTIONAL,
+    ),
+)
+
+# The services only administrators may call, with their schema.
+ADMIN_SERVICES = (
+    (SERVICE_PROFILE, async_profile, PROFILE_SCHEMA),
+    (SERVICE_EXPORT_DIAGNOSTICS, async_export_diagnostics_service, vol.Schema({})),
+    (SERVICE_RECORD_COMMANDS, async_record_commands, RECORD_COMMANDS_SCHEMA),
+)
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    for service, handler, schema, supports_response in SERVICES:
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            partial(handler, hass),
+            schema=schema,
+            supports_response=supports_response,
+        )
+    for service, handler, schema in ADMIN_SERVICES:
+        async_register_admin_service(
+            hass, DOMAIN, service, partial(handler, hass), schema=schema
+        )
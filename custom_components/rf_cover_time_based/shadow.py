@@ -0,0 +1,210 @@
+"""Shadow evaluation of alternative travel models on the live commands."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.const import ATTR_NAME
+
+from .const import ATTR_LATENCY, CONF_TRAVELLING_TIME_DOWN, CONF_TRAVELLING_TIME_UP
+from .travelcalculator import TravelCalculator
+
+# The name the configuration in use is reported under.
+CURRENT = "current"
+
+
+@dataclass
+class ShadowScore:
+    """The errors of a model against the ground truth, in constant memory."""
+
+    samples: int = 0
+    total_error: float = 0.0
+    max_error: float = 0.0
+
+    def add(self, error: float) -> None:
+        """Add the error of one ground-truth observation."""
+        self.samples += 1
+        self.total_error += error
+        self.max_error = max(self.max_error, error)
+
+    @property
+    def mean_error(self) -> float | None:
+        """Return the mean absolute error, None before any observation."""
+        return self.total_error / self.samples if self.samples else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the score for a report."""
+        mean_error = self.mean_error
+        return {
+            "samples": self.samples,
+            "mean_error": None if mean_error is None else round(mean_error, 2),
+            "max_error": round(self.max_error, 2),
+        }
+
+
+class ShadowModel:
+    """An alternative configuration, followed by a calculator of its own."""
+
+    def __init__(
+        self,
+        name: str,
+        travel_time_down: float,
+        travel_time_up: float,
+        latency: float,
+        tilt_time: float,
+        evaluator: ShadowEvaluator,
+    ) -> None:
+        """Initialize the model, on the clock of its evaluator."""
+        self.name = name
+        self.travel_time_down = travel_time_down
+        self.travel_time_up = travel_time_up
+        self.latency = latency
+        self._evaluator = evaluator
+        # The motor only follows a command latency seconds after it is sent,
+        # so the transitions of the model take effect that much later.
+        self.calculator = TravelCalculator(
+            travel_time_down,
+            travel_time_up,
+            clock=lambda: evaluator.now + latency,
+            tilt_time=tilt_time,
+        )
+        self.score = ShadowScore()
+
+    def set_travel_times(self, travel_time_down: float, travel_time_up: float) -> None:
+        """Change the travel times of the model, from where it is."""
+        self.travel_time_down = travel_time_down
+        self.travel_time_up = travel_time_up
+        self.calculator.set_travel_times(travel_time_down, travel_time_up)
+
+    def error(self, position: int) -> float:
+        """
+        Return how far the model is from a position known to be the truth.
+
+        A model that reached that position early is off by how far it would
+        have travelled since, so the end stops do not hide models too fast.
+        """
+        now = self._evaluator.now
+        error = abs(self.calculator.position_at(now) - position)
+        plan = self.calculator.travel_plan()
+        if plan is not None and plan.target_position == position:
+            error += abs(plan.speed) * max(now - plan.arrival_time, 0.0)
+        return error
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the configuration and score of the model for a report."""
+        return {
+            ATTR_NAME: self.name,
+            CONF_TRAVELLING_TIME_DOWN: self.travel_time_down,
+            CONF_TRAVELLING_TIME_UP: self.travel_time_up,
+            ATTR_LATENCY: self.latency,
+            **self.score.as_dict(),
+        }
+
+
+class ShadowEvaluator:
+    """
+    Runs alternative travel models of a cover on its own command stream.
+
+    Every transition of the cover is mirrored to each model, at the time it
+    happened, without transmitting anything. The configuration in use runs
+    as one more model, so all are scored alike. The models are evaluated in
+    closed form, only when a ground-truth position is observed, so they
+    cost nothing between events, however many there are. Each observation
+    scores the models by their absolute error; an observation of a cover
+    standing still also re-anchors them to the truth, so each is scored on
+    the drift since then.
+    """
+
+    def __init__(
+        self,
+        candidates: Iterable[dict[str, Any]],
+        travel_time_down: float,
+        travel_time_up: float,
+        tilt_time: float,
+        position: float,
+        tilt: float,
+    ) -> None:
+        """Initialize the models of the candidates, from the current position."""
+        self.now = 0.0
+        self.current = ShadowModel(
+            CURRENT, travel_time_down, travel_time_up, 0.0, tilt_time, self
+        )
+        self.models = [
+            self.current,
+            *(
+                ShadowModel(
+                    candidate[ATTR_NAME],
+                    candidate[CONF_TRAVELLING_TIME_DOWN],
+                    candidate[CONF_TRAVELLING_TIME_UP],
+                    candidate.get(ATTR_LATENCY, 0.0),
+                    tilt_time,
+                    self,
+                )
+                for candidate in candidates
+            ),
+        ]
+        for model in self.models:
+            model.calculator.set_known_position(position)
+            model.calculator.set_known_tilt(tilt)
+
+    def start_travel(self, when: float, target_position: int) -> None:
+        """
+        Start the models traveling to a position.
+
+        The cover starts them towards the end stop its motor runs to, and
+        stops them when it tells the motor to stop.
+        """
+        self.now = when
+        for model in self.models:
+            model.calculator.start_travel(target_position)
+
+    def start_tilt(self, when: float, target_tilt: int) -> None:
+        """Start the models turning the slats to a tilt."""
+        self.now = when
+        for model in self.models:
+            model.calculator.start_tilt(target_tilt)
+
+    def set_current_travel_times(
+        self, when: float, travel_time_down: float, travel_time_up: float
+    ) -> None:
+        """Follow a change of the travel times in use, e.g. learned ones."""
+        self.now = when
+        self.current.set_travel_times(travel_time_down, travel_time_up)
+
+    def stop_travel(self, when: float) -> None:
+        """Stop the models where they are."""
+        self.now = when
+        for model in self.models:
+            model.calculator.stop_travel()
+
+    def observe(self, when: float, position: int, anchor: bool = True) -> None:
+        """
+        Score the models against a position known to be the truth.
+
+        Unless the cover may still be moving, the models are then set to it.
+        """
+        self.now = when
+        for model in self.models:
+            model.score.add(model.error(position))
+            if anchor:
+                model.calculator.set_known_position(position)
+
+    def leaderboard(self) -> list[dict[str, Any]]:
+        """
+        Return the models, most accurate first.
+
+        The mean error decides, then the maximum error; ties keep the
+        configuration in use first, and models never scored come last.
+        """
+        return [
+            model.as_dict()
+            for model in sorted(
+                self.models,
+                key=lambda model: (
+                    model.score.mean_error is None,
+                    model.score.mean_error or 0.0,
+                    model.score.max_error,
+                ),
+            )
+        ]
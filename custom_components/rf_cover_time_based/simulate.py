@@ -0,0 +1,541 @@
+"""
+Offline fleet simulator for RF Cover Time Based.
+
+Runs a scenario of timed commands against a set of covers in simulated time,
+and reports the RF load, the gateway queue depths and the command latencies.
+The covers send their commands the way the entity does, through the
+integration's own TravelCalculator, cover motors (CoverMotor), gateway
+queues (RemoteGateway) and circuit scheduler, on an event loop whose clock
+jumps from one timer to the next. Superseded commands are dropped from the
+queues, commands are repeated, and motor starts are staggered on the
+circuits, as they would be.
+
+Usage:
+    python -m custom_components.rf_cover_time_based.simulate covers.json \
+        scenario.json [--transmit-time 0.5]
+
+The covers file holds {"covers": [...]}, each cover with the same keys as the
+config entry: name, remote_entity, travelling_time_down and
+travelling_time_up, and optionally repeats, repeat_delay, circuit and
+circuit_limit, plus an optional count to define many identical covers.
+The scenario file holds {"events": [...]}, each event with an "at" time
+(seconds or HH:MM[:SS]), the "covers" it targets (names or shell-style
+patterns, all covers if omitted), either a "position" or an "action" (open,
+close or stop), and an optional "priority" (interactive or maintenance).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import selectors
+import sys
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .backends import TransmitBackend
+from .circuits import CircuitScheduler
+from .const import (
+    CONF_CIRCUIT,
+    CONF_CIRCUIT_LIMIT,
+    CONF_NAME,
+    CONF_REMOTE_ENTITY,
+    CONF_REPEAT_DELAY,
+    CONF_REPEATS,
+    CONF_TRAVELLING_TIME_DOWN,
+    CONF_TRAVELLING_TIME_UP,
+    DEFAULT_CIRCUIT_LIMIT,
+    DEFAULT_REPEAT_DELAY,
+    DEFAULT_REPEATS,
+)
+from .gateway import CommandPriority, RemoteGateway
+from .motor import CoverMotor
+from .travelcalculator import TravelCalculator, TravelStatus
+
+# Default airtime of one command burst, in seconds.
+DEFAULT_TRANSMIT_TIME = 0.5
+
+ACTION_POSITIONS = {"open": 100, "close": 0}
+
+
+class _SimulatedSelector(selectors.DefaultSelector):
+    """A selector moving the clock of its event loop instead of waiting."""
+
+    def __init__(self, on_idle: Callable[[], None]) -> None:
+        """Initialize the selector, at time 0."""
+        super().__init__()
+        self.now = 0.0
+        self._on_idle = on_idle
+
+    def select(
+        self, timeout: float | None = None
+    ) -> list[tuple[selectors.SelectorKey, int]]:
+        """Return the ready files at once, skipping the wait for the next timer."""
+        if ready := super().select(0):
+            return ready
+        if timeout is None:
+            # No timer is left, nothing can happen anymore.
+            self._on_idle()
+        else:
+            self.now += timeout
+        return []
+
+
+class SimulatedLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop on a simulated clock, starting at 0.
+
+    Instead of waiting for its next timer, the loop moves its clock to it, so
+    asyncio.sleep(), call_at() and timeouts take no real time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the loop."""
+        self._clock = _SimulatedSelector(self._idle)
+        self._idle_waiter: asyncio.Future[None] | None = None
+        super().__init__(self._clock)
+
+    def time(self) -> float:
+        """Return the simulated time."""
+        return self._clock.now
+
+    async def async_wait_idle(self) -> None:
+        """Wait until nothing else is left to run."""
+        self._idle_waiter = self.create_future()
+        await self._idle_waiter
+
+    def _idle(self) -> None:
+        """Wake up the waiter once nothing else is left to run."""
+        if self._idle_waiter is None or self._idle_waiter.done():
+            raise RuntimeError("Nothing is left to run, nor waiting for it")
+        self._idle_waiter.set_result(None)
+
+
+@dataclass
+class Move:
+    """A movement of one cover, started by one scenario event."""
+
+    event: int
+    intent: int
+    command: str
+    issued_at: float
+    duration: float
+    sent_at: float | None = None
+    superseded: bool = False
+
+
+@dataclass
+class GatewayStats:
+    """The counters of one remote entity."""
+
+    queued: int = 0
+    transmissions: int = 0
+    airtime: float = 0.0
+    peak_depth: int = 0
+
+    @property
+    def dropped(self) -> int:
+        """Return the queued commands superseded before they were sent."""
+        return self.queued - self.transmissions
+
+
+class SimulatedBackend(TransmitBackend):
+    """A transmitter taking some airtime for every burst of a command."""
+
+    name = "simulated"
+
+    def __init__(
+        self, hass: HomeAssistant, entity_id: str, simulation: Simulation
+    ) -> None:
+        """Initialize the transmitter of a remote entity."""
+        super().__init__(hass, entity_id)
+        self._simulation = simulation
+        self.stats = simulation.stats[entity_id]
+
+    async def async_send(self, command: str, repeats: int, delay: float) -> None:
+        """Transmit a command, repeated some extra times, delay seconds apart."""
+        cover = self._simulation.owners[command]
+        issued_at = cover.transmitting(command)
+        transmit_time = self._simulation.transmit_time
+        await asyncio.sleep((repeats + 1) * transmit_time + repeats * delay)
+        self.stats.transmissions += 1
+        self.stats.airtime += (repeats + 1) * transmit_time
+        self._simulation.latencies.append(self._simulation.now - issued_at)
+        self._simulation.active_until = self._simulation.now
+
+
+class SimulatedCover:
+    """A cover sending its commands the way the entity does, in simulated time."""
+
+    def __init__(
+        self, simulation: Simulation, name: str, definition: dict[str, Any]
+    ) -> None:
+        """Initialize the cover, open."""
+        self.name = name
+        self.simulation = simulation
+        self.gateway = simulation.gateways[definition[CONF_REMOTE_ENTITY]]
+        self.stats = simulation.stats[definition[CONF_REMOTE_ENTITY]]
+        self.calculator = TravelCalculator(
+            definition[CONF_TRAVELLING_TIME_DOWN],
+            definition[CONF_TRAVELLING_TIME_UP],
+            clock=simulation.loop.time,
+        )
+        self.commands = {
+            TravelStatus.OPENING: f"{name}:open",
+            TravelStatus.CLOSING: f"{name}:close",
+        }
+        self.stop_command = f"{name}:stop"
+        self.repeats = definition.get(CONF_REPEATS, DEFAULT_REPEATS)
+        self.repeat_delay = definition.get(CONF_REPEAT_DELAY, DEFAULT_REPEAT_DELAY)
+        circuit: str | None = definition.get(CONF_CIRCUIT) or None
+        if circuit is not None:
+            simulation.circuits.async_set_limit(
+                circuit, name, definition.get(CONF_CIRCUIT_LIMIT, DEFAULT_CIRCUIT_LIMIT)
+            )
+        self.motor = CoverMotor(
+            self.calculator, simulation.circuits, name, circuit, simulation.loop.time
+        )
+        self.move: Move | None = None
+        self._intent = 0
+        # When each command of the current intent was queued.
+        self._issued: dict[str, float] = {}
+        self._start_timer: asyncio.TimerHandle | None = None
+        self._arrival_timer: asyncio.TimerHandle | None = None
+
+    def travel(
+        self, target_position: int, event: int, priority: CommandPriority
+    ) -> None:
+        """Start a movement, as the entity does on a service call."""
+        direction, delay, _ = self.motor.start_travel(target_position)
+        if not direction:
+            if self.calculator.is_moving():
+                self.stop(priority)
+            return
+
+        intent = self._new_intent()
+        plan = self.calculator.travel_plan()
+        command = self.commands[direction]
+        self.move = Move(
+            event,
+            intent,
+            command,
+            self.simulation.now,
+            plan.arrival_time - plan.start_time,
+        )
+        self.simulation.moves.append(self.move)
+        self.motor.reserve()
+        if delay:
+            self._start_timer = self.simulation.loop.call_at(
+                plan.start_time, self._send, command, priority, intent
+            )
+        else:
+            self._send(command, priority, intent)
+        self._arrival_timer = self.simulation.loop.call_at(
+            plan.arrival_time, self._arrive, intent
+        )
+
+    def stop(self, priority: CommandPriority) -> None:
+        """Stop the cover, as the entity does on a service call."""
+        running = self.motor.stop()
+        if running is not None:
+            intent = self._new_intent()
+            if running:
+                self._send(self.stop_command, priority, intent)
+
+    def transmitting(self, command: str) -> float:
+        """
+        Start the motor on a command going on air, and return when it was queued.
+
+        The gateway drops the commands of older intents, so a command going
+        on air always belongs to the current one.
+        """
+        now = self.simulation.now
+        if (
+            self.move is not None
+            and self.move.intent == self._intent
+            and self.move.command == command
+        ):
+            self.move.sent_at = now + self.simulation.transmit_time
+        return self._issued.pop(command, now)
+
+    def _new_intent(self) -> int:
+        """Supersede the current movement and its queued commands."""
+        for timer in (self._start_timer, self._arrival_timer):
+            if timer is not None:
+                timer.cancel()
+        self._start_timer = self._arrival_timer = None
+        self.motor.release()
+        if self.move is not None:
+            self.move.superseded = True
+            self.move = None
+        self._issued.clear()
+        self._intent += 1
+        self.gateway.async_supersede(self.name, self._intent)
+        return self._intent
+
+    def _arrive(self, intent: int) -> None:
+        """Finish a movement at its predicted arrival time."""
+        self._start_timer = self._arrival_timer = None
+        self.move = None
+        self.simulation.active_until = max(
+            self.simulation.active_until, self.simulation.now
+        )
+        if self.motor.arrive()[1]:
+            self._send(self.stop_command, CommandPriority.INTERACTIVE, intent)
+
+    def _send(self, command: str, priority: CommandPriority, intent: int) -> None:
+        """Queue a command on the gateway, for the current intent."""
+        self._start_timer = None
+        self._issued[command] = self.simulation.now
+        self.stats.queued += 1
+        self.gateway.async_send(
+            command, priority, {self.name: intent}, self.repeats, self.repeat_delay
+        )
+
+
+@dataclass
+class SimulationReport:
+    """The statistics of a simulation run."""
+
+    covers: int
+    duration: float
+    elapsed: float
+    gateways: dict[str, GatewayStats]
+    latencies: list[float]
+    completions: list[float]
+    spreads: dict[int, float]
+    event_times: list[float]
+
+
+class Simulation:
+    """A fleet of covers sharing RF gateways, on a simulated event loop."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        covers: Sequence[dict[str, Any]],
+        transmit_time: float = DEFAULT_TRANSMIT_TIME,
+    ) -> None:
+        """Initialize the simulation, on the running event loop of hass."""
+        self.hass = hass
+        self.loop = hass.loop
+        self.transmit_time = transmit_time
+        self.circuits = CircuitScheduler()
+        self.gateways: dict[str, RemoteGateway] = {}
+        self.stats: dict[str, GatewayStats] = {}
+        self.covers: dict[str, SimulatedCover] = {}
+        # The cover of each command, which are named after their cover.
+        self.owners: dict[str, SimulatedCover] = {}
+        self.latencies: list[float] = []
+        self.moves: list[Move] = []
+        # When the last transmission or movement ended.
+        self.active_until = 0.0
+
+        for definition in covers:
+            remote = definition[CONF_REMOTE_ENTITY]
+            if remote not in self.gateways:
+                self.stats[remote] = GatewayStats()
+                self.gateways[remote] = RemoteGateway(
+                    hass, remote, SimulatedBackend(hass, remote, self)
+                )
+            count = definition.get("count")
+            names = (
+                [definition[CONF_NAME]]
+                if count is None
+                else [f"{definition[CONF_NAME]}_{i}" for i in range(1, count + 1)]
+            )
+            for name in names:
+                cover = self.covers[name] = SimulatedCover(self, name, definition)
+                for command in (*cover.commands.values(), cover.stop_command):
+                    self.owners[command] = cover
+
+    @property
+    def now(self) -> float:
+        """Return the simulated time."""
+        return self.loop.time()
+
+    def select(self, patterns: Sequence[str] | None) -> list[SimulatedCover]:
+        """Return the covers matching any of the patterns, all if None."""
+        if patterns is None:
+            return list(self.covers.values())
+        return [
+            cover
+            for name, cover in self.covers.items()
+            if any(fnmatchcase(name, pattern) for pattern in patterns)
+        ]
+
+
+def parse_time(value: float | int | str) -> float:
+    """Parse a scenario time, in seconds or HH:MM[:SS]."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    parts = [float(part) for part in value.split(":")]
+    if not 2 <= len(parts) <= 3:
+        raise ValueError(f"Invalid time: {value}")
+    return sum(part * 60 ** (2 - i) for i, part in enumerate(parts))
+
+
+def simulate(
+    covers: Sequence[dict[str, Any]],
+    events: Sequence[dict[str, Any]],
+    transmit_time: float = DEFAULT_TRANSMIT_TIME,
+) -> SimulationReport:
+    """Run a scenario and return its statistics."""
+    started = time.perf_counter()
+    loop = SimulatedLoop()
+    try:
+        return loop.run_until_complete(
+            _async_simulate(loop, covers, events, transmit_time, started)
+        )
+    finally:
+        loop.close()
+
+
+async def _async_simulate(
+    loop: SimulatedLoop,
+    covers: Sequence[dict[str, Any]],
+    events: Sequence[dict[str, Any]],
+    transmit_time: float,
+    started: float,
+) -> SimulationReport:
+    """Run a scenario on the simulated loop."""
+    simulation = Simulation(HomeAssistant(os.getcwd()), covers, transmit_time)
+    event_times = []
+
+    for index, event in enumerate(events):
+        at = parse_time(event["at"])
+        event_times.append(at)
+        priority = CommandPriority[event.get("priority", "interactive").upper()]
+        action = event.get("action")
+        position = event.get("position", ACTION_POSITIONS.get(action))
+        if position is None and action != "stop":
+            raise ValueError(f"Event {index} has no position or valid action")
+
+        def run_event(
+            index: int = index,
+            patterns: Sequence[str] | None = event.get("covers"),
+            position: int | None = position,
+            priority: CommandPriority = priority,
+        ) -> None:
+            simulation.active_until = max(simulation.active_until, simulation.now)
+            for cover in simulation.select(patterns):
+                if position is None:
+                    cover.stop(priority)
+                else:
+                    cover.travel(position, index, priority)
+
+        loop.call_at(at, run_event)
+
+    # Every movement arrived and every gateway emptied its queue once no
+    # timer is left.
+    await loop.async_wait_idle()
+    for remote, gateway in simulation.gateways.items():
+        simulation.stats[remote].peak_depth = gateway.as_dict()["peak_depth"]
+
+    # A movement is complete once the motor, started by the transmission,
+    # has run for the planned duration.
+    completed = [
+        move for move in simulation.moves if move.sent_at and not move.superseded
+    ]
+    finished: dict[int, list[float]] = {}
+    for move in completed:
+        finished.setdefault(move.event, []).append(move.sent_at + move.duration)
+
+    return SimulationReport(
+        covers=len(simulation.covers),
+        duration=simulation.active_until,
+        elapsed=time.perf_counter() - started,
+        gateways=simulation.stats,
+        latencies=simulation.latencies,
+        completions=[
+            move.sent_at + move.duration - move.issued_at for move in completed
+        ],
+        spreads={
+            event: max(times) - min(times) for event, times in finished.items()
+        },
+        event_times=event_times,
+    )
+
+
+def _percentile(values: Sequence[float], percent: float) -> float:
+    """Return a nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    rank = max(round(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS."""
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+def _format_distribution(values: Sequence[float]) -> str:
+    """Format the percentiles of a distribution of seconds."""
+    if not values:
+        return "n/a"
+    return (
+        f"p50 {_percentile(values, 50):.1f} s, p95 {_percentile(values, 95):.1f} s,"
+        f" max {max(values):.1f} s"
+    )
+
+
+def format_report(report: SimulationReport) -> str:
+    """Format a simulation report for the terminal."""
+    transmissions = sum(gw.transmissions for gw in report.gateways.values())
+    lines = [
+        f"Simulated {report.covers} covers on {len(report.gateways)} gateways"
+        f" over {_format_duration(report.duration)} in {report.elapsed:.2f} s",
+        f"Transmissions: {transmissions}",
+    ]
+    for remote, gateway in sorted(report.gateways.items()):
+        busy = gateway.airtime / report.duration if report.duration else 0.0
+        lines.append(
+            f"  {remote}: {gateway.transmissions} sent,"
+            f" {gateway.dropped} superseded, peak queue {gateway.peak_depth},"
+            f" airtime {busy:.1%}"
+        )
+    lines.append(f"Command latency: {_format_distribution(report.latencies)}")
+    lines.append(f"Completion time: {_format_distribution(report.completions)}")
+    if report.spreads:
+        event, spread = max(report.spreads.items(), key=lambda item: item[1])
+        lines.append(
+            f"Widest completion spread: {spread:.1f} s"
+            f" (event {event} at {_format_duration(report.event_times[event])})"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the simulator from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Simulate a fleet of RF covers in simulated time."
+    )
+    parser.add_argument("covers", help="JSON file with the cover definitions")
+    parser.add_argument("scenario", help="JSON file with the timed commands")
+    parser.add_argument(
+        "--transmit-time",
+        type=float,
+        default=DEFAULT_TRANSMIT_TIME,
+        help="airtime of one command burst, in seconds",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.covers, encoding="utf-8") as file:
+        covers = json.load(file)["covers"]
+    with open(args.scenario, encoding="utf-8") as file:
+        events = json.load(file)["events"]
+
+    print(format_report(simulate(covers, events, args.transmit_time)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,41 +2,115 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
-from typing import Any
+import time
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from functools import partial
+from typing import Any, NamedTuple
 
 from homeassistant.components.cover import (
+    ATTR_CURRENT_POSITION,
+    ATTR_CURRENT_TILT_POSITION,
     ATTR_POSITION,
+    ATTR_TILT_POSITION,
     CoverEntity,
     CoverEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    ATTR_NAME,
     CONF_DEVICE_CLASS,
+    STATE_ON,
     STATE_UNAVAILABLE,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.event import (
+    async_call_later,
     async_track_state_change_event,
-    async_track_time_interval,
 )
 from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    ATTR_DWELL,
+    ATTR_POSITION_UNCERTAINTY,
+    ATTR_SEQUENCE_STEP,
+    ATTR_SEQUENCE_STEPS,
+    ATTR_TRAVEL_ARRIVAL_AT,
+    ATTR_TRAVEL_PROFILE,
+    ATTR_TRAVEL_SPEED,
+    ATTR_TRAVEL_START_POSITION,
+    ATTR_TRAVEL_STARTED_AT,
+    ATTR_TRAVEL_TARGET_POSITION,
+    CONF_CIRCUIT,
+    CONF_CIRCUIT_LIMIT,
     CONF_CLOSE_COMMAND,
+    CONF_CLOSED_SENSOR,
+    CONF_INTERMEDIATE_UPDATES,
+    CONF_MQTT_TOPIC,
     CONF_OPEN_COMMAND,
+    CONF_OPEN_SENSOR,
+    CONF_RECEIVER_ENTITY,
     CONF_REMOTE_ENTITY,
+    CONF_REPEAT_DELAY,
+    CONF_REPEATS,
+    CONF_RESYNC_THRESHOLD,
+    CONF_RESYNC_WINDOW_END,
+    CONF_RESYNC_WINDOW_START,
     CONF_STOP_COMMAND,
+    CONF_TILT_TIME,
+    CONF_TRACK_REMOTE_PRESSES,
+    CONF_TRANSMIT_BACKEND,
     CONF_TRAVELLING_TIME_DOWN,
     CONF_TRAVELLING_TIME_UP,
+    CONF_WRITE_BUDGET,
+    DEFAULT_CIRCUIT_LIMIT,
+    DEFAULT_HISTORY_INTERVAL,
+    DEFAULT_INTERMEDIATE_UPDATES,
+    DEFAULT_REPEAT_DELAY,
+    DEFAULT_REPEATS,
+    DEFAULT_RESYNC_THRESHOLD,
+    DEFAULT_RESYNC_WINDOW_END,
+    DEFAULT_RESYNC_WINDOW_START,
+    DEFAULT_TILT_TIME,
+    DEFAULT_TRACK_REMOTE_PRESSES,
+    DEFAULT_TRANSMIT_BACKEND,
+    DEFAULT_WRITE_BUDGET,
     DOMAIN,
+    RESYNC_OVERTRAVEL,
 )
-from .travelcalculator import TravelCalculator, TravelStatus
+from .delivery import DELIVERY_GRACE, DeliveryTracker
+from .gateway import CommandPriority, RemoteGateway
+from .history import MotionHistory, sample_history
+from .learning import (
+    MAX_LATENCY,
+    MIN_LEARNING_DISTANCE,
+    LearnedTravelTimes,
+    TrackedMove,
+)
+from .motor import CoverMotor
+from .runtime import async_get_runtime_data
+from .shadow import CURRENT, ShadowEvaluator
+from .trace import MotionTrace, TraceCommand, TraceEvent
+from .travelcalculator import TravelCalculator, TravelStatus, TravelStep
 
 _LOGGER = logging.getLogger(__name__)
 
-UPDATE_INTERVAL = timedelta(seconds=0.1)
+
+class MoveCommand(NamedTuple):
+    """The command starting a movement, for a broadcast to send."""
+
+    gateway: RemoteGateway
+    command: str
+    repeats: int
+    repeat_delay: float
+    intent: int
+    # Seconds until the motor starts, and the slot of the circuit it waits
+    # for, None when it starts at once.
+    delay: float
+    slot: float | None
 
 
 class TimeBasedCover(CoverEntity, RestoreEntity):
@@ -67,15 +141,45 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
         )
 
         self._load_config()
+        if self._tilt_time:
+            self._attr_supported_features |= (
+                CoverEntityFeature.OPEN_TILT
+                | CoverEntityFeature.CLOSE_TILT
+                | CoverEntityFeature.STOP_TILT
+                | CoverEntityFeature.SET_TILT_POSITION
+            )
 
         self.travel_calculator = TravelCalculator(
-            self._travel_time_down, self._travel_time_up
+            self._travel_time_down,
+            self._travel_time_up,
+            tilt_time=self._tilt_time,
+            history=MotionHistory(),
         )
 
         # Initialize internal state attributes
         self._attr_current_cover_position: int | None = None
+        self._attr_current_cover_tilt_position: int | None = None
         self._attr_is_closed: bool | None = None
         self._updater_cancel_callback: callback | None = None
+        self._arrival_cancel_callback: callback | None = None
+        self._sequence_cancel_callback: callback | None = None
+        self._sequence_priority = CommandPriority.INTERACTIVE
+        self._motion_attributes: dict[str, Any] = {}
+        self.trace = MotionTrace()
+        self._learned: LearnedTravelTimes | None = None
+        self._tracked_move: TrackedMove | None = None
+        # Generation of the latest change of motion. Work resumed after an
+        # await only goes on if no newer change happened in the meantime.
+        self._intent = 0
+        self.delivery = DeliveryTracker(self._repeats)
+        self._delivery_check: CALLBACK_TYPE | None = None
+        # The start of a movement waiting for a free slot on its circuit.
+        self._start_cancel_callback: CALLBACK_TYPE | None = None
+        # Until when an emergency retract locks out other commands, on the
+        # time.monotonic() clock.
+        self._locked_until = 0.0
+        # Alternative travel models run alongside on the same commands.
+        self._shadows: ShadowEvaluator | None = None
 
     def _load_config(self) -> None:
         """Load and apply the latest configuration from the config entry."""
@@ -86,8 +190,49 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
         self._open_command = config[CONF_OPEN_COMMAND]
         self._close_command = config[CONF_CLOSE_COMMAND]
         self._stop_command = config[CONF_STOP_COMMAND]
+        self._trace_commands = {
+            self._open_command: TraceCommand.OPEN,
+            self._close_command: TraceCommand.CLOSE,
+            self._stop_command: TraceCommand.STOP,
+        }
         self._travel_time_down = config[CONF_TRAVELLING_TIME_DOWN]
         self._travel_time_up = config[CONF_TRAVELLING_TIME_UP]
+        self._tilt_time = config.get(CONF_TILT_TIME, DEFAULT_TILT_TIME)
+        self._intermediate_updates = config.get(
+            CONF_INTERMEDIATE_UPDATES, DEFAULT_INTERMEDIATE_UPDATES
+        )
+        self._resync_threshold = config.get(
+            CONF_RESYNC_THRESHOLD, DEFAULT_RESYNC_THRESHOLD
+        )
+        self._track_remote_presses = config.get(
+            CONF_TRACK_REMOTE_PRESSES, DEFAULT_TRACK_REMOTE_PRESSES
+        )
+        self._receiver_entity_id = config.get(CONF_RECEIVER_ENTITY)
+        self._end_stop_sensors = {
+            entity_id: position
+            for entity_id, position in (
+                (config.get(CONF_CLOSED_SENSOR), 0),
+                (config.get(CONF_OPEN_SENSOR), 100),
+            )
+            if entity_id
+        }
+        self._repeats = config.get(CONF_REPEATS, DEFAULT_REPEATS)
+        self._repeat_delay = config.get(CONF_REPEAT_DELAY, DEFAULT_REPEAT_DELAY)
+        self._transmit_backend = config.get(
+            CONF_TRANSMIT_BACKEND, DEFAULT_TRANSMIT_BACKEND
+        )
+        self._mqtt_topic = config.get(CONF_MQTT_TOPIC)
+        self._write_budget = config.get(CONF_WRITE_BUDGET, DEFAULT_WRITE_BUDGET)
+        self._circuit = config.get(CONF_CIRCUIT) or None
+        self._circuit_limit = config.get(CONF_CIRCUIT_LIMIT, DEFAULT_CIRCUIT_LIMIT)
+        self._resync_window = (
+            dt_util.parse_time(
+                config.get(CONF_RESYNC_WINDOW_START, DEFAULT_RESYNC_WINDOW_START)
+            ),
+            dt_util.parse_time(
+                config.get(CONF_RESYNC_WINDOW_END, DEFAULT_RESYNC_WINDOW_END)
+            ),
+        )
 
     @property
     def available(self) -> bool:
@@ -95,10 +240,68 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
         remote_state = self.hass.states.get(self._remote_entity_id)
         return remote_state is not None and remote_state.state != STATE_UNAVAILABLE
 
+    @property
+    def resync_window(self) -> tuple[dt_time, dt_time]:
+        """Return the quiet window in which resyncs may run."""
+        return self._resync_window
+
+    @property
+    def receiver_entity_id(self) -> str | None:
+        """Return the sensor reporting the RF codes heard nearby, if any."""
+        return self._receiver_entity_id
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the plan of the current movement, if any."""
+        return self._motion_attributes
+
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
-        await self._async_restore_state()
+        runtime_data = async_get_runtime_data(self.hass)
+        await self._async_restore_state(
+            runtime_data.async_pop_restored_position(self.entity_id)
+        )
+
+        runtime_data.covers[self.entity_id] = self
+        self.async_on_remove(
+            lambda: runtime_data.covers.pop(self.entity_id, None)
+        )
+        self.async_on_remove(lambda: runtime_data.resync.async_cancel(self))
+        self.async_on_remove(
+            runtime_data.writes.async_set_limit(
+                self.config_entry.entry_id, self._write_budget
+            )
+        )
+        self._gateway = runtime_data.async_get_gateway(
+            self._remote_entity_id, self._transmit_backend, self._mqtt_topic
+        )
+        self._motor = CoverMotor(
+            self.travel_calculator, runtime_data.circuits, self.entity_id, self._circuit
+        )
+        if self._circuit is not None:
+            self.async_on_remove(
+                runtime_data.circuits.async_set_limit(
+                    self._circuit, self.config_entry.entry_id, self._circuit_limit
+                )
+            )
+            self.async_on_remove(self._motor.release)
+        if self._track_remote_presses:
+            self.async_on_remove(runtime_data.presses.async_register(self))
+        if self._end_stop_sensors:
+            self._learned = runtime_data.learning.async_get(
+                self.config_entry.entry_id,
+                self._travel_time_down,
+                self._travel_time_up,
+            )
+            self._apply_learned_travel_times()
+            self.async_on_remove(
+                async_track_state_change_event(
+                    self.hass,
+                    list(self._end_stop_sensors),
+                    self._handle_end_stop_change,
+                )
+            )
 
         self.async_on_remove(
             async_track_state_change_event(
@@ -107,17 +310,28 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
                 self._handle_remote_availability_change,
             )
         )
-        self.config_entry.add_update_listener(self._handle_options_update)
         self.async_on_remove(self._cancel_updater)
+        self.async_on_remove(self._cancel_sequence)
+        self.async_on_remove(self._cancel_delivery_check)
+        self.async_on_remove(self._cancel_delayed_start)
 
-    async def _async_restore_state(self) -> None:
-        """Restore the last known state of the cover."""
-        last_state = await self.async_get_last_state()
-        restored_position = None
+    async def _async_restore_state(
+        self, restored: tuple[int, int | None] | None
+    ) -> None:
+        """
+        Restore the last known state of the cover.
+
+        The position and tilt read for all covers on startup are used if
+        there are some, otherwise the last state of this cover is read.
+        """
+        last_position = last_tilt = None
+        if restored is not None:
+            last_position, last_tilt = restored
+        elif (last_state := await self.async_get_last_state()) is not None:
+            last_position = last_state.attributes.get(ATTR_CURRENT_POSITION)
+            last_tilt = last_state.attributes.get(ATTR_CURRENT_TILT_POSITION)
 
-        if last_state and (
-            last_position := last_state.attributes.get(ATTR_POSITION)
-        ) is not None:
+        if last_position is not None:
             _LOGGER.debug("Restoring cover position to %s", last_position)
             restored_position = int(last_position)
         else:
@@ -125,6 +339,11 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
             restored_position = 100
 
         self.travel_calculator.set_known_position(restored_position)
+        if last_tilt is not None:
+            self.travel_calculator.set_known_tilt(int(last_tilt))
+        self.trace.record(
+            TraceEvent.KNOWN_POSITION, restored_position, tilt=self._trace_tilt()
+        )
         self._update_position_attributes()
 
     @callback
@@ -132,22 +351,55 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
         """Update the position and is_closed attributes from the calculator."""
         self._attr_current_cover_position = self.travel_calculator.current_position()
         self._attr_is_closed = self._attr_current_cover_position == 0
+        if self.travel_calculator.supports_tilt:
+            self._attr_current_cover_tilt_position = (
+                self.travel_calculator.current_tilt()
+            )
 
-    @callback
-    def _handle_remote_availability_change(self, *args: Any) -> None:
-        """Handle availability changes of the remote entity."""
-        self.async_write_ha_state()
+    def _trace_tilt(self) -> float | None:
+        """Return the tilt to record in the trace, None for covers without."""
+        if not self.travel_calculator.supports_tilt:
+            return None
+        return self.travel_calculator.estimated_tilt()
 
     @callback
-    def _handle_options_update(
-        self, hass: HomeAssistant, entry: ConfigEntry
-    ) -> None:
-        """Handle an options update."""
-        _LOGGER.debug("Reloading configuration from options flow")
-        self._load_config()
-        self.travel_calculator = TravelCalculator(
-            self._travel_time_down, self._travel_time_up
+    def _update_motion_attributes(self) -> None:
+        """
+        Publish the plan of the current movement as state attributes.
+
+        This is done once per movement, so clients can interpolate the
+        position between start and arrival instead of following every tick.
+        """
+        self._motion_attributes = {
+            ATTR_POSITION_UNCERTAINTY: round(self.travel_calculator.uncertainty, 1)
+        }
+        if progress := self.travel_calculator.sequence_progress():
+            self._motion_attributes[ATTR_SEQUENCE_STEP] = progress[0]
+            self._motion_attributes[ATTR_SEQUENCE_STEPS] = progress[1]
+
+        plan = self.travel_calculator.travel_plan()
+        if plan is None:
+            return
+
+        # Anchor the monotonic plan times to the wall clock.
+        started_at = dt_util.utcnow() - timedelta(
+            seconds=time.monotonic() - plan.start_time
+        )
+        arrival_at = started_at + timedelta(
+            seconds=plan.arrival_time - plan.start_time
         )
+        self._motion_attributes |= {
+            ATTR_TRAVEL_START_POSITION: round(plan.start_position, 1),
+            ATTR_TRAVEL_TARGET_POSITION: plan.target_position,
+            ATTR_TRAVEL_STARTED_AT: started_at.isoformat(),
+            ATTR_TRAVEL_ARRIVAL_AT: arrival_at.isoformat(),
+            ATTR_TRAVEL_SPEED: round(plan.speed, 3),
+            ATTR_TRAVEL_PROFILE: plan.profile,
+        }
+
+    @callback
+    def _handle_remote_availability_change(self, *args: Any) -> None:
+        """Handle availability changes of the remote entity."""
         self.async_write_ha_state()
 
     def _get_command_for_direction(self, direction: TravelStatus) -> str:
@@ -157,74 +409,888 @@ class TimeBasedCover(CoverEntity, RestoreEntity):
             return self._close_command if is_awning else self._open_command
         return self._open_command if is_awning else self._close_command
 
-    async def _async_trigger_travel(self, target_position: int) -> None:
-        """Start a cover movement to a specific target position."""
-        travel_direction = self.travel_calculator.start_travel(target_position)
+    def remote_actions(self) -> dict[str, TravelStatus]:
+        """Return what each command of the physical remote does to the cover."""
+        return {
+            self._get_command_for_direction(TravelStatus.OPENING): (
+                TravelStatus.OPENING
+            ),
+            self._get_command_for_direction(TravelStatus.CLOSING): (
+                TravelStatus.CLOSING
+            ),
+            self._stop_command: TravelStatus.STOPPED,
+        }
+
+    @callback
+    def async_handle_remote_press(self, code: str, action: TravelStatus) -> None:
+        """
+        Follow a press of the physical remote.
+
+        The cover moves without any command from us, so only the calculator
+        is updated. Codes we just sent ourselves are ignored as echoes.
+        """
+        if self._gateway.sent_recently(code):
+            return
+
+        _LOGGER.debug("Remote press detected for %s: %s", self.entity_id, action)
+        self._cancel_sequence()
+        self._tracked_move = None
+        if action is TravelStatus.STOPPED:
+            if self.travel_calculator.stop_travel():
+                self._new_intent()
+                self._mirror_stop()
+                self.trace.record(
+                    TraceEvent.STOP,
+                    self.travel_calculator.estimated_position(),
+                    remote=True,
+                    tilt=self._trace_tilt(),
+                )
+                self._cancel_updater()
+                self._update_position_attributes()
+                self._update_motion_attributes()
+                self.async_write_ha_state()
+            return
+
+        target_position = 100 if action is TravelStatus.OPENING else 0
+        if self.travel_calculator.start_travel(target_position):
+            self._new_intent()
+            self._async_track_travel(remote=True)
+
+    async def _async_trigger_travel(
+        self,
+        target_position: int,
+        priority: CommandPriority = CommandPriority.INTERACTIVE,
+    ) -> bool:
+        """
+        Start a cover movement to a specific target position.
+
+        Returns True if the cover started moving, or is waiting for a free
+        slot on its circuit to. A cover moving through the target position is
+        stopped there instead.
+        """
+        travel_direction, delay, _ = self._motor.start_travel(target_position)
         if not travel_direction:
+            if self.travel_calculator.is_moving():
+                await self._async_stop_travel()
+            return False
+
+        intent = self._new_intent()
+        command = self._get_command_for_direction(travel_direction)
+        if delay:
+            self._async_delay_start(
+                delay, intent, command, priority, travel_direction, target_position
+            )
+            return True
+        await self._async_start_motor(
+            intent, command, priority, travel_direction, target_position
+        )
+        return True
+
+    async def _async_trigger_tilt(self, target_tilt: int) -> None:
+        """
+        Turn the slats to a specific tilt, without moving the cover.
+
+        A cover moving through the target tilt is stopped there instead.
+        """
+        travel_direction, delay, _ = self._motor.start_tilt(target_tilt)
+        if not travel_direction:
+            if self.travel_calculator.is_moving():
+                await self._async_stop_travel()
             return
 
+        intent = self._new_intent()
+        # Turning the slats tells nothing about the travel times.
+        self._tracked_move = None
         command = self._get_command_for_direction(travel_direction)
-        await self._async_handle_command(command)
+        if delay:
+            self._async_delay_start(
+                delay, intent, command, CommandPriority.INTERACTIVE, travel_direction
+            )
+            return
+        await self._async_start_motor(
+            intent, command, CommandPriority.INTERACTIVE, travel_direction
+        )
+
+    async def _async_start_motor(
+        self,
+        intent: int,
+        command: str,
+        priority: CommandPriority,
+        travel_direction: TravelStatus,
+        target_position: int | None = None,
+        delayed: bool = False,
+        *args: Any,
+    ) -> None:
+        """
+        Send the command starting a movement, then follow the movement.
+
+        A movement of the cover to a target position is tracked, to learn the
+        travel times from. A delayed movement is followed from the start.
+        """
+        self._start_cancel_callback = None
+        await self._async_handle_command(command, priority, intent)
+        if intent != self._intent:
+            # A newer intent took over while the command was being sent.
+            return
+        if self._learned is not None and target_position is not None:
+            plan = self.travel_calculator.travel_plan()
+            self._tracked_move = TrackedMove(
+                travel_direction is TravelStatus.OPENING,
+                command,
+                plan.start_position,
+                target_position,
+                time.monotonic(),
+                plan.tilt_duration,
+            )
+        if not delayed:
+            self._async_track_travel()
+        if self._tracked_move is not None:
+            self._expect_delivery(self._tracked_move)
+
+    @callback
+    def _async_delay_start(
+        self,
+        delay: float,
+        intent: int,
+        command: str,
+        priority: CommandPriority,
+        travel_direction: TravelStatus,
+        target_position: int | None = None,
+    ) -> None:
+        """
+        Start a movement once its circuit has a slot free, delay seconds away.
+
+        The movement is published right away, with its later start and
+        arrival, and holds its slot on the circuit meanwhile.
+        """
+        _LOGGER.debug(
+            "Delaying the start of %s by %.1fs for circuit %s",
+            self.entity_id,
+            delay,
+            self._circuit,
+        )
+        self._async_track_travel()
+        self._start_cancel_callback = async_call_later(
+            self.hass,
+            delay,
+            partial(
+                self._async_start_motor,
+                intent,
+                command,
+                priority,
+                travel_direction,
+                target_position,
+                True,
+            ),
+        )
+
+    @callback
+    def _cancel_delayed_start(self) -> None:
+        """Drop the start of a movement still waiting for its circuit."""
+        if self._start_cancel_callback is not None:
+            self._start_cancel_callback()
+            self._start_cancel_callback = None
+
+    @callback
+    def _async_track_travel(self, remote: bool = False) -> None:
+        """Publish a movement that just started and follow it until arrival."""
+        self._motor.reserve()
+        if plan := self.travel_calculator.travel_plan():
+            self._mirror_start(plan.start_time)
+            if self.travel_calculator.tilt_only:
+                self.trace.record(
+                    TraceEvent.TILT,
+                    plan.start_position,
+                    plan.target_tilt,
+                    remote=remote,
+                    tilt=plan.start_tilt,
+                )
+            else:
+                self.trace.record(
+                    TraceEvent.START,
+                    plan.start_position,
+                    plan.target_position,
+                    remote=remote,
+                    tilt=plan.start_tilt,
+                )
+        self._update_motion_attributes()
         self._schedule_updater()
         self.async_write_ha_state()
 
+    @callback
+    def _mirror_start(self, when: float) -> None:
+        """Start the shadow models on the movement the cover just started."""
+        if self._shadows is None or (
+            plan := self.travel_calculator.travel_plan()
+        ) is None:
+            return
+        if self.travel_calculator.tilt_only:
+            self._shadows.start_tilt(when, plan.target_tilt)
+        else:
+            # The motor runs in its direction until it is told to stop.
+            self._shadows.start_travel(
+                when, 100 if self.travel_calculator.is_opening() else 0
+            )
+
+    @callback
+    def _mirror_stop(self) -> None:
+        """Stop the shadow models along with the cover."""
+        if self._shadows is not None:
+            self._shadows.stop_travel(time.monotonic())
+
+    @callback
+    def _new_intent(self) -> int:
+        """
+        Start a new generation of motion, superseding the previous one.
+
+        The latest intent wins: commands of older generations still waiting
+        in the gateway queue are dropped, and older service calls stop short
+        of scheduling anything once they resume from an await. A delivery
+        check of the previous movement is abandoned without a verdict, and a
+        start still waiting for its circuit is dropped along with its slot.
+        """
+        self._cancel_delivery_check()
+        self._cancel_delayed_start()
+        self._motor.release()
+        self._intent += 1
+        self._gateway.async_supersede(self.entity_id, self._intent)
+        return self._intent
+
+    async def _async_stop_travel(self) -> None:
+        """
+        Stop the cover where it is, if it is moving.
+
+        A cover still waiting for its circuit is not sent anything: dropping
+        the delayed start is enough, as the motor never started.
+        """
+        running = self._motor.stop()
+        if running is None:
+            return
+        intent = self._new_intent()
+        self._mirror_stop()
+        self.trace.record(
+            TraceEvent.STOP,
+            self.travel_calculator.estimated_position(),
+            tilt=self._trace_tilt(),
+        )
+        self._cancel_updater()
+        self._update_position_attributes()
+        self._update_motion_attributes()
+        if running:
+            await self._async_handle_command(
+                self._stop_command, CommandPriority.INTERACTIVE, intent
+            )
+            if intent != self._intent:
+                return
+        self.async_write_ha_state()
+        self._async_check_drift()
+
+    @callback
+    def async_start_emergency_retract(self, locked_until: float) -> MoveCommand:
+        """
+        Start retracting, for an emergency broadcast to send.
+
+        Whatever the cover was doing is dropped, and other commands are
+        locked out until the given time. A running motor reverses at once,
+        one at rest waits for a free slot on its circuit like any start. The
+        retract command is always sent, even if the cover is believed
+        retracted already.
+        """
+        self._locked_until = locked_until
+        self._cancel_sequence()
+        async_get_runtime_data(self.hass).resync.async_cancel(self)
+        self._tracked_move = None
+        self._cancel_updater()
+        start = self._motor.start_travel(0)
+        if not start.direction:
+            self.travel_calculator.stop_travel()
+        intent = self._new_intent()
+        self._mirror_stop()
+        if start.direction:
+            self._async_track_travel()
+        else:
+            self._update_motion_attributes()
+            self.async_write_ha_state()
+        return MoveCommand(
+            self._gateway,
+            self._get_command_for_direction(TravelStatus.CLOSING),
+            self.delivery.repeats,
+            self._repeat_delay,
+            intent,
+            start.delay,
+            start.slot,
+        )
+
+    @callback
+    def async_start_scene_move(self, target_position: int) -> MoveCommand | None:
+        """
+        Start moving to the position of a scene, for the scene to send.
+
+        Whatever the cover was doing is dropped, and the motor waits for a
+        free slot on its circuit like any start. Returns None if the cover
+        is moving through the position, and only has to stop.
+        """
+        self._cancel_sequence()
+        async_get_runtime_data(self.hass).resync.async_cancel(self)
+        self._tracked_move = None
+        start = self._motor.start_travel(target_position)
+        if not start.direction:
+            return None
+        intent = self._new_intent()
+        self._async_track_travel()
+        return MoveCommand(
+            self._gateway,
+            self._get_command_for_direction(start.direction),
+            self.delivery.repeats,
+            self._repeat_delay,
+            intent,
+            start.delay,
+            start.slot,
+        )
+
+    @property
+    def locked_out(self) -> bool:
+        """Return if an emergency retract locks out other commands."""
+        return time.monotonic() < self._locked_until
+
+    def _check_lockout(self) -> None:
+        """Refuse commands while an emergency retract is in effect."""
+        if self.locked_out:
+            raise HomeAssistantError(
+                f"{self.entity_id} is locked out by an emergency retract"
+            )
+
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Service call to close the cover."""
+        self._check_lockout()
+        self._cancel_sequence()
         await self._async_trigger_travel(0)
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Service call to open the cover."""
+        self._check_lockout()
+        self._cancel_sequence()
         await self._async_trigger_travel(100)
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Service call to stop the cover."""
-        if self.travel_calculator.stop_travel():
-            self._cancel_updater()
-            self._update_position_attributes()
-            await self._async_handle_command(self._stop_command)
-            self.async_write_ha_state()
+        self._check_lockout()
+        self._cancel_sequence()
+        self._tracked_move = None
+        await self._async_stop_travel()
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Service call to set the cover to a specific position."""
+        self._check_lockout()
+        self._cancel_sequence()
         await self._async_trigger_travel(kwargs[ATTR_POSITION])
 
+    async def async_open_cover_tilt(self, **kwargs: Any) -> None:
+        """Service call to open the slats."""
+        self._check_lockout()
+        self._cancel_sequence()
+        await self._async_trigger_tilt(100)
+
+    async def async_close_cover_tilt(self, **kwargs: Any) -> None:
+        """Service call to close the slats."""
+        self._check_lockout()
+        self._cancel_sequence()
+        await self._async_trigger_tilt(0)
+
+    async def async_stop_cover_tilt(self, **kwargs: Any) -> None:
+        """Service call to stop the slats, which stops the whole cover."""
+        await self.async_stop_cover()
+
+    async def async_set_cover_tilt_position(self, **kwargs: Any) -> None:
+        """Service call to turn the slats to a specific tilt."""
+        self._check_lockout()
+        self._cancel_sequence()
+        await self._async_trigger_tilt(kwargs[ATTR_TILT_POSITION])
+
+    async def async_run_sequence(self, steps: list[dict[str, Any]]) -> None:
+        """
+        Service call to run a sequence of moves inside the integration.
+
+        Each step travels to a position, then dwells before the next one
+        starts. Only the transitions between steps are published.
+        """
+        self._check_lockout()
+        await self._async_start_sequence(
+            [TravelStep(step[ATTR_POSITION], step[ATTR_DWELL]) for step in steps]
+        )
+
+    async def async_resync(self) -> None:
+        """
+        Resynchronize the position against the nearest end stop.
+
+        The cover is driven into the end stop with some overtravel, which
+        confirms the position, then back to where it was. The commands are
+        sent as maintenance, so they never delay interactive ones.
+        """
+        if self.locked_out:
+            return
+        position = self.travel_calculator.current_position()
+        end_stop = 0 if position <= 50 else 100
+        travel_time = max(self._travel_time_down, self._travel_time_up)
+        _LOGGER.debug(
+            "Resynchronizing %s (uncertainty %.1f%%)",
+            self.entity_id,
+            self.travel_calculator.uncertainty,
+        )
+        await self._async_start_sequence(
+            [
+                TravelStep(end_stop, RESYNC_OVERTRAVEL * travel_time),
+                TravelStep(position),
+            ],
+            CommandPriority.MAINTENANCE,
+        )
+
+    async def _async_start_sequence(
+        self,
+        steps: list[TravelStep],
+        priority: CommandPriority = CommandPriority.INTERACTIVE,
+    ) -> None:
+        """Start running a sequence of steps."""
+        self._cancel_sequence()
+        self._sequence_priority = priority
+        self.travel_calculator.start_sequence(steps)
+        await self._async_run_next_step()
+
+    async def _async_run_next_step(self, *args: Any) -> None:
+        """Start the next step of the running sequence, if any."""
+        self._sequence_cancel_callback = None
+        if (step := self.travel_calculator.advance_sequence()) is None:
+            self._update_motion_attributes()
+            self.async_write_ha_state()
+            # The way back from a resync must not trigger another one.
+            if self._sequence_priority is CommandPriority.INTERACTIVE:
+                self._async_check_drift()
+            return
+
+        if not await self._async_trigger_travel(
+            step.target_position, self._sequence_priority
+        ):
+            # Already at the target, so go straight to the dwell.
+            self._schedule_next_step(step.dwell)
+
+    @callback
+    def _schedule_next_step(self, dwell: float) -> None:
+        """Schedule the next step of the running sequence after a dwell."""
+        self._sequence_cancel_callback = async_call_later(
+            self.hass, dwell, self._async_run_next_step
+        )
+
+    @callback
+    def _cancel_sequence(self) -> None:
+        """Cancel the running sequence, if any."""
+        self.travel_calculator.cancel_sequence()
+        if self._sequence_cancel_callback:
+            self._sequence_cancel_callback()
+            self._sequence_cancel_callback = None
+
     @callback
     def _schedule_updater(self) -> None:
-        """Schedule the periodic position updater task."""
+        """
+        Schedule the position updater tasks.
+
+        The arrival is always handled by a single timer at the predicted
+        arrival time. Intermediate positions are published as often as the
+        write budget shared by all moving covers allows, unless disabled or
+        while running a sequence.
+        """
         self._cancel_updater()
-        self._updater_cancel_callback = async_track_time_interval(
-            self.hass, self._async_update_position, UPDATE_INTERVAL
+        self._arrival_cancel_callback = async_call_later(
+            self.hass,
+            self.travel_calculator.time_remaining(),
+            partial(self._async_handle_arrival, self._intent),
         )
+        if self._intermediate_updates and not self.travel_calculator.sequence_step:
+            self._updater_cancel_callback = async_get_runtime_data(
+                self.hass
+            ).writes.async_add(self)
 
     @callback
     def _cancel_updater(self) -> None:
-        """Cancel the periodic position updater task."""
+        """Cancel the position updater tasks."""
         if self._updater_cancel_callback:
             self._updater_cancel_callback()
             self._updater_cancel_callback = None
+        if self._arrival_cancel_callback:
+            self._arrival_cancel_callback()
+            self._arrival_cancel_callback = None
 
     @callback
-    def _async_update_position(self, *args: Any) -> None:
-        """Periodically update the cover's position during travel."""
+    def async_update_position(self) -> None:
+        """Publish the position of the cover during travel."""
         if not self.travel_calculator.update_position():
-            self._cancel_updater()
+            # The arrival timer takes care of the rest.
+            self._updater_cancel_callback()
+            self._updater_cancel_callback = None
+
+        self._update_position_attributes()
+        self.async_write_ha_state()
+
+    async def _async_handle_arrival(self, intent: int, *args: Any) -> None:
+        """
+        Finish the movement at its predicted arrival time.
+
+        The arrival of a movement superseded since the timer fired, before
+        this task got to run, is ignored.
+        """
+        if intent != self._intent:
+            return
+        self._arrival_cancel_callback = None
+        self._cancel_updater()
+        target_position, needs_stop = self._motor.arrive()
+        self.trace.record(
+            TraceEvent.ARRIVAL,
+            target_position,
+            target_position,
+            tilt=self._trace_tilt(),
+        )
+        step = self.travel_calculator.sequence_step
+        if needs_stop:
+            self._mirror_stop()
+            await self._async_handle_command(
+                self._stop_command,
+                self._sequence_priority if step else CommandPriority.INTERACTIVE,
+                intent,
+            )
+            if intent != self._intent:
+                return
 
         self._update_position_attributes()
+        self._update_motion_attributes()
         self.async_write_ha_state()
 
-    async def _async_handle_command(self, command: str) -> None:
-        """Send a command to the remote entity."""
+        if step is not None:
+            self._schedule_next_step(step.dwell)
+        else:
+            self._async_check_drift()
+
+    @callback
+    def _handle_end_stop_change(self, event: Event) -> None:
+        """
+        Learn from an end-stop sensor reaching or leaving its end stop.
+
+        An end stop reached before the predicted arrival also ends the
+        movement right away.
+        """
+        old_state = event.data["old_state"]
+        new_state = event.data["new_state"]
+        if new_state is None:
+            return
+        was_on = old_state is not None and old_state.state == STATE_ON
+        if was_on == (new_state.state == STATE_ON):
+            return
+
+        end_position = self._end_stop_sensors[event.data["entity_id"]]
+        self._confirm_delivery(end_position, departed=was_on)
+        if self._shadows is not None:
+            # A cover leaving an end stop is only there for an instant.
+            self._shadows.observe(time.monotonic(), end_position, anchor=not was_on)
+        if was_on:
+            self._learn_departure(end_position)
+            return
+
+        self._learn_arrival(end_position)
+        plan = self.travel_calculator.travel_plan()
+        if (
+            plan is not None
+            and plan.target_position == end_position
+            and not self.travel_calculator.tilt_only
+        ):
+            # Cancel the arrival timer now, so the arrival is handled once.
+            self._cancel_updater()
+            self.hass.async_create_task(self._async_handle_arrival(self._intent))
+
+    def _end_stop_reached(self, position: float) -> bool | None:
+        """Return if the end stop at a position is reached, None if unsensed."""
+        for entity_id, end_position in self._end_stop_sensors.items():
+            if end_position == position:
+                state = self.hass.states.get(entity_id)
+                return state is not None and state.state == STATE_ON
+        return None
+
+    @callback
+    def _expect_delivery(self, move: TrackedMove) -> None:
+        """
+        Wait for the end-stop sensors to confirm that a movement started.
+
+        Leaving the end stop it starts at, or reaching the one it travels to,
+        proves that the command landed. If neither can be seen, no verdict is
+        made; if neither happens by shortly after the predicted arrival, the
+        command counts as lost.
+        """
+        if not (
+            self._end_stop_reached(move.start_position)
+            or self._end_stop_reached(move.target_position) is False
+        ):
+            return
+        self._delivery_check = async_call_later(
+            self.hass,
+            self.travel_calculator.time_remaining()
+            + self.delivery.repeats * self._repeat_delay
+            + DELIVERY_GRACE,
+            self._handle_delivery_timeout,
+        )
+
+    @callback
+    def _confirm_delivery(self, end_position: int, departed: bool) -> None:
+        """Count the command of the tracked move as landed, if this proves it."""
+        move = self._tracked_move
+        if self._delivery_check is None or move is None:
+            return
+        if end_position == (move.start_position if departed else move.target_position):
+            self._cancel_delivery_check()
+            self._record_delivery(True)
+
+    @callback
+    def _handle_delivery_timeout(self, *args: Any) -> None:
+        """Count the command of a movement nobody confirmed as lost."""
+        self._delivery_check = None
+        self._record_delivery(False)
+
+    @callback
+    def _record_delivery(self, delivered: bool) -> None:
+        """Adapt the repetitions of the commands to a delivery outcome."""
+        repeats = self.delivery.repeats
+        self.delivery.record(delivered)
+        if self.delivery.repeats != repeats:
+            _LOGGER.debug(
+                "Commands of %s now repeated %s extra times",
+                self.entity_id,
+                self.delivery.repeats,
+            )
+
+    @callback
+    def _cancel_delivery_check(self) -> None:
+        """Stop waiting for the confirmation of a command."""
+        if self._delivery_check is not None:
+            self._delivery_check()
+            self._delivery_check = None
+
+    def _sent_at(self, move: TrackedMove) -> float | None:
+        """Return when the command of a tracked move was transmitted."""
+        sent_at = self._gateway.last_sent(move.command)
+        if sent_at is None or sent_at < move.queued_at:
+            return None
+        return sent_at
+
+    @callback
+    def _learn_departure(self, end_position: int) -> None:
+        """Learn the latency from the cover leaving the end stop it started at."""
+        move = self._tracked_move
+        if move is None or move.start_position != end_position:
+            return
+        if (sent_at := self._sent_at(move)) is None:
+            return
+        # The slats turn before the cover leaves the end stop.
+        latency = time.monotonic() - sent_at - move.tilt_duration
+        if latency <= MAX_LATENCY:
+            self._learned.latency.update(latency)
+            async_get_runtime_data(self.hass).learning.async_schedule_save()
+
+    @callback
+    def _learn_arrival(self, end_position: int) -> None:
+        """Learn the travel time from the cover reaching its target end stop."""
+        move = self._tracked_move
+        if move is None or move.target_position != end_position:
+            return
+        self._tracked_move = None
+        distance = abs(end_position - move.start_position)
+        if distance < MIN_LEARNING_DISTANCE or (sent_at := self._sent_at(move)) is None:
+            return
+
+        # Scale partial moves up to a full travel, which includes the latency.
+        latency = self._learned.latency.value
+        travel_time = (
+            (time.monotonic() - sent_at - latency - move.tilt_duration)
+            * 100
+            / distance
+        )
+        estimate = self._learned.up if move.opening else self._learned.down
+        if estimate.update(travel_time + latency):
+            _LOGGER.debug(
+                "Learned travel times for %s: %.2f s down, %.2f s up",
+                self.entity_id,
+                self._learned.down.value,
+                self._learned.up.value,
+            )
+            self._apply_learned_travel_times()
+            async_get_runtime_data(self.hass).learning.async_schedule_save()
+
+    @callback
+    def _apply_learned_travel_times(self) -> None:
+        """Make the calculator use the learned travel times."""
+        self._travel_time_down = self._learned.down.value
+        self._travel_time_up = self._learned.up.value
+        self.travel_calculator.set_travel_times(
+            self._travel_time_down, self._travel_time_up
+        )
+        if self._shadows is not None:
+            self._shadows.set_current_travel_times(
+                time.monotonic(), self._travel_time_down, self._travel_time_up
+            )
+
+    @callback
+    def _async_check_drift(self) -> None:
+        """Ask for a resync once the position uncertainty is too high."""
+        if (
+            self._resync_threshold
+            and self.travel_calculator.uncertainty >= self._resync_threshold
+        ):
+            async_get_runtime_data(self.hass).resync.async_request(self)
+
+    async def _async_handle_command(
+        self,
+        command: str,
+        priority: CommandPriority = CommandPriority.INTERACTIVE,
+        intent: int | None = None,
+    ) -> None:
+        """
+        Send a command to the remote entity, through its gateway queue.
+
+        The command is dropped if its intent has been superseded, here or
+        while it waits in the queue.
+        """
         if not command:
             _LOGGER.warning("No command specified for this action.")
             return
+        if intent is None:
+            intent = self._intent
+        elif intent != self._intent:
+            _LOGGER.debug("Dropping superseded command '%s'", command)
+            return
 
         _LOGGER.debug("Sending command '%s' to %s", command, self._remote_entity_id)
-        await self.hass.services.async_call(
-            "remote",
-            "send_command",
-            {"entity_id": self._remote_entity_id, "command": [command]},
-            blocking=False,
+        self.trace.record(
+            TraceEvent.COMMAND,
+            self.travel_calculator.estimated_position(),
+            command=self._trace_commands.get(command, TraceCommand.NONE),
+        )
+        self._gateway.async_send(
+            command,
+            priority,
+            {self.entity_id: intent},
+            self.delivery.repeats,
+            self._repeat_delay,
+        )
+
+    async def async_export_trace(self) -> dict[str, Any]:
+        """Service call to export the motion trace, replayed for consistency."""
+        return self.trace.as_dict(
+            self._travel_time_down, self._travel_time_up, self._tilt_time
+        )
+
+    async def async_position_history(
+        self,
+        start: datetime,
+        end: datetime | None = None,
+        interval: float = DEFAULT_HISTORY_INTERVAL,
+    ) -> dict[str, Any]:
+        """Service call to sample the positions over a past time range."""
+        try:
+            return sample_history(
+                self.travel_calculator.history,
+                start,
+                dt_util.utcnow() if end is None else end,
+                interval,
+            )
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+    async def async_correct_position(self, position: int) -> None:
+        """
+        Service call to set the position of a cover standing still.
+
+        The position is taken as the truth, and scores the shadow models.
+        """
+        if self.travel_calculator.is_moving():
+            raise ServiceValidationError(
+                f"{self.entity_id} is moving, its position cannot be corrected"
+            )
+        if self._shadows is not None:
+            self._shadows.observe(time.monotonic(), position)
+        self.travel_calculator.set_known_position(position)
+        self.trace.record(TraceEvent.KNOWN_POSITION, position, tilt=self._trace_tilt())
+        self._update_position_attributes()
+        self._update_motion_attributes()
+        self.async_write_ha_state()
+
+    async def async_start_shadow(self, candidates: list[dict[str, Any]]) -> None:
+        """
+        Service call to start evaluating alternative travel models.
+
+        The travel times left out of a candidate are the ones in use. Any
+        evaluation already running is replaced.
+        """
+        names = [candidate[ATTR_NAME] for candidate in candidates]
+        if CURRENT in names or len(set(names)) != len(names):
+            raise ServiceValidationError(
+                f"Candidate names must be unique, and not '{CURRENT}'"
+            )
+        self._shadows = ShadowEvaluator(
+            [
+                {
+                    CONF_TRAVELLING_TIME_DOWN: self._travel_time_down,
+                    CONF_TRAVELLING_TIME_UP: self._travel_time_up,
+                    **candidate,
+                }
+                for candidate in candidates
+            ],
+            self._travel_time_down,
+            self._travel_time_up,
+            self._tilt_time,
+            self.travel_calculator.estimated_position(),
+            self.travel_calculator.estimated_tilt(),
+        )
+        self._mirror_start(time.monotonic())
+
+    async def async_shadow_report(self) -> dict[str, Any]:
+        """Service call to report the accuracy of the shadow models."""
+        if self._shadows is None:
+            raise ServiceValidationError(f"No shadow models run for {self.entity_id}")
+        return {"leaderboard": self._shadows.leaderboard()}
+
+    async def async_promote_shadow(self, name: str | None = None) -> dict[str, Any]:
+        """
+        Service call to configure the travel times of a shadow model.
+
+        Without a name, the most accurate model is promoted. The options are
+        updated as the options flow would, which reloads the entry and ends
+        the evaluation. A latency is not promoted: it delays the stops as
+        much as the starts, so it never changes where the cover ends up.
+        """
+        leaderboard = (await self.async_shadow_report())["leaderboard"]
+        if name is None:
+            winner = leaderboard[0]
+            if winner["samples"] == 0:
+                raise ServiceValidationError(
+                    f"No ground truth observed for {self.entity_id} yet"
+                )
+        elif (
+            winner := next(
+                (entry for entry in leaderboard if entry[ATTR_NAME] == name), None
+            )
+        ) is None:
+            raise ServiceValidationError(f"No shadow model named {name}")
+        if winner[ATTR_NAME] == CURRENT:
+            raise ServiceValidationError(
+                f"The travel times in use are the most accurate for {self.entity_id}"
+            )
+        _LOGGER.info(
+            "Promoting the %s travel model of %s", winner[ATTR_NAME], self.entity_id
+        )
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            options={
+                **self.config_entry.options,
+                CONF_TRAVELLING_TIME_DOWN: winner[CONF_TRAVELLING_TIME_DOWN],
+                CONF_TRAVELLING_TIME_UP: winner[CONF_TRAVELLING_TIME_UP],
+            },
         )
+        return {"promoted": winner}
 
     @property
     def is_opening(self) -> bool | None:
@@ -0,0 +1,220 @@
+"""An always-on, fixed-memory trace of the motion and commands of a cover."""
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from enum import IntEnum
+from typing import Any, NamedTuple
+
+from .travelcalculator import TravelCalculator
+
+DEFAULT_CAPACITY = 512
+
+# Stored in the target column when the record has no target.
+NO_TARGET = -1
+
+
+class TraceEvent(IntEnum):
+    """What happened to the cover."""
+
+    KNOWN_POSITION = 0
+    START = 1
+    STOP = 2
+    ARRIVAL = 3
+    COMMAND = 4
+    # The start of a movement only turning the slats, to the target tilt.
+    TILT = 5
+
+
+class TraceCommand(IntEnum):
+    """Which of the configured commands was sent, if any."""
+
+    NONE = 0
+    OPEN = 1
+    CLOSE = 2
+    STOP = 3
+
+
+class TraceRecord(NamedTuple):
+    """One record of a trace, as read back from the ring buffer."""
+
+    monotonic_ns: int
+    event: TraceEvent
+    position: float
+    target: int | None
+    command: TraceCommand
+    remote: bool
+    # Only for covers with tilt.
+    tilt: float | None = None
+
+
+class MotionTrace:
+    """
+    A ring buffer of the most recent motion and command records of a cover.
+
+    The records are stored in preallocated arrays, one per column, so
+    recording allocates nothing and the memory used is fixed. The command
+    codes themselves are never stored, only which command was sent. The tilt
+    column holds NaN for covers without tilt.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize the trace."""
+        if capacity < 1:
+            raise ValueError("Trace capacity must be at least 1.")
+
+        self.capacity = capacity
+        self._time = array("q", bytes(8 * capacity))
+        self._event = array("B", bytes(capacity))
+        self._position = array("f", bytes(4 * capacity))
+        self._target = array("b", bytes(capacity))
+        self._command = array("B", bytes(capacity))
+        self._remote = array("B", bytes(capacity))
+        self._tilt = array("f", [math.nan]) * capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of records held."""
+        return self._count
+
+    def record(
+        self,
+        event: TraceEvent,
+        position: float,
+        target: int | None = None,
+        command: TraceCommand = TraceCommand.NONE,
+        remote: bool = False,
+        tilt: float | None = None,
+        monotonic_ns: int | None = None,
+    ) -> None:
+        """Record an event, overwriting the oldest record once full."""
+        index = self._head
+        self._time[index] = (
+            time.monotonic_ns() if monotonic_ns is None else monotonic_ns
+        )
+        self._event[index] = event
+        self._position[index] = position
+        self._target[index] = NO_TARGET if target is None else target
+        self._command[index] = command
+        self._remote[index] = remote
+        self._tilt[index] = math.nan if tilt is None else tilt
+        self._head = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def records(self) -> Iterator[TraceRecord]:
+        """Yield the records held, oldest first."""
+        start = (self._head - self._count) % self.capacity
+        for offset in range(self._count):
+            index = (start + offset) % self.capacity
+            target = self._target[index]
+            tilt = self._tilt[index]
+            yield TraceRecord(
+                self._time[index],
+                TraceEvent(self._event[index]),
+                self._position[index],
+                None if target == NO_TARGET else target,
+                TraceCommand(self._command[index]),
+                bool(self._remote[index]),
+                None if math.isnan(tilt) else tilt,
+            )
+
+    def as_dict(
+        self, travel_time_down: float, travel_time_up: float, tilt_time: float = 0.0
+    ) -> dict[str, Any]:
+        """Export the trace, with the result of replaying it, as plain data."""
+        records = list(self.records())
+        return {
+            "capacity": self.capacity,
+            "replay_deviation": round(
+                replay(records, travel_time_down, travel_time_up, tilt_time), 3
+            ),
+            "records": [_export_record(record) for record in records],
+        }
+
+
+def _export_record(record: TraceRecord) -> dict[str, Any]:
+    """Export a record as plain data, with its tilt only if it has one."""
+    data = {
+        "monotonic_ns": record.monotonic_ns,
+        "event": record.event.name.lower(),
+        "position": round(record.position, 3),
+        "target": record.target,
+        "command": record.command.name.lower() if record.command else None,
+        "remote": record.remote,
+    }
+    if record.tilt is not None:
+        data["tilt"] = round(record.tilt, 3)
+    return data
+
+
+def replay(
+    records: Iterable[TraceRecord],
+    travel_time_down: float,
+    travel_time_up: float,
+    tilt_time: float = 0.0,
+) -> float:
+    """
+    Replay a trace through a fresh TravelCalculator.
+
+    The calculator runs on the recorded times. It is seeded at the first
+    record where the cover was known to stand still, then the movements are
+    replayed and each recorded position, and tilt if any, is compared with
+    the replayed one. Returns the largest deviation, in percent; 0 means the
+    estimate was consistent over the whole trace.
+    """
+    now = 0.0
+    calculator = TravelCalculator(
+        travel_time_down, travel_time_up, clock=lambda: now, tilt_time=tilt_time
+    )
+    seeded = False
+    deviation = 0.0
+
+    for record in records:
+        now = record.monotonic_ns / 1e9
+        if record.event is TraceEvent.COMMAND:
+            continue
+        if not seeded or record.event is TraceEvent.KNOWN_POSITION:
+            seeded = _seed(calculator, record) or seeded
+            continue
+        deviation = max(deviation, _deviation(calculator, record))
+        _apply(calculator, record)
+
+    return deviation
+
+
+def _seed(calculator: TravelCalculator, record: TraceRecord) -> bool:
+    """
+    Make a calculator stand still where a record found the cover.
+
+    Returns False, without seeding, at the start of a movement: the cover
+    was already moving when the trace begins.
+    """
+    if record.event in (TraceEvent.START, TraceEvent.TILT):
+        return False
+    calculator.set_known_position(record.position)
+    if record.tilt is not None:
+        calculator.set_known_tilt(record.tilt)
+    return True
+
+
+def _deviation(calculator: TravelCalculator, record: TraceRecord) -> float:
+    """Return how far the replayed position, and tilt if any, are off a record."""
+    deviation = abs(calculator.estimated_position() - record.position)
+    if record.tilt is not None and calculator.supports_tilt:
+        deviation = max(deviation, abs(calculator.estimated_tilt() - record.tilt))
+    return deviation
+
+
+def _apply(calculator: TravelCalculator, record: TraceRecord) -> None:
+    """Replay the change of motion of a record."""
+    if record.event is TraceEvent.START and record.target is not None:
+        calculator.start_travel(record.target)
+    elif record.event is TraceEvent.TILT and record.target is not None:
+        calculator.start_tilt(record.target)
+    elif record.event is TraceEvent.STOP:
+        calculator.stop_travel()
+    elif record.event is TraceEvent.ARRIVAL:
+        calculator.finish_travel()
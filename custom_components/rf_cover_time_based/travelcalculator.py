@@ -2,7 +2,24 @@
 from __future__ import annotations
 
 import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .history import MotionHistory
+
+# Identifier of the motion model used to interpolate between start and target.
+PROFILE_LINEAR = "linear"
+# The slats turn first, then the cover travels linearly.
+PROFILE_TILT_FIRST = "tilt_first"
+
+# Growth of the position uncertainty, in percent: per percent travelled without
+# reaching an end stop, and per reversal of the direction of travel.
+UNCERTAINTY_PER_PERCENT = 0.02
+UNCERTAINTY_PER_REVERSAL = 1.0
 
 
 class TravelStatus(Enum):
@@ -13,29 +30,96 @@ class TravelStatus(Enum):
     CLOSING = "closing"
 
 
+@dataclass(frozen=True)
+class TravelPlan:
+    """
+    A snapshot of the current movement.
+
+    It holds everything a client needs to interpolate the position locally
+    between the start and the predicted arrival, without further updates.
+    """
+
+    start_position: float
+    target_position: int
+    start_time: float
+    arrival_time: float
+    speed: float
+    profile: str = PROFILE_LINEAR
+    # Only for covers with tilt: the slats turn from the start tilt to the
+    # target tilt during the first tilt_duration seconds.
+    start_tilt: float | None = None
+    target_tilt: int | None = None
+    tilt_duration: float = 0.0
+
+
+@dataclass(frozen=True)
+class TravelStep:
+    """One step of a sequence: travel to a target, then dwell before the next."""
+
+    target_position: int
+    dwell: float = 0.0
+
+
 class TravelCalculator:
     """
     A class to calculate the position of a cover based on travel time.
 
     This class is a pure Python implementation, making it easy to unit test
     independently of the Home Assistant event loop. It uses time.monotonic()
-    for reliable elapsed time measurement.
+    for reliable elapsed time measurement, unless another clock is given, for
+    example to replay a trace or to run in simulated time.
+
+    With a tilt time, it also follows the tilt of the slats of a venetian
+    blind, on the same motion timeline: a movement first turns the slats
+    all the way towards its direction, which takes the tilt time from one
+    end to the other, and only then does the cover travel. A tilt move
+    turns the slats without moving the cover.
+
+    With a history, every motion segment, and every stop, is also recorded
+    there, to tell where the cover was at any past time.
     """
 
-    def __init__(self, travel_time_down: float, travel_time_up: float):
+    def __init__(
+        self,
+        travel_time_down: float,
+        travel_time_up: float,
+        clock: Callable[[], float] | None = None,
+        tilt_time: float = 0.0,
+        history: MotionHistory | None = None,
+    ):
         """Initialize the travel calculator."""
         # Add validation to ensure travel times are not negative.
         # This makes the class more robust against invalid configuration by
         # failing early and clearly if provided with nonsensical data.
-        if travel_time_down < 0 or travel_time_up < 0:
+        if travel_time_down < 0 or travel_time_up < 0 or tilt_time < 0:
             raise ValueError("Travel time cannot be negative.")
 
         self._travel_time_down = travel_time_down
         self._travel_time_up = travel_time_up
+        self._tilt_time = tilt_time
+        self._clock = clock
+        self.history = history
+        # Where the cover stands, or stood when last evaluated while moving.
         self._position: float = 100.0
         self._target_position: int = 100
+        self._tilt: float = 100.0
+        self._target_tilt: int = 100
+        # Whether the current movement only turns the slats.
+        self._tilt_only = False
         self._travel_status = TravelStatus.STOPPED
-        self._last_update_time = time.monotonic()
+        # The immutable motion segment of the current movement, None if
+        # stopped. Positions are evaluated from it in closed form.
+        self._segment: TravelPlan | None = None
+        self._sequence: deque[TravelStep] = deque()
+        self._sequence_step: TravelStep | None = None
+        self._sequence_length = 0
+        self._uncertainty = 0.0
+        self._last_direction: TravelStatus | None = None
+
+    def _now(self) -> float:
+        """Return the current time of the calculator's clock."""
+        # time.monotonic() is looked up on every call, so it can be frozen.
+        return self._clock() if self._clock else time.monotonic()
 
     @property
     def _current_travel_time(self) -> float:
@@ -44,31 +128,170 @@ class TravelCalculator:
             return self._travel_time_up
         return self._travel_time_down
 
-    def set_known_position(self, position: int) -> None:
+    def set_travel_times(self, travel_time_down: float, travel_time_up: float) -> None:
+        """
+        Change the travel times without losing the current position.
+
+        A movement in progress continues from where it is, at the new speed.
+        """
+        if travel_time_down < 0 or travel_time_up < 0:
+            raise ValueError("Travel time cannot be negative.")
+
+        now = self._now()
+        self._update_to(now)
+        self._travel_time_down = travel_time_down
+        self._travel_time_up = travel_time_up
+        if self.is_moving():
+            # A movement yet to start keeps its start time.
+            self._begin_segment(max(now, self._segment.start_time))
+
+    def set_known_position(self, position: float) -> None:
         """Set the current position of the cover without initiating travel."""
         self._position = float(position)
-        self._target_position = position
+        self._target_position = round(position)
         self._travel_status = TravelStatus.STOPPED
+        self._segment = None
+        self._tilt_only = False
+        self._uncertainty = 0.0
+        self._record_stop(self._now())
 
-    def start_travel(self, target_position: int) -> TravelStatus | None:
+    def set_known_tilt(self, tilt: float) -> None:
+        """Set the current tilt of the slats, for a cover standing still."""
+        self._tilt = float(tilt)
+        self._target_tilt = round(tilt)
+
+    def start_travel(
+        self, target_position: int, delay: float = 0.0
+    ) -> TravelStatus | None:
         """
-        Start traveling to a new position.
+        Start traveling to a new position, delay seconds from now.
 
-        Returns the direction of travel or None if no travel is needed.
+        Until the delay is over, the cover waits where it is. Returns the
+        direction of travel or None if no travel is needed.
         """
-        self.update_position()
+        now = self._now()
+        self._update_to(now)
         if target_position == self.current_position():
             return None
 
         self._target_position = target_position
-        self._travel_status = (
+        self._start(
+            now + delay,
             TravelStatus.OPENING
             if target_position > self._position
-            else TravelStatus.CLOSING
+            else TravelStatus.CLOSING,
+        )
+
+        # Every movement adds to the uncertainty, and so does the backlash of
+        # a reversal. Only reaching an end stop clears it, see _arrive().
+        if self._last_direction not in (None, self._travel_status):
+            self._uncertainty += UNCERTAINTY_PER_REVERSAL
+        self._uncertainty += (
+            abs(target_position - self._position) * UNCERTAINTY_PER_PERCENT
+        )
+        self._last_direction = self._travel_status
+        return self._travel_status
+
+    def start_tilt(self, target_tilt: int, delay: float = 0.0) -> TravelStatus | None:
+        """
+        Start turning the slats to a new tilt, without moving the cover.
+
+        Like start_travel(), the movement can start delay seconds from now.
+        Returns the direction of travel or None if no travel is needed.
+        """
+        now = self._now()
+        self._update_to(now)
+        if target_tilt == self.current_tilt():
+            return None
+
+        self._target_position = self.current_position()
+        self._start(
+            now + delay,
+            TravelStatus.OPENING if target_tilt > self._tilt else TravelStatus.CLOSING,
+            target_tilt,
         )
-        self._last_update_time = time.monotonic()
         return self._travel_status
 
+    def _start(
+        self, start: float, direction: TravelStatus, target_tilt: int | None = None
+    ) -> None:
+        """Start moving, turning the slats to a tilt only if one is given."""
+        self._travel_status = direction
+        self._tilt_only = target_tilt is not None
+        if target_tilt is None:
+            # The slats turn all the way before the cover travels.
+            target_tilt = 100 if direction is TravelStatus.OPENING else 0
+        self._target_tilt = target_tilt
+        self._begin_segment(start)
+
+    def travel_duration(
+        self, target_position: int | None = None, target_tilt: int | None = None
+    ) -> float:
+        """
+        Return how long a movement started now would take, without starting it.
+
+        The movement goes to the target position or, when only a target tilt
+        is given, turns the slats to it.
+        """
+        now = self._now()
+        position, tilt = self.position_at(now), self.tilt_at(now)
+        if target_position is None:
+            opening = target_tilt > tilt
+            distance = 0.0
+        else:
+            opening = target_position > position
+            distance = abs(target_position - position)
+            target_tilt = 100 if opening else 0
+        travel_time = self._travel_time_up if opening else self._travel_time_down
+        tilt_duration = (
+            abs(target_tilt - tilt) / 100 * self._tilt_time
+            if self.supports_tilt
+            else 0.0
+        )
+        return tilt_duration + distance / 100 * travel_time
+
+    def _begin_segment(self, now: float) -> None:
+        """
+        Start the motion segment from the current position and tilt.
+
+        The segment starts at the given time, which may be in the future.
+        """
+        distance = 0.0 if self._tilt_only else self._target_position - self._position
+        travel_time = self._current_travel_time
+        speed = 0.0 if travel_time == 0 or distance == 0 else 100 / travel_time
+        tilt_duration = (
+            abs(self._target_tilt - self._tilt) / 100 * self._tilt_time
+            if self.supports_tilt
+            else 0.0
+        )
+        self._segment = TravelPlan(
+            start_position=self._position,
+            target_position=self._target_position,
+            start_time=now,
+            arrival_time=now + tilt_duration + abs(distance) / 100 * travel_time,
+            speed=speed if distance > 0 else -speed,
+            profile=PROFILE_TILT_FIRST if tilt_duration else PROFILE_LINEAR,
+            start_tilt=self._tilt if self.supports_tilt else None,
+            target_tilt=self._target_tilt if self.supports_tilt else None,
+            tilt_duration=tilt_duration,
+        )
+        if self.history is not None:
+            segment = self._segment
+            self.history.append(
+                now,
+                segment.start_position,
+                segment.speed,
+                segment.target_position,
+                tilt_duration,
+            )
+
+    def _record_stop(self, now: float) -> None:
+        """Record in the history that the cover stands still from now on."""
+        if self.history is not None:
+            # Drop the segment of a movement stopped before it started.
+            self.history.truncate(now)
+            self.history.append(now, self._position)
+
     def stop_travel(self) -> bool:
         """
         Stop the cover's movement.
@@ -76,47 +299,184 @@ class TravelCalculator:
         Returns True if the cover was moving, False otherwise.
         """
         was_moving = self.is_moving()
-        self.update_position()
+        now = self._now()
+        self._update_to(now)
+        if was_moving:
+            self._record_stop(now)
         self._travel_status = TravelStatus.STOPPED
+        self._segment = None
+        self._tilt_only = False
         self._target_position = self.current_position()
+        self._target_tilt = self.current_tilt()
         return was_moving
 
+    def finish_travel(self) -> int:
+        """
+        Mark the cover as arrived at its target, as predicted by the plan.
+
+        Returns the target position.
+        """
+        if not self._tilt_only:
+            self._position = float(self._target_position)
+            self._record_stop(self._now())
+        self._tilt = float(self._target_tilt)
+        self._arrive()
+        return self._target_position
+
     def update_position(self) -> bool:
         """
-        Update the cover's position based on elapsed time.
+        Update the cover's position to now.
 
-        Returns True if the cover is still moving, False if it has stopped.
+        The position is evaluated from the motion segment, not accumulated,
+        so it is exact however often, or rarely, this is called. Returns True
+        if the cover is still moving, False if it has stopped.
         """
+        return self._update_to(self._now())
+
+    def _update_to(self, now: float) -> bool:
+        """Update the cover's position to a time, see update_position()."""
         if not self.is_moving():
             return False
 
-        now = time.monotonic()
-        elapsed_time = now - self._last_update_time
-        self._last_update_time = now
+        self._position = self.position_at(now)
+        self._tilt = self.tilt_at(now)
 
-        travel_time = self._current_travel_time
-        if travel_time == 0:
-            # Avoid division by zero if travel time is not set
-            self._position = float(self._target_position)
-        else:
-            position_change = (elapsed_time / travel_time) * 100
-            if self.is_opening():
-                new_position = self._position + position_change
-                self._position = min(new_position, self._target_position)
-            else:  # Closing
-                new_position = self._position - position_change
-                self._position = max(new_position, self._target_position)
-
-        if self.current_position() == self._target_position:
-            self._travel_status = TravelStatus.STOPPED
+        if (
+            self.current_tilt() == self._target_tilt
+            if self._tilt_only
+            else self.current_position() == self._target_position
+        ):
+            self._arrive()
             return False
 
         return True
 
+    def position_at(self, when: float) -> float:
+        """
+        Return the position at a time on the calculator's clock.
+
+        This is a pure, constant-time evaluation of the current motion
+        segment: the slats turn first, then the cover travels at a constant
+        speed until the target. It changes nothing, so any caller can read
+        the position at any time, without ticking.
+        """
+        segment = self._segment
+        if segment is None:
+            return self._position
+        if self._tilt_only or when <= segment.start_time + segment.tilt_duration:
+            return segment.start_position
+        if when >= segment.arrival_time:
+            return float(segment.target_position)
+        return segment.start_position + segment.speed * (
+            when - segment.start_time - segment.tilt_duration
+        )
+
+    def tilt_at(self, when: float) -> float:
+        """Return the tilt at a time on the calculator's clock, like position_at."""
+        segment = self._segment
+        if segment is None or segment.start_tilt is None:
+            return self._tilt
+        elapsed = when - segment.start_time
+        if elapsed >= segment.tilt_duration:
+            return float(segment.target_tilt)
+        turned = max(elapsed, 0.0) / self._tilt_time * 100
+        if segment.target_tilt > segment.start_tilt:
+            return segment.start_tilt + turned
+        return segment.start_tilt - turned
+
+    def travel_plan(self) -> TravelPlan | None:
+        """
+        Return the plan of the current movement, or None if stopped.
+
+        The times are on the calculator's clock, time.monotonic() by default.
+        Speed is expressed in percent per second and is signed by the direction
+        of travel.
+        """
+        return self._segment
+
+    def time_remaining(self) -> float:
+        """Return the seconds left until the target is reached, 0 if stopped."""
+        if (plan := self.travel_plan()) is None:
+            return 0.0
+        return max(plan.arrival_time - self._now(), 0.0)
+
+    def estimated_position(self) -> float:
+        """
+        Return the position extrapolated to now, without updating any state.
+
+        This is meant for readers outside the updater, such as live streams.
+        """
+        return self.position_at(self._now())
+
+    def estimated_tilt(self) -> float:
+        """Return the tilt extrapolated to now, without updating any state."""
+        return self.tilt_at(self._now())
+
+    def start_sequence(self, steps: Iterable[TravelStep]) -> None:
+        """
+        Queue a sequence of steps, replacing any sequence already queued.
+
+        The steps are consumed one by one with advance_sequence().
+        """
+        self._sequence = deque(steps)
+        self._sequence_length = len(self._sequence)
+        self._sequence_step = None
+
+    def advance_sequence(self) -> TravelStep | None:
+        """Make the next queued step the current one and return it."""
+        self._sequence_step = self._sequence.popleft() if self._sequence else None
+        if self._sequence_step is None:
+            self._sequence_length = 0
+        return self._sequence_step
+
+    def cancel_sequence(self) -> None:
+        """Drop the running sequence, if any."""
+        self._sequence.clear()
+        self._sequence_step = None
+        self._sequence_length = 0
+
+    @property
+    def sequence_step(self) -> TravelStep | None:
+        """Return the current step of the running sequence."""
+        return self._sequence_step
+
+    def sequence_progress(self) -> tuple[int, int] | None:
+        """Return the current step number (1-based) and the total, if running."""
+        if self._sequence_step is None:
+            return None
+        return self._sequence_length - len(self._sequence), self._sequence_length
+
+    def _arrive(self) -> None:
+        """Stop at the target. An end stop confirms the position physically."""
+        self._travel_status = TravelStatus.STOPPED
+        self._segment = None
+        if not self._tilt_only and self._target_position in (0, 100):
+            self._uncertainty = 0.0
+            self._last_direction = None
+
+    @property
+    def uncertainty(self) -> float:
+        """Return the bound of the accumulated position error, in percent."""
+        return self._uncertainty
+
     def current_position(self) -> int:
         """Return the current calculated position."""
         return round(self._position)
 
+    @property
+    def supports_tilt(self) -> bool:
+        """Return if the tilt of the slats is followed."""
+        return self._tilt_time > 0
+
+    def current_tilt(self) -> int:
+        """Return the current calculated tilt of the slats."""
+        return round(self._tilt)
+
+    @property
+    def tilt_only(self) -> bool:
+        """Return if the current, or last finished, movement only turns the slats."""
+        return self._tilt_only
+
     def is_moving(self) -> bool:
         """Return if the cover is currently moving."""
         return self._travel_status != TravelStatus.STOPPED
@@ -0,0 +1,134 @@
+"""Websocket API for the RF Cover Time Based integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_HISTORY_INTERVAL, DOMAIN
+from .history import sample_history
+from .runtime import async_get_runtime_data
+from .travelcalculator import TravelCalculator
+
+# Bounds for the client-chosen streaming interval, in seconds.
+MIN_STREAM_INTERVAL = 0.02
+MAX_STREAM_INTERVAL = 60.0
+DEFAULT_STREAM_INTERVAL = 0.1
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, ws_subscribe_motion)
+    websocket_api.async_register_command(hass, ws_position_history)
+
+
+def _motion_frame(calculator: TravelCalculator) -> tuple[float, str]:
+    """Return a compact (position, status) frame for a calculator."""
+    if calculator.is_opening():
+        status = "o"
+    elif calculator.is_closing():
+        status = "c"
+    else:
+        status = "s"
+    return round(calculator.estimated_position(), 1), status
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_motion",
+        vol.Required("entity_ids"): cv.entity_ids,
+        vol.Optional("interval", default=DEFAULT_STREAM_INTERVAL): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=MIN_STREAM_INTERVAL, max=MAX_STREAM_INTERVAL),
+        ),
+    }
+)
+@callback
+def ws_subscribe_motion(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Stream position frames for a set of covers.
+
+    Frames are read straight from the travel calculators and never go
+    through the state machine, so they do not reach the recorder or logbook.
+    Each event only carries the covers whose frame changed since the last one,
+    as {"frames": {entity_id: [position, status]}}, with status being "o"
+    (opening), "c" (closing) or "s" (stopped).
+    """
+    runtime_data = async_get_runtime_data(hass)
+    entity_ids: list[str] = msg["entity_ids"]
+    last_frames: dict[str, tuple[float, str]] = {}
+
+    @callback
+    def _async_send_frames(*args: Any) -> None:
+        """Send the frames that changed since the previous message."""
+        frames: dict[str, tuple[float, str]] = {}
+        for entity_id in entity_ids:
+            if (cover := runtime_data.covers.get(entity_id)) is None:
+                continue
+            frame = _motion_frame(cover.travel_calculator)
+            if last_frames.get(entity_id) != frame:
+                last_frames[entity_id] = frames[entity_id] = frame
+
+        if frames:
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"frames": frames})
+            )
+
+    connection.subscriptions[msg["id"]] = async_track_time_interval(
+        hass, _async_send_frames, timedelta(seconds=msg["interval"])
+    )
+    connection.send_result(msg["id"])
+    _async_send_frames()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/position_history",
+        vol.Required("entity_ids"): cv.entity_ids,
+        vol.Required("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("interval", default=DEFAULT_HISTORY_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_STREAM_INTERVAL)
+        ),
+    }
+)
+@callback
+def ws_position_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Sample the past positions of a set of covers over a time range.
+
+    The positions are evaluated from the motion history of each cover, the
+    same instants for all of them, as {"history": {entity_id: {"start",
+    "interval", "positions"}}}. A position is None before the history of
+    its cover begins; covers without a history are left out.
+    """
+    runtime_data = async_get_runtime_data(hass)
+    end = msg.get("end", dt_util.utcnow())
+    history: dict[str, dict[str, Any]] = {}
+    try:
+        for entity_id in msg["entity_ids"]:
+            if (cover := runtime_data.covers.get(entity_id)) is None:
+                continue
+            history[entity_id] = sample_history(
+                cover.travel_calculator.history, msg["start"], end, msg["interval"]
+            )
+    except ValueError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, str(err))
+        return
+    connection.send_result(msg["id"], {"history": history})
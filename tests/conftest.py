@@ -1,13 +1,16 @@
 """Global fixtures for rf_cover_time_based tests."""
+from typing import Any
 from unittest.mock import patch
 
 import pytest
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_registry import async_get
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 # Import test constants from the same directory.
 # All imports should be at the top of the file to resolve the E402 error.
-from .const import MOCK_CONFIG, MOCK_CONFIG_AWNING
+from .const import MOCK_CONFIG, MOCK_CONFIG_AWNING, SetupCover
 
 
 # This fixture is used to prevent Home Assistant from attempting to create
@@ -86,3 +89,29 @@ async def init_awning_integration(
 
     # Return the mock entry for use in tests
     return entry
+
+
+@pytest.fixture
+def setup_cover(hass: HomeAssistant) -> SetupCover:
+    """Return a factory setting up a cover from a config and some options."""
+
+    async def _setup_cover(
+        entry_id: str = "test-shutter",
+        config: dict[str, Any] = MOCK_CONFIG,
+        **options: Any,
+    ) -> str:
+        """Set up a cover titled after its entry, and return its entity_id."""
+        entry = MockConfigEntry(
+            domain="rf_cover_time_based",
+            title=entry_id,
+            data={**config, **options},
+            entry_id=entry_id,
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        return async_get(hass).async_get_entity_id(
+            COVER_DOMAIN, "rf_cover_time_based", entry_id
+        )
+
+    return _setup_cover
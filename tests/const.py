@@ -1,4 +1,8 @@
 """Constants for rf_cover_time_based tests."""
+from collections.abc import Awaitable, Callable
+
+# The setup_cover fixture: sets up a cover and returns its entity_id.
+SetupCover = Callable[..., Awaitable[str]]
 
 MOCK_CONFIG = {
     "name": "Test Shutter",
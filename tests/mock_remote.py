@@ -0,0 +1,205 @@
+"""
+A mock remote platform emulating RF gateways, for load and latency tests.
+
+Each MockGateway is a real remote entity, set up through the remote
+integration, so commands take the same path as with actual hardware. A
+transmission lasts a configurable time, a limited number of them can be on
+air at once, each burst can be lost at random, and the gateway can become
+unavailable now and then. The gateway drives MockMotor models bound to its
+command codes, so tests can compare the positions the covers believe in with
+where the motors actually are.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.remote import (
+    ATTR_DELAY_SECS,
+    ATTR_NUM_REPEATS,
+    DEFAULT_DELAY_SECS,
+    DEFAULT_NUM_REPEATS,
+    RemoteEntity,
+)
+from homeassistant.components.remote import DOMAIN as REMOTE_DOMAIN
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockPlatform, mock_platform
+
+MOCK_PLATFORM = "mock_gateway"
+
+ACTIONS = {"open": 1, "close": -1, "stop": 0}
+
+
+@dataclass
+class MockMotor:
+    """A physical motor, moved only by the commands it receives."""
+
+    travel_time_down: float = 10.0
+    travel_time_up: float = 10.0
+    position: float = 100.0
+    direction: int = 0
+    since: float = 0.0
+    received: int = 0
+
+    def advance(self, now: float) -> None:
+        """Move the motor up to now, stopping at the end stops."""
+        travel_time = (
+            self.travel_time_up if self.direction > 0 else self.travel_time_down
+        )
+        moved = self.direction * (now - self.since) * 100 / travel_time
+        # Rounded so that float errors do not keep it off the end stops.
+        self.position = round(min(max(self.position + moved, 0.0), 100.0), 3)
+        if self.position == (0.0 if self.direction < 0 else 100.0):
+            self.direction = 0
+        self.since = now
+
+    def apply(self, direction: int, now: float) -> None:
+        """Start or stop the motor, as a received command does."""
+        self.advance(now)
+        self.direction = direction
+        self.received += 1
+
+
+class MockGateway(RemoteEntity):
+    """A remote entity emulating an RF gateway with realistic contention."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        name: str,
+        transmit_time: float = 0.0,
+        max_concurrent: int = 1,
+        drop_probability: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the gateway."""
+        self._attr_name = name
+        self._attr_unique_id = name
+        self._attr_is_on = True
+        self.transmit_time = transmit_time
+        self.drop_probability = drop_probability
+        self._random = random.Random(seed)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._codes: dict[str, tuple[MockMotor, int]] = {}
+        self._on_air = 0
+        # Statistics of the run.
+        self.bursts = 0
+        self.dropped = 0
+        self.landed = 0
+        self.peak_on_air = 0
+        self.airtime = 0.0
+
+    @callback
+    def async_bind(
+        self, motor: MockMotor, open_code: str, close_code: str, stop_code: str
+    ) -> None:
+        """Let the commands of a cover drive a motor."""
+        for code, action in zip(
+            (open_code, close_code, stop_code), ("open", "close", "stop")
+        ):
+            self._codes[code] = (motor, ACTIONS[action])
+
+    @callback
+    def async_set_available(self, available: bool) -> None:
+        """Make the gateway go away or come back."""
+        self._attr_available = available
+        self.async_write_ha_state()
+
+    @callback
+    def async_flap(self, period: float, downtime: float) -> CALLBACK_TYPE:
+        """Drop off for downtime seconds every period, until cancelled."""
+        cancel_back: CALLBACK_TYPE | None = None
+
+        @callback
+        def _go_down(*_: Any) -> None:
+            nonlocal cancel_back
+            self.async_set_available(False)
+            cancel_back = async_call_later(self.hass, downtime, _come_back)
+
+        @callback
+        def _come_back(*_: Any) -> None:
+            self.async_set_available(True)
+
+        cancel_interval = async_track_time_interval(
+            self.hass, _go_down, timedelta(seconds=period)
+        )
+
+        @callback
+        def _cancel() -> None:
+            cancel_interval()
+            if cancel_back is not None:
+                cancel_back()
+            self.async_set_available(True)
+
+        return _cancel
+
+    async def async_send_command(self, command: Iterable[str], **kwargs: Any) -> None:
+        """Transmit the commands, each burst taking the transmit time."""
+        num_repeats = kwargs.get(ATTR_NUM_REPEATS, DEFAULT_NUM_REPEATS)
+        delay = kwargs.get(ATTR_DELAY_SECS, DEFAULT_DELAY_SECS)
+        async with self._slots:
+            self._on_air += 1
+            self.peak_on_air = max(self.peak_on_air, self._on_air)
+            try:
+                for code in command:
+                    for repeat in range(num_repeats):
+                        if repeat:
+                            await asyncio.sleep(delay)
+                        await self._async_burst(code)
+            finally:
+                self._on_air -= 1
+
+    async def _async_burst(self, code: str) -> None:
+        """Send one burst of a code, which reaches its motor unless lost."""
+        if self.transmit_time:
+            await asyncio.sleep(self.transmit_time)
+        self.bursts += 1
+        self.airtime += self.transmit_time
+        if self._random.random() < self.drop_probability:
+            self.dropped += 1
+            return
+        self.landed += 1
+        if (bound := self._codes.get(code)) is not None:
+            motor, direction = bound
+            motor.apply(direction, time.monotonic())
+
+
+async def async_setup_mock_gateways(
+    hass: HomeAssistant, gateways: list[MockGateway]
+) -> None:
+    """Add mock gateways as remote entities, through the remote integration."""
+
+    async def async_setup_platform(
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        async_add_entities: AddEntitiesCallback,
+        discovery_info: Any = None,
+    ) -> None:
+        async_add_entities(gateways)
+
+    mock_platform(
+        hass,
+        f"{MOCK_PLATFORM}.{REMOTE_DOMAIN}",
+        MockPlatform(async_setup_platform=async_setup_platform),
+    )
+    assert await async_setup_component(hass, REMOTE_DOMAIN, {})
+    # The remote integration may be set up already, as a dependency.
+    await hass.data[REMOTE_DOMAIN].async_setup_platform(
+        MOCK_PLATFORM, {"platform": MOCK_PLATFORM}
+    )
+    await hass.async_block_till_done()
+
+
+def position_error(cover: Any, motor: MockMotor) -> float:
+    """Return how far the position a cover believes in is from its motor's."""
+    motor.advance(time.monotonic())
+    return abs(cover.travel_calculator.estimated_position() - motor.position)
@@ -0,0 +1,163 @@
+"""Test the transmit backends, and measure their overhead per command."""
+import json
+import logging
+import time
+
+import pytest
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import SERVICE_CLOSE_COVER
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_CALL_SERVICE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+)
+from pytest_homeassistant_custom_component.typing import MqttMockHAClient
+
+from custom_components.rf_cover_time_based.backends import (
+    EntityBackend,
+    MqttBackend,
+    ServiceCallBackend,
+    TransmitBackend,
+)
+from custom_components.rf_cover_time_based.const import DOMAIN, EVENT_COMMAND_SENT
+from tests.const import MOCK_CONFIG, SetupCover
+from tests.mock_remote import MockGateway, MockMotor, async_setup_mock_gateways
+
+_LOGGER = logging.getLogger(__name__)
+
+TOPIC = "home/OpenMQTTGateway/commands/MQTTto433"
+BENCHMARK_COMMANDS = 200
+
+
+async def test_entity_backend(hass: HomeAssistant, setup_cover: SetupCover) -> None:
+    """Test that commands reach the entity without any service call."""
+    gateway = MockGateway("Test Gateway")
+    await async_setup_mock_gateways(hass, [gateway])
+    motor = MockMotor()
+    gateway.async_bind(motor, "b64:open_code", "b64:close_code", "b64:stop_code")
+    entity_id = await setup_cover(
+        "test-entity", remote_entity=gateway.entity_id, transmit_backend="entity"
+    )
+    service_calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+    sent = async_capture_events(hass, EVENT_COMMAND_SENT)
+    cover = hass.data[DOMAIN].covers[entity_id]
+
+    await cover.async_close_cover()
+    await hass.async_block_till_done()
+
+    assert gateway.landed == 1
+    assert motor.direction == -1
+    assert service_calls == []
+    # Nothing reaches the bus or the recorder outside of a recording.
+    assert sent == []
+
+    # While recording, the calibration still finds the commands.
+    await hass.services.async_call(
+        DOMAIN, "record_commands", {"duration": 60}, blocking=True
+    )
+    await cover.async_stop_cover()
+    await hass.async_block_till_done()
+    assert [event.data for event in sent] == [
+        {"entity_id": gateway.entity_id, "command": "b64:stop_code"}
+    ]
+    await hass.services.async_call(
+        DOMAIN, "record_commands", {"duration": 0}, blocking=True
+    )
+    await cover.async_close_cover()
+    await hass.async_block_till_done()
+    assert gateway.landed == 3
+    assert len(sent) == 1
+
+    # The entity is looked up again once it is gone.
+    backend = hass.data[DOMAIN].gateways[gateway.entity_id].backend
+    assert isinstance(backend, EntityBackend)
+    await gateway.async_remove()
+    assert backend._entity is None
+
+
+async def test_mqtt_backend(
+    hass: HomeAssistant, mqtt_mock: MqttMockHAClient, setup_cover: SetupCover
+) -> None:
+    """Test that commands are published, with the repetitions they need."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover(
+        "test-mqtt", transmit_backend="mqtt", mqtt_topic=TOPIC
+    )
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await hass.async_block_till_done()
+    mqtt_mock.async_publish.assert_called_once_with(TOPIC, "b64:close_code", 0, False)
+
+    # An OpenMQTTGateway payload is published once, repeated by the gateway.
+    mqtt_mock.async_publish.reset_mock()
+    backend = MqttBackend(hass, MOCK_CONFIG["remote_entity"], TOPIC)
+    await backend.async_send('{"value": 1315156, "protocol": 1}', 2, 0.0)
+    (topic, payload, _, _), _ = mqtt_mock.async_publish.call_args
+    assert topic == TOPIC
+    assert json.loads(payload) == {"value": 1315156, "protocol": 1, "repeat": 3}
+
+    # Any other code is published once per repetition.
+    mqtt_mock.async_publish.reset_mock()
+    await backend.async_send("b64:close_code", 1, 0.0)
+    assert mqtt_mock.async_publish.call_count == 2
+
+
+async def test_backend_overhead(
+    hass: HomeAssistant, mqtt_mock: MqttMockHAClient
+) -> None:
+    """Measure the time each backend spends on a command, besides airtime."""
+    gateway = MockGateway("Bench Gateway")
+    await async_setup_mock_gateways(hass, [gateway])
+    backends: list[TransmitBackend] = [
+        ServiceCallBackend(hass, gateway.entity_id),
+        EntityBackend(hass, gateway.entity_id),
+        MqttBackend(hass, gateway.entity_id, TOPIC),
+    ]
+    service_calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    for backend in backends:
+        before = len(service_calls)
+        started = time.perf_counter()
+        for _ in range(BENCHMARK_COMMANDS):
+            await backend.async_send("b64:close_code", 0, 0.0)
+        overhead = (time.perf_counter() - started) / BENCHMARK_COMMANDS
+        _LOGGER.info("%s backend: %.1f µs per command", backend.name, overhead * 1e6)
+        if backend.name == "service":
+            assert len(service_calls) - before == BENCHMARK_COMMANDS
+        else:
+            assert len(service_calls) == before
+
+    assert gateway.landed == 2 * BENCHMARK_COMMANDS
+    assert mqtt_mock.async_publish.call_count == BENCHMARK_COMMANDS
+
+
+async def test_cover_picks_backend(
+    hass: HomeAssistant, setup_cover: SetupCover
+) -> None:
+    """Test that the service backend stays the default."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("test-service")
+    service_calls = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert isinstance(
+        hass.data[DOMAIN].gateways[MOCK_CONFIG["remote_entity"]].backend,
+        ServiceCallBackend,
+    )
+    assert [call.data["domain"] for call in service_calls] == ["cover", "remote"]
+
+
+async def test_backend_needs_async_send(hass: HomeAssistant) -> None:
+    """Test that a backend without async_send cannot be created."""
+
+    class IncompleteBackend(TransmitBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteBackend(hass, MOCK_CONFIG["remote_entity"])
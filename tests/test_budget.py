@@ -0,0 +1,101 @@
+"""Test the write budget shared by the moving covers."""
+from collections import Counter
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import (
+    SERVICE_CLOSE_COVER,
+    SERVICE_STOP_COVER,
+)
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from tests.const import MOCK_CONFIG
+
+COVERS = 20
+BUDGET = 20
+
+
+async def _run_for(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: float
+) -> None:
+    """Let time pass, one update interval at a time."""
+    for _ in range(round(seconds * 10)):
+        freezer.tick(timedelta(seconds=0.1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+
+def _writes(events: list[Event], entity_ids: list[str]) -> Counter[str]:
+    """Count the state writes of each cover."""
+    return Counter(
+        event.data["entity_id"]
+        for event in events
+        if event.data["entity_id"] in entity_ids
+    )
+
+
+async def test_budget_shared_fairly(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that the writes stay within budget, however many covers move."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_ids = []
+    for index in range(COVERS):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            # A single cover asking for a budget sets it for all of them.
+            data={**MOCK_CONFIG, "write_budget": BUDGET if index == 0 else 0},
+            entry_id=f"budget-{index}",
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+        entity_ids.append(
+            async_get(hass).async_get_entity_id(COVER_DOMAIN, DOMAIN, entry.entry_id)
+        )
+    await hass.async_block_till_done()
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    # The start of every movement is published at once.
+    assert _writes(events, entity_ids) == Counter(entity_ids)
+
+    events.clear()
+    await _run_for(hass, freezer, 5)
+    writes = _writes(events, entity_ids)
+    # 10 writes per second each without a budget; here 1 per second each.
+    assert sum(writes.values()) <= BUDGET * 5
+    assert set(writes.values()) <= {4, 5, 6}
+
+    # Half the covers stop, at once, and the others publish twice as often.
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_STOP_COVER,
+        {ATTR_ENTITY_ID: entity_ids[::2]},
+        blocking=True,
+    )
+    assert _writes(events, entity_ids[::2]) == Counter(
+        {entity_id: writes[entity_id] + 1 for entity_id in entity_ids[::2]}
+    )
+    events.clear()
+    await _run_for(hass, freezer, 2)
+    writes = _writes(events, entity_ids)
+    assert sum(writes.values()) <= BUDGET * 2
+    assert set(writes.values()) <= {3, 4, 5}
+    assert set(writes) <= set(entity_ids[1::2])
+
+    # The arrivals are published at once too.
+    await _run_for(hass, freezer, 4)
+    for entity_id in entity_ids[1::2]:
+        assert hass.states.get(entity_id).state == "closed"
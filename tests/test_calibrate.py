@@ -0,0 +1,293 @@
+"""Test the offline travel-time calibration."""
+
+import json
+import math
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from custom_components.rf_cover_time_based.calibrate import (
+    CLOSING,
+    OPENING,
+    Estimate,
+    calibrate,
+    load_covers,
+    main,
+    suggestions,
+)
+from custom_components.rf_cover_time_based.const import DOMAIN, EVENT_COMMAND_SENT
+from tests.const import MOCK_CONFIG
+
+REMOTE = MOCK_CONFIG["remote_entity"]
+
+SENSORS = {
+    "cover.both": {
+        "closed_sensor": "binary_sensor.both_closed",
+        "open_sensor": "binary_sensor.both_open",
+    },
+    "cover.closed_only": {
+        "closed_sensor": "binary_sensor.closed_only",
+        "closed_state": "off",
+    },
+}
+
+
+def _write_config_dir(config_dir: Path) -> None:
+    """Write the config entries and entity registry of two covers."""
+    storage = config_dir / ".storage"
+    storage.mkdir()
+    entries = []
+    entities = []
+    for name in ("both", "closed_only"):
+        entries.append(
+            {
+                "entry_id": name,
+                "domain": DOMAIN,
+                "data": {},
+                "options": {
+                    **MOCK_CONFIG,
+                    "open_command": f"{name}_open",
+                    "close_command": f"{name}_close",
+                    "stop_command": f"{name}_stop",
+                },
+            }
+        )
+        entities.append(
+            {
+                "entity_id": f"cover.{name}",
+                "platform": DOMAIN,
+                "config_entry_id": name,
+            }
+        )
+    entries.append({"entry_id": "other", "domain": "light", "data": {}, "options": {}})
+    (storage / "core.config_entries").write_text(
+        json.dumps({"data": {"entries": entries}})
+    )
+    (storage / "core.entity_registry").write_text(
+        json.dumps({"data": {"entities": entities}})
+    )
+
+
+def _write_database(
+    path: Path,
+    service_calls_until: float = math.inf,
+    recorded: tuple[float, float] = (math.inf, math.inf),
+) -> None:
+    """
+    Write a recorder database with commands and end-stop transitions.
+
+    The commands are recorded as service calls until the given time, and as
+    command_sent events during the recording, from its start to its end.
+    """
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE states_meta (metadata_id INTEGER PRIMARY KEY, entity_id TEXT);
+        CREATE TABLE states (
+            state_id INTEGER PRIMARY KEY, metadata_id INTEGER, state TEXT,
+            last_updated_ts FLOAT
+        );
+        CREATE TABLE event_types (
+            event_type_id INTEGER PRIMARY KEY, event_type TEXT
+        );
+        CREATE TABLE event_data (data_id INTEGER PRIMARY KEY, shared_data TEXT);
+        CREATE TABLE events (
+            event_id INTEGER PRIMARY KEY, event_type_id INTEGER, data_id INTEGER,
+            time_fired_ts FLOAT
+        );
+        INSERT INTO event_types VALUES (1, 'call_service');
+        """
+    )
+    connection.execute("INSERT INTO event_types VALUES (2, ?)", (EVENT_COMMAND_SENT,))
+
+    def event(event_type_id: int, fired: float, data: dict) -> None:
+        data_id = connection.execute(
+            "INSERT INTO event_data (shared_data) VALUES (?)", (json.dumps(data),)
+        ).lastrowid
+        connection.execute(
+            "INSERT INTO events (event_type_id, data_id, time_fired_ts)"
+            " VALUES (?, ?, ?)",
+            (event_type_id, data_id, fired),
+        )
+
+    def command(fired: float, code: str, remote: str = REMOTE) -> None:
+        if recorded[0] <= fired < recorded[1]:
+            event(2, fired, {"entity_id": remote, "command": code})
+        if fired < service_calls_until:
+            service_data = {"entity_id": remote, "command": [code]}
+            event(
+                1,
+                fired,
+                {
+                    "domain": "remote",
+                    "service": "send_command",
+                    "service_data": service_data,
+                },
+            )
+
+    def state(entity_id: str, updated: float, value: str) -> None:
+        row = connection.execute(
+            "SELECT metadata_id FROM states_meta WHERE entity_id = ?", (entity_id,)
+        ).fetchone()
+        metadata_id = (
+            row[0]
+            if row
+            else connection.execute(
+                "INSERT INTO states_meta (entity_id) VALUES (?)", (entity_id,)
+            ).lastrowid
+        )
+        connection.execute(
+            "INSERT INTO states (metadata_id, state, last_updated_ts)"
+            " VALUES (?, ?, ?)",
+            (metadata_id, value, updated),
+        )
+
+    # A cover with both end-stop sensors, starting open.
+    state("binary_sensor.both_open", 0, "on")
+    state("binary_sensor.both_closed", 0, "off")
+    for cycle, (down, up) in enumerate([(20, 22), (20.5, 22.5), (21, 23)]):
+        start = 1000 * (cycle + 1)
+        command(start, "both_close")
+        state("binary_sensor.both_open", start + 0.5, "off")
+        state("binary_sensor.both_closed", start + down, "on")
+        command(start + 100, "both_open")
+        state("binary_sensor.both_closed", start + 100.5, "off")
+        state("binary_sensor.both_open", start + 100 + up, "on")
+    # Interrupted by a stop: no sample.
+    command(5000, "both_close")
+    state("binary_sensor.both_open", 5000.5, "off")
+    command(5005, "both_stop")
+    # Same codes on another remote are not ours.
+    command(6000, "both_close", "remote.other")
+
+    # A cover with only a closed sensor, closed when "off".
+    state("binary_sensor.closed_only", 0, "off")
+    command(100, "closed_only_open")
+    state("binary_sensor.closed_only", 100.25, "on")
+    command(130, "closed_only_close")
+    state("binary_sensor.closed_only", 148, "off")
+    # Not long enough after the opening to be sure it was open.
+    command(200, "closed_only_open")
+    state("binary_sensor.closed_only", 200.75, "on")
+    command(205, "closed_only_close")
+    state("binary_sensor.closed_only", 210, "off")
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path) -> Path:
+    """Return a config dir with two covers and their recorder history."""
+    _write_config_dir(tmp_path)
+    _write_database(tmp_path / "home-assistant_v2.db")
+    return tmp_path
+
+
+def test_estimate():
+    """Test the mean and confidence interval of samples."""
+    assert Estimate.from_samples([]) is None
+    assert Estimate.from_samples([3]).ci95 == float("inf")
+
+    estimate = Estimate.from_samples([20, 20.5, 21])
+    assert estimate.samples == 3
+    assert estimate.mean == pytest.approx(20.5)
+    assert estimate.stdev == pytest.approx(0.5)
+    assert estimate.ci95 == pytest.approx(4.303 * 0.5 / 3**0.5)
+
+
+def test_load_covers(config_dir: Path):
+    """Test that the covers are read from the config dir."""
+    covers = load_covers(config_dir, SENSORS)
+
+    assert [cover.entity_id for cover in covers] == ["cover.both", "cover.closed_only"]
+    assert covers[0].commands == {
+        "both_open": OPENING,
+        "both_close": CLOSING,
+        "both_stop": "stop",
+    }
+    assert covers[1].closed_state == "off"
+    assert covers[1].travel_times == {OPENING: 10, CLOSING: 10}
+
+
+def test_calibrate(config_dir: Path):
+    """Test the travelling times and latencies found in the history."""
+    both, closed_only = calibrate(
+        str(config_dir / "home-assistant_v2.db"),
+        load_covers(config_dir, SENSORS),
+        workers=1,
+    )
+
+    assert both.travel_times[CLOSING].samples == 3
+    assert both.travel_times[CLOSING].mean == pytest.approx(20.5)
+    assert both.travel_times[OPENING].mean == pytest.approx(22.5)
+    assert both.latency.samples == 7
+    assert both.latency.mean == pytest.approx(0.5)
+
+    assert closed_only.travel_times[CLOSING].samples == 1
+    assert closed_only.travel_times[CLOSING].mean == pytest.approx(18)
+    assert OPENING not in closed_only.travel_times
+    assert closed_only.latency.mean == pytest.approx(0.5)
+
+    assert suggestions([both, closed_only]) == [
+        {
+            "entity_id": "cover.both",
+            "travelling_time_up": 22.5,
+            "travelling_time_down": 20.5,
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    ("service_calls_until", "recorded"),
+    [(0, (0, math.inf)), (math.inf, (2000, 4000)), (3000, (3000, math.inf))],
+    ids=["entity backend", "service backend", "switched backend"],
+)
+def test_calibrate_sent_events(
+    config_dir: Path, service_calls_until: float, recorded: tuple[float, float]
+):
+    """Test that the commands are read from the events of any backend."""
+    database = config_dir / "sent.db"
+    _write_database(database, service_calls_until, recorded)
+    reference = calibrate(
+        str(config_dir / "home-assistant_v2.db"),
+        load_covers(config_dir, SENSORS),
+        workers=1,
+    )
+
+    # The service calls made along with the events are not counted twice.
+    assert calibrate(str(database), load_covers(config_dir, SENSORS), 1) == reference
+
+
+def test_main(config_dir: Path, capsys: pytest.CaptureFixture[str]):
+    """Test the command line entry point, with a process pool."""
+    sensors = config_dir / "sensors.json"
+    sensors.write_text(json.dumps(SENSORS))
+    output = config_dir / "suggestions.json"
+
+    assert (
+        main(
+            [
+                str(config_dir),
+                str(sensors),
+                "--workers",
+                "2",
+                "--min-samples",
+                "1",
+                "--output",
+                str(output),
+            ]
+        )
+        == 0
+    )
+
+    report = capsys.readouterr().out.splitlines()
+    assert report[0].startswith("cover.both: down 20.50 s ±1.24 (n=3)")
+    assert report[1] == (
+        "cover.closed_only: down 18.00 s ±inf (n=1), up n/a,"
+        " latency 0.50 s ±3.18 (n=2)"
+    )
+    assert json.loads(output.read_text())["suggestions"][1] == {
+        "entity_id": "cover.closed_only",
+        "travelling_time_down": 18.0,
+    }
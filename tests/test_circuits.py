@@ -0,0 +1,224 @@
+"""Test the staggering of the motors sharing an electrical circuit."""
+import time
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import (
+    SERVICE_CLOSE_COVER,
+    SERVICE_OPEN_COVER,
+    SERVICE_STOP_COVER,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers.entity_registry import async_get
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed_exact,
+)
+
+from custom_components.rf_cover_time_based.circuits import START_GAP, CircuitScheduler
+from custom_components.rf_cover_time_based.const import DOMAIN
+from tests.const import MOCK_CONFIG
+
+CIRCUIT = "ground floor"
+
+
+def test_scheduler() -> None:
+    """Test that starts are pushed back to the earliest slot within the limit."""
+    scheduler = CircuitScheduler()
+    assert scheduler.next_start(CIRCUIT, "cover.a", 0.0, 10.0) == 0.0
+
+    remove = scheduler.async_set_limit(CIRCUIT, "entry_a", 2)
+    scheduler.async_set_limit(CIRCUIT, "entry_b", 0)
+    assert scheduler.limit(CIRCUIT) == 2
+    scheduler.async_reserve(CIRCUIT, "cover.a", 0.0, 10.0)
+    scheduler.async_reserve(CIRCUIT, "cover.b", 0.0, 4.0)
+    assert scheduler.next_start(CIRCUIT, "cover.c", 0.0, 10.0) == 4.0 + START_GAP
+    # A cover moving again gives up its own slot first.
+    assert scheduler.next_start(CIRCUIT, "cover.b", 1.0, 10.0) == 1.0
+
+    # A run that would overlap a later reserved start waits for it to end.
+    scheduler.async_reserve(CIRCUIT, "cover.c", 4.5, 20.0)
+    assert scheduler.next_start(CIRCUIT, "cover.d", 1.0, 10.0) == 10.0 + START_GAP
+
+    # Two runs one after the other leave a slot free next to them.
+    scheduler.async_release(CIRCUIT, "cover.a")
+    assert scheduler.next_start(CIRCUIT, "cover.d", 1.0, 10.0) == 1.0
+
+    # The runs that ended by now no longer count.
+    scheduler.async_reserve(CIRCUIT, "cover.a", 0.0, 3.0)
+    assert scheduler.next_start(CIRCUIT, "cover.d", 0.0, 10.0) == 3.0 + START_GAP
+    assert scheduler.next_start(CIRCUIT, "cover.d", 5.0, 10.0) == 5.0
+    assert "cover.a" not in scheduler._runs[CIRCUIT]
+
+    remove()
+    assert scheduler.limit(CIRCUIT) == 0
+    assert scheduler.next_start(CIRCUIT, "cover.d", 1.0, 10.0) == 1.0
+
+
+def test_scheduler_many_runs() -> None:
+    """Test that a long queue of starts is staggered two at a time."""
+    scheduler = CircuitScheduler()
+    scheduler.async_set_limit(CIRCUIT, "entry", 2)
+    for index in range(1000):
+        start = scheduler.next_start(CIRCUIT, f"cover.{index}", 0.0, 10.0)
+        assert start == (index // 2) * (10.0 + START_GAP)
+        scheduler.async_reserve(CIRCUIT, f"cover.{index}", start, start + 10.0)
+
+
+async def test_close_all_staggered(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that closing all covers of a circuit starts them in turns."""
+    sent: list[tuple[float, str]] = []
+
+    async def _send_command(call: ServiceCall) -> None:
+        sent.append((time.monotonic(), call.data["command"][0]))
+
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_ids = []
+    for index in range(3):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            data={
+                **MOCK_CONFIG,
+                "close_command": f"close_{index}",
+                "circuit": CIRCUIT,
+                "circuit_limit": 2,
+            },
+            entry_id=f"circuit-{index}",
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+        entity_ids.append(
+            async_get(hass).async_get_entity_id(COVER_DOMAIN, DOMAIN, entry.entry_id)
+        )
+    await hass.async_block_till_done()
+    for entity_id in entity_ids:
+        hass.data[DOMAIN].covers[entity_id].travel_calculator.set_known_position(100)
+    # Replaces the service of the remote integration, loaded with ours.
+    hass.services.async_register("remote", "send_command", _send_command)
+
+    started = time.monotonic()
+    now = dt_util.utcnow()
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    await hass.async_block_till_done()
+    # Two motors start right away, the last one waits for a slot.
+    assert len(sent) == 2
+    (index,) = {0, 1, 2} - {int(command[-1]) for _, command in sent}
+    waiting = entity_ids[index]
+    moving = entity_ids[(index + 1) % 3]
+
+    # The delayed start is published at once, and the arrival after it.
+    attributes = hass.states.get(waiting).attributes
+    delay = MOCK_CONFIG["travelling_time_down"] + START_GAP
+    assert dt_util.parse_datetime(attributes["travel_started_at"]) == now + timedelta(
+        seconds=delay
+    )
+    assert dt_util.parse_datetime(attributes["travel_arrival_at"]) == now + timedelta(
+        seconds=delay + MOCK_CONFIG["travelling_time_down"]
+    )
+
+    for _ in range(round(delay * 10)):
+        freezer.tick(timedelta(seconds=0.1))
+        async_fire_time_changed_exact(hass)
+        await hass.async_block_till_done()
+    assert sent[-1][1] == f"close_{index}"
+    assert sent[-1][0] - started == pytest.approx(delay)
+    assert hass.states.get(moving).attributes["current_position"] == 0
+    assert hass.states.get(waiting).attributes["current_position"] == 100
+
+    freezer.tick(timedelta(seconds=MOCK_CONFIG["travelling_time_down"]))
+    async_fire_time_changed_exact(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(waiting).attributes["current_position"] == 0
+
+    # A stop while still waiting for the circuit drops the start.
+    for entity_id in entity_ids:
+        hass.data[DOMAIN].covers[entity_id].travel_calculator.set_known_position(100)
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    await hass.async_block_till_done()
+    (index,) = {0, 1, 2} - {int(command[-1]) for _, command in sent[-2:]}
+    waiting = entity_ids[index]
+    sent.clear()
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_STOP_COVER, {ATTR_ENTITY_ID: waiting}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=delay))
+    async_fire_time_changed_exact(hass)
+    await hass.async_block_till_done()
+    # Neither the start nor a stop reach the motor, which never started.
+    assert sent == []
+    assert hass.states.get(waiting).attributes["current_position"] == 100
+
+
+async def test_reversal_on_saturated_circuit(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that a running motor reverses at once, even with the circuit full."""
+    sent: list[tuple[float, str]] = []
+
+    async def _send_command(call: ServiceCall) -> None:
+        sent.append((time.monotonic(), call.data["command"][0]))
+
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_ids = []
+    for index in range(2):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            data={
+                **MOCK_CONFIG,
+                "open_command": f"open_{index}",
+                "close_command": f"close_{index}",
+                "circuit": CIRCUIT,
+                "circuit_limit": 1,
+            },
+            entry_id=f"circuit-{index}",
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+        entity_ids.append(
+            async_get(hass).async_get_entity_id(COVER_DOMAIN, DOMAIN, entry.entry_id)
+        )
+    await hass.async_block_till_done()
+    for entity_id in entity_ids:
+        hass.data[DOMAIN].covers[entity_id].travel_calculator.set_known_position(100)
+    hass.services.async_register("remote", "send_command", _send_command)
+
+    started = time.monotonic()
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    await hass.async_block_till_done()
+    ((_, command),) = sent
+    running = entity_ids[int(command[-1])]
+
+    freezer.tick(timedelta(seconds=8))
+    async_fire_time_changed_exact(hass)
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_OPEN_COVER, {ATTR_ENTITY_ID: running}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    # The motor is told to turn around right away, not once a slot opens.
+    assert sent[-1] == (pytest.approx(started + 8), f"open_{command[-1]}")
+    state = hass.states.get(running)
+    assert state.state == "opening"
+    assert dt_util.parse_datetime(
+        state.attributes["travel_arrival_at"]
+    ) == dt_util.utcnow() + timedelta(seconds=8)
+
+    freezer.tick(timedelta(seconds=8))
+    async_fire_time_changed_exact(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(running).attributes["current_position"] == 100
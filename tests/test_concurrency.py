@@ -0,0 +1,187 @@
+"""
+Stress test for overlapping service calls.
+
+Fires thousands of concurrent open, close, stop and set position calls at
+covers sharing one gateway, with command sending that yields to the event
+loop at random, and checks after every burst that each cover's calculator
+agrees with a motor driven only by the commands that were actually sent.
+The size of the run can be raised with the RF_COVER_STRESS_ROUNDS
+environment variable.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import (
+    ATTR_POSITION,
+    SERVICE_CLOSE_COVER,
+    SERVICE_OPEN_COVER,
+    SERVICE_SET_COVER_POSITION,
+    SERVICE_STOP_COVER,
+)
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed_exact,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.time_based_cover import TimeBasedCover
+from tests.const import MOCK_CONFIG
+
+COVERS = 3
+ROUNDS = int(os.environ.get("RF_COVER_STRESS_ROUNDS", "40"))
+CALLS_PER_ROUND = 60
+TICK = 0.05
+TRAVEL_TIME = MOCK_CONFIG["travelling_time_down"]
+
+
+@dataclass
+class Motor:
+    """A physical motor, moved only by the commands it receives."""
+
+    position: float = 100.0
+    direction: int = 0
+    since: float = 0.0
+
+    def advance(self, now: float) -> None:
+        """Move the motor up to now."""
+        moved = self.direction * (now - self.since) * 100 / TRAVEL_TIME
+        # Rounded so that float errors do not keep it off the end stops.
+        self.position = round(min(max(self.position + moved, 0.0), 100.0), 3)
+        self.since = now
+
+
+async def test_overlapping_calls_stay_consistent(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that only the latest intent of each cover takes effect."""
+    rng = random.Random(38)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+
+    motors: dict[str, tuple[Motor, int]] = {}
+
+    async def async_send_command(call: ServiceCall) -> None:
+        [code] = call.data["command"]
+        action, index = code.split("_")
+        motor = motors[index]
+        motor.advance(time.monotonic())
+        motor.direction = {"open": 1, "close": -1, "stop": 0}[action]
+        # Transmissions take a while, so other calls run in the meantime.
+        await asyncio.sleep(0)
+
+    original = TimeBasedCover._async_handle_command
+
+    async def async_yielding_handle_command(
+        self: TimeBasedCover, *args: Any, **kwargs: Any
+    ) -> None:
+        for _ in range(rng.randrange(3)):
+            await asyncio.sleep(0)
+        await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        TimeBasedCover, "_async_handle_command", async_yielding_handle_command
+    )
+
+    entity_registry = async_get(hass)
+    entity_ids = []
+    for index in range(COVERS):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            data={
+                **MOCK_CONFIG,
+                "open_command": f"open_{index}",
+                "close_command": f"close_{index}",
+                "stop_command": f"stop_{index}",
+            },
+            entry_id=f"stress-{index}",
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+        entity_ids.append(
+            entity_registry.async_get_entity_id(COVER_DOMAIN, DOMAIN, entry.entry_id)
+        )
+        motors[str(index)] = Motor(since=time.monotonic())
+    await hass.async_block_till_done()
+    covers = [hass.data[DOMAIN].covers[entity_id] for entity_id in entity_ids]
+    # Replaces the service of the remote integration, loaded with ours.
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    def check_consistency() -> None:
+        now = time.monotonic()
+        for index, cover in enumerate(covers):
+            motor = motors[str(index)]
+            motor.advance(now)
+            calculator = cover.travel_calculator
+            expected = 0
+            if calculator.is_opening():
+                expected = 1
+            elif calculator.is_closing():
+                expected = -1
+            if motor.position in (0.0, 100.0) and not calculator.is_moving():
+                # The end stops halt the motor by themselves.
+                motor.direction = 0
+            assert motor.direction == expected
+            assert abs(motor.position - calculator.estimated_position()) <= 1
+            # An arrival timer follows every moving cover. The updater may
+            # round the position onto the target just before the timer fires,
+            # so a stopped cover may still have one due within a tick.
+            timer = cover._arrival_cancel_callback
+            if expected:
+                assert timer is not None
+            elif timer is not None:
+                assert timer.__self__.when() < hass.loop.time() + TICK
+
+    services = [
+        (SERVICE_OPEN_COVER, {}),
+        (SERVICE_CLOSE_COVER, {}),
+        (SERVICE_STOP_COVER, {}),
+        (SERVICE_SET_COVER_POSITION, None),
+    ]
+    for _ in range(ROUNDS):
+        calls = []
+        for _ in range(CALLS_PER_ROUND):
+            service, data = rng.choice(services)
+            if data is None:
+                data = {ATTR_POSITION: rng.randrange(0, 101, 5)}
+            calls.append(
+                hass.services.async_call(
+                    COVER_DOMAIN,
+                    service,
+                    {ATTR_ENTITY_ID: rng.choice(entity_ids), **data},
+                    blocking=True,
+                )
+            )
+        await asyncio.gather(*calls)
+        await hass.async_block_till_done()
+        check_consistency()
+
+        # Timers must fire on time, for the motor to stop where the
+        # calculator does.
+        for _ in range(rng.randrange(40)):
+            freezer.tick(timedelta(seconds=TICK))
+            async_fire_time_changed_exact(hass)
+            await hass.async_block_till_done()
+        check_consistency()
+
+    # Let every movement finish.
+    for _ in range(round(TRAVEL_TIME / TICK) + 2):
+        freezer.tick(timedelta(seconds=TICK))
+        async_fire_time_changed_exact(hass)
+        await hass.async_block_till_done()
+    check_consistency()
+    assert not any(cover.travel_calculator.is_moving() for cover in covers)
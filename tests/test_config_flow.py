@@ -49,9 +49,46 @@ async def test_full_flow_implementation(hass: HomeAssistant) -> None:
     # Create a copy of the mock config without the name to compare options
     expected_options = MOCK_CONFIG.copy()
     del expected_options["name"]
+    # Optional settings left out of the form are filled in with their defaults.
+    expected_options["intermediate_updates"] = True
+    expected_options["resync_threshold"] = 0
+    expected_options["resync_window_start"] = "02:00:00"
+    expected_options["resync_window_end"] = "05:00:00"
+    expected_options["track_remote_presses"] = False
+    expected_options["repeats"] = 0
+    expected_options["repeat_delay"] = 0.4
+    expected_options["transmit_backend"] = "service"
+    expected_options["tilt_time"] = 0
+    expected_options["write_budget"] = 0
+    expected_options["circuit_limit"] = 0
     assert result2["options"] == expected_options
 
 
+async def test_mqtt_backend_needs_topic(hass: HomeAssistant) -> None:
+    """Test that the MQTT backend cannot be picked without a topic."""
+    hass.states.async_set("remote.test_gateway", "on")
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={**MOCK_CONFIG, "transmit_backend": "mqtt"}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"mqtt_topic": "mqtt_topic_required"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={
+            **MOCK_CONFIG,
+            "transmit_backend": "mqtt",
+            "mqtt_topic": "home/OpenMQTTGateway/commands/MQTTto433",
+        },
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["options"]["mqtt_topic"] == "home/OpenMQTTGateway/commands/MQTTto433"
+
+
 async def test_config_flow_aborts_if_no_remotes(hass: HomeAssistant) -> None:
     """Test that the config flow aborts if no remote entities are found."""
     # Ensure no remote entities exist
@@ -5,20 +5,27 @@ from unittest.mock import patch
 from freezegun.api import FrozenDateTimeFactory
 import pytest
 from homeassistant.components.cover import (
+    ATTR_CURRENT_POSITION,
+    ATTR_CURRENT_TILT_POSITION,
     ATTR_POSITION,
+    ATTR_TILT_POSITION,
     DOMAIN as COVER_DOMAIN,
     SERVICE_CLOSE_COVER,
     SERVICE_OPEN_COVER,
     SERVICE_SET_COVER_POSITION,
+    SERVICE_SET_COVER_TILT_POSITION,
     SERVICE_STOP_COVER,
+    CoverEntityFeature,
 )
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     EVENT_CALL_SERVICE,
+    EVENT_STATE_CHANGED,
     STATE_UNAVAILABLE,
 )
 from homeassistant.core import Event, HomeAssistant, State
 from homeassistant.helpers.entity_registry import EntityRegistry, async_get
+from homeassistant.util import dt as dt_util
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
     async_capture_events,
@@ -183,7 +190,9 @@ async def test_travel_and_manual_stop(
     assert entity_id is not None
 
     # Patch state restoration to start at a known position
-    mock_restored_state = State(entity_id, "unknown", {ATTR_POSITION: start_pos})
+    mock_restored_state = State(
+        entity_id, "unknown", {ATTR_CURRENT_POSITION: start_pos}
+    )
     with patch(
         "homeassistant.helpers.restore_state.RestoreEntity.async_get_last_state",
         return_value=mock_restored_state,
@@ -241,7 +250,9 @@ async def test_set_position_and_auto_stop(
     assert entity_id is not None
 
     # Patch state restoration to start at a known position
-    mock_restored_state = State(entity_id, "unknown", {ATTR_POSITION: start_pos})
+    mock_restored_state = State(
+        entity_id, "unknown", {ATTR_CURRENT_POSITION: start_pos}
+    )
     with patch(
         "homeassistant.helpers.restore_state.RestoreEntity.async_get_last_state",
         return_value=mock_restored_state,
@@ -272,3 +283,329 @@ async def test_set_position_and_auto_stop(
     # Check that the position is the target position
     state = hass.states.get(entity_id)
     assert state.attributes["current_position"] == target_pos
+
+
+async def test_motion_plan_attributes(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that the motion plan is published at start and cleared on arrival."""
+    entity_id = _get_entity_id(hass, init_integration)
+    assert entity_id is not None
+
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_SET_COVER_POSITION,
+        {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: 40},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    attributes = hass.states.get(entity_id).attributes
+    assert attributes["travel_start_position"] == 100
+    assert attributes["travel_target_position"] == 40
+    assert attributes["travel_speed"] == -10
+    assert attributes["travel_profile"] == "linear"
+    started_at = dt_util.parse_datetime(attributes["travel_started_at"])
+    arrival_at = dt_util.parse_datetime(attributes["travel_arrival_at"])
+    assert arrival_at - started_at == timedelta(seconds=6)
+
+    freezer.tick(timedelta(seconds=7))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.attributes["current_position"] == 40
+    assert "travel_arrival_at" not in state.attributes
+
+
+async def test_no_intermediate_updates(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that only the start and arrival states are written when disabled."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={**MOCK_CONFIG, "intermediate_updates": False},
+        entry_id="test-quiet",
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = _get_entity_id(hass, entry)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    state_events: list[Event] = async_capture_events(hass, EVENT_STATE_CHANGED)
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    for _ in range(11):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    cover_states = [
+        event.data["new_state"]
+        for event in state_events
+        if event.data["entity_id"] == entity_id
+    ]
+    assert [state.state for state in cover_states] == ["closing", "closed"]
+    assert cover_states[-1].attributes["current_position"] == 0
+
+
+async def test_stop_sent_on_intermediate_arrival(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that the motor is stopped when arriving away from the end stops."""
+    entity_id = _get_entity_id(hass, init_integration)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    events: list[Event] = async_capture_events(hass, EVENT_CALL_SERVICE)
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_SET_COVER_POSITION,
+        {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: 70},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    freezer.tick(timedelta(seconds=3))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    commands = [
+        event.data["service_data"]["command"]
+        for event in events
+        if event.data["domain"] == "remote"
+    ]
+    assert commands == [[MOCK_CONFIG["close_command"]], [MOCK_CONFIG["stop_command"]]]
+
+
+async def test_run_sequence(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that a sequence runs with one call and publishes its phases."""
+    entity_id = _get_entity_id(hass, init_integration)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    service_events: list[Event] = async_capture_events(hass, EVENT_CALL_SERVICE)
+    state_events: list[Event] = async_capture_events(hass, EVENT_STATE_CHANGED)
+    await hass.services.async_call(
+        DOMAIN,
+        "run_sequence",
+        {
+            ATTR_ENTITY_ID: entity_id,
+            "steps": [{"position": 0, "dwell": 2}, {"position": 20}],
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.state == "closing"
+    assert state.attributes["sequence_step"] == 1
+    assert state.attributes["sequence_steps"] == 2
+
+    for _ in range(15):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    commands = [
+        event.data["service_data"]["command"]
+        for event in service_events
+        if event.data["domain"] == "remote"
+    ]
+    assert commands == [
+        [MOCK_CONFIG["close_command"]],
+        [MOCK_CONFIG["open_command"]],
+        [MOCK_CONFIG["stop_command"]],
+    ]
+
+    cover_states = [
+        event.data["new_state"]
+        for event in state_events
+        if event.data["entity_id"] == entity_id
+    ]
+    assert [state.state for state in cover_states] == [
+        "closing",
+        "closed",
+        "opening",
+        "open",
+        "open",
+    ]
+    assert cover_states[-1].attributes["current_position"] == 20
+    assert "sequence_step" not in cover_states[-1].attributes
+
+
+async def test_resync_after_drift(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that a drifting cover is resynchronized in its quiet window."""
+    now = dt_util.now()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **MOCK_CONFIG,
+            "resync_threshold": 1,
+            "resync_window_start": (now - timedelta(hours=1)).strftime("%H:%M:%S"),
+            "resync_window_end": (now + timedelta(hours=1)).strftime("%H:%M:%S"),
+        },
+        entry_id="test-resync",
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = _get_entity_id(hass, entry)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    events: list[Event] = async_capture_events(hass, EVENT_CALL_SERVICE)
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_SET_COVER_POSITION,
+        {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: 40},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes["position_uncertainty"] == 1.2
+
+    for _ in range(20):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    commands = [
+        event.data["service_data"]["command"]
+        for event in events
+        if event.data["domain"] == "remote"
+    ]
+    assert commands == [
+        [MOCK_CONFIG["close_command"]],
+        [MOCK_CONFIG["stop_command"]],
+        # The resync drives into the closed end stop, then back to 40%.
+        [MOCK_CONFIG["close_command"]],
+        [MOCK_CONFIG["open_command"]],
+        [MOCK_CONFIG["stop_command"]],
+    ]
+    state = hass.states.get(entity_id)
+    assert state.attributes["current_position"] == 40
+    assert state.attributes["position_uncertainty"] == 0.8
+
+
+async def test_export_trace(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that the motion trace is exported and replays consistently."""
+    entity_id = _get_entity_id(hass, init_integration)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=4))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_STOP_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "export_trace",
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+        return_response=True,
+    )
+    trace = response[entity_id]
+    assert [
+        (record["event"], record["position"], record["command"])
+        for record in trace["records"]
+    ] == [
+        ("known_position", 100, None),
+        ("command", 100, "close"),
+        ("start", 100, None),
+        ("stop", 60, None),
+        ("command", 60, "stop"),
+    ]
+    assert trace["replay_deviation"] == pytest.approx(0, abs=0.01)
+
+
+async def test_tilt(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test that the slats turn on the same timeline as the cover travels."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={**MOCK_CONFIG, "tilt_time": 2}, entry_id="venetian"
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+    entity_id = _get_entity_id(hass, entry)
+    state = hass.states.get(entity_id)
+    assert state.attributes["supported_features"] & CoverEntityFeature.SET_TILT_POSITION
+    assert state.attributes[ATTR_CURRENT_TILT_POSITION] == 100
+
+    events: list[Event] = async_capture_events(hass, EVENT_CALL_SERVICE)
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_SET_COVER_TILT_POSITION,
+        {ATTR_ENTITY_ID: entity_id, ATTR_TILT_POSITION: 40},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes["travel_arrival_at"]
+
+    freezer.tick(timedelta(seconds=1.3))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    state = hass.states.get(entity_id)
+    assert state.attributes[ATTR_CURRENT_TILT_POSITION] == 40
+    assert state.attributes[ATTR_CURRENT_POSITION] == 100
+
+    # Closing turns the slats shut before the cover travels.
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=1.8))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    state = hass.states.get(entity_id)
+    assert state.attributes[ATTR_CURRENT_TILT_POSITION] == 0
+    assert state.attributes[ATTR_CURRENT_POSITION] == 90
+
+    freezer.tick(timedelta(seconds=10))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "closed"
+
+    # A tilt move is stopped once the slats are turned; the end stop halts
+    # the cover by itself.
+    commands = [
+        event.data["service_data"]["command"]
+        for event in events
+        if event.data["domain"] == "remote"
+    ]
+    assert commands == [
+        [MOCK_CONFIG["close_command"]],
+        [MOCK_CONFIG["stop_command"]],
+        [MOCK_CONFIG["close_command"]],
+    ]
@@ -0,0 +1,136 @@
+"""Test the adaptive repetition of the commands."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import (
+    SERVICE_CLOSE_COVER,
+    SERVICE_OPEN_COVER,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.delivery import (
+    MAX_REPEATS,
+    STEP_DOWN_AFTER,
+    DeliveryTracker,
+)
+from tests.const import MOCK_CONFIG
+
+CLOSED_SENSOR = "binary_sensor.shutter_closed"
+OPEN_SENSOR = "binary_sensor.shutter_open"
+
+
+def test_tracker_adapts():
+    """Test that losses add repetitions and runs of deliveries remove them."""
+    tracker = DeliveryTracker(repeats=1)
+    assert tracker.delivery_rate is None
+
+    tracker.record(False)
+    assert tracker.repeats == 2
+    for _ in range(STEP_DOWN_AFTER - 1):
+        tracker.record(True)
+    assert tracker.repeats == 2
+    tracker.record(True)
+    assert tracker.repeats == 1
+
+    for _ in range(MAX_REPEATS + 2):
+        tracker.record(False)
+    assert tracker.repeats == MAX_REPEATS
+    assert tracker.as_dict() == {
+        "repeats": MAX_REPEATS,
+        "confirmed": STEP_DOWN_AFTER,
+        "lost": MAX_REPEATS + 3,
+        "delivery_rate": 0.556,
+        "window": STEP_DOWN_AFTER + MAX_REPEATS + 3,
+    }
+
+
+async def test_repeats_follow_end_stops(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that lost commands are repeated and confirmed ones are not."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    hass.states.async_set(OPEN_SENSOR, "on")
+    hass.states.async_set(CLOSED_SENSOR, "off")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **MOCK_CONFIG,
+            "closed_sensor": CLOSED_SENSOR,
+            "open_sensor": OPEN_SENSOR,
+            "repeats": 0,
+            "repeat_delay": 0.3,
+        },
+        entry_id="test-delivery",
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = async_get(hass).async_get_entity_id(
+        COVER_DOMAIN, DOMAIN, entry.entry_id
+    )
+    cover = hass.data[DOMAIN].covers[entity_id]
+
+    sent: list[dict] = []
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.append(dict(call.data))
+
+    # Replaces the service of the remote integration, loaded with ours.
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    async def tick(seconds: float) -> None:
+        freezer.tick(timedelta(seconds=seconds))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    # The cover never leaves the open end stop: the close command was lost.
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await tick(10)
+    await tick(6)
+    assert sent[0] == {
+        "entity_id": MOCK_CONFIG["remote_entity"],
+        "command": ["b64:close_code"],
+    }
+    assert cover.delivery.lost == 1
+    assert cover.delivery.repeats == 1
+
+    # The position is wrong now, so the open end stop is not left either.
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_OPEN_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert sent[-1] == {
+        "entity_id": MOCK_CONFIG["remote_entity"],
+        "command": ["b64:open_code"],
+        "num_repeats": 2,
+        "delay_secs": 0.3,
+    }
+    await tick(17)
+    assert cover.delivery.lost == 1
+
+    # Leaving the end stop confirms the command.
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await tick(0.5)
+    hass.states.async_set(OPEN_SENSOR, "off")
+    await hass.async_block_till_done()
+    assert cover.delivery.confirmed == 1
+    await tick(16)
+    assert cover.delivery.as_dict() == {
+        "repeats": 1,
+        "confirmed": 1,
+        "lost": 1,
+        "delivery_rate": 0.5,
+        "window": 2,
+    }
@@ -3,6 +3,10 @@
 """Test the RF Cover Time Based diagnostics."""
 from __future__ import annotations
 
+import json
+from pathlib import Path
+
+import pytest
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 from syrupy import SnapshotAssertion
@@ -10,9 +14,12 @@ from syrupy import SnapshotAssertion
 # Import the 'props' filter from syrupy
 from syrupy.filters import props
 
+from custom_components.rf_cover_time_based import diagnostics
+from custom_components.rf_cover_time_based.const import DOMAIN
 from custom_components.rf_cover_time_based.diagnostics import (
     async_get_config_entry_diagnostics,
 )
+from tests.const import MOCK_CONFIG
 
 
 async def test_entry_diagnostics(
@@ -27,5 +34,53 @@ async def test_entry_diagnostics(
 
     # Assert against the snapshot, excluding dynamic fields like timestamps.
     # This makes the test robust and independent of when it is run.
-    assert diagnostics_data == snapshot(exclude=props("created_at", "modified_at"))
-    
\ No newline at end of file
+    assert diagnostics_data == snapshot(
+        exclude=props("created_at", "modified_at", "monotonic_ns")
+    )
+    
+
+async def test_export_diagnostics(
+    hass: HomeAssistant, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that one call streams the diagnostics of every entry."""
+    monkeypatch.setattr(diagnostics, "EXPORT_BATCH", 2)
+    hass.config.config_dir = str(tmp_path)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    for index in range(3):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            data={**MOCK_CONFIG, "name": f"Cover {index}"},
+            entry_id=f"export-{index}",
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+    # An entry that is not loaded is exported too, without runtime state.
+    MockConfigEntry(
+        domain=DOMAIN, title="Unloaded", data=MOCK_CONFIG, entry_id="export-3"
+    ).add_to_hass(hass)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(DOMAIN, "export_diagnostics", blocking=True)
+
+    (path,) = tmp_path.glob(f"{DOMAIN}_diagnostics_*.jsonl")
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["entry_id"] for line in lines] == [
+        f"export-{index}" for index in range(4)
+    ]
+    first = lines[0]
+    assert not any("command" in key for key in first["config"])
+    assert first["state"] == "open"
+    assert first["remote"] == {"entity_id": MOCK_CONFIG["remote_entity"], "state": "on"}
+    assert first["calculator"] == {
+        "position": 100,
+        "tilt": None,
+        "status": "stopped",
+        "target_position": None,
+        "time_remaining": 0,
+        "uncertainty": 0,
+    }
+    assert first["gateway"]["backend"] == "service"
+    assert first["delivery"]["repeats"] == 0
+    assert lines[3]["entity_id"] is None
+    assert lines[3]["calculator"] is None
@@ -0,0 +1,188 @@
+"""Test the emergency retract broadcast."""
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import (
+    ATTR_POSITION,
+    SERVICE_CLOSE_COVER,
+    SERVICE_OPEN_COVER,
+    SERVICE_SET_COVER_POSITION,
+    SERVICE_STOP_COVER,
+)
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+    async_fire_time_changed_exact,
+)
+
+from custom_components.rf_cover_time_based.circuits import START_GAP
+from custom_components.rf_cover_time_based.const import DOMAIN
+from tests.const import MOCK_CONFIG, MOCK_CONFIG_AWNING, SetupCover
+
+GATEWAY_A = "remote.gateway_a"
+GATEWAY_B = "remote.gateway_b"
+
+
+async def test_emergency_retract(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that awnings are retracted ahead of queued commands and locked."""
+    hass.states.async_set(GATEWAY_A, "on")
+    hass.states.async_set(GATEWAY_B, "on")
+    # Two awnings on the same group channel, one alone, and a shutter.
+    terrace_1 = await setup_cover(
+        "terrace_1", MOCK_CONFIG_AWNING, remote_entity=GATEWAY_A
+    )
+    terrace_2 = await setup_cover(
+        "terrace_2", MOCK_CONFIG_AWNING, remote_entity=GATEWAY_A
+    )
+    balcony = await setup_cover(
+        "balcony",
+        MOCK_CONFIG_AWNING,
+        remote_entity=GATEWAY_B,
+        open_command="b64:balcony_open",
+    )
+    shutter = await setup_cover("shutter", MOCK_CONFIG, remote_entity=GATEWAY_A)
+
+    sent: list[tuple[str, str]] = []
+    in_flight = asyncio.Event()
+    release = asyncio.Event()
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.append((call.data[ATTR_ENTITY_ID], call.data["command"][0]))
+        in_flight.set()
+        await release.wait()
+
+    # Replaces the service of the remote integration, loaded with ours.
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    # One command is being transmitted and two are queued when the wind
+    # sensor trips.
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: shutter}
+    )
+    await in_flight.wait()
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_SET_COVER_POSITION,
+        {ATTR_ENTITY_ID: terrace_1, ATTR_POSITION: 50},
+        blocking=True,
+    )
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_STOP_COVER, {ATTR_ENTITY_ID: shutter}, blocking=True
+    )
+    emergency = hass.async_create_task(
+        hass.services.async_call(
+            DOMAIN,
+            "emergency_retract",
+            {"lockout": 60},
+            blocking=True,
+            return_response=True,
+        )
+    )
+    while hass.states.get(balcony).state != "closing":
+        await asyncio.sleep(0)
+    release.set()
+    response = await emergency
+    await hass.async_block_till_done()
+
+    assert response == {
+        "covers": sorted([balcony, terrace_1, terrace_2]),
+        "delayed": [],
+        "transmissions": 2,
+        "gateways": 2,
+        "latency": 0.0,
+    }
+    # Retracting an awning sends its open command, ahead of the queue, once
+    # for the group channel, and the superseded move is never sent.
+    assert [command for remote, command in sent if remote == GATEWAY_A] == [
+        "b64:close_code",
+        "b64:open_code",
+        "b64:stop_code",
+    ]
+    assert [command for remote, command in sent if remote == GATEWAY_B] == [
+        "b64:balcony_open"
+    ]
+    for entity_id in (terrace_1, terrace_2, balcony):
+        assert hass.states.get(entity_id).state == "closing"
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            COVER_DOMAIN, SERVICE_OPEN_COVER, {ATTR_ENTITY_ID: terrace_1}, blocking=True
+        )
+
+    freezer.tick(timedelta(seconds=61))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(terrace_1).state == "closed"
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_OPEN_COVER, {ATTR_ENTITY_ID: terrace_1}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(terrace_1).state == "opening"
+
+
+async def test_emergency_retract_on_circuit(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that retracts wait for their circuit, grouped by start slot."""
+    sent: list[tuple[float, str]] = []
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.append((time.monotonic(), call.data["command"][0]))
+
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    # Two awnings alone, and two on a group channel, two motors at a time.
+    awnings = [
+        await setup_cover(
+            f"terrace_{index}",
+            MOCK_CONFIG_AWNING,
+            open_command=command,
+            circuit="terrace",
+            circuit_limit=2,
+        )
+        for index, command in enumerate(["open_0", "open_1", "group", "group"])
+    ]
+    for entity_id in awnings:
+        hass.data[DOMAIN].covers[entity_id].travel_calculator.set_known_position(100)
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    started = time.monotonic()
+    now = dt_util.utcnow()
+    response = await hass.services.async_call(
+        DOMAIN,
+        "emergency_retract",
+        {"lockout": 60},
+        blocking=True,
+        return_response=True,
+    )
+    await hass.async_block_till_done()
+
+    assert response == {
+        "covers": sorted(awnings),
+        "delayed": sorted(awnings[2:]),
+        "transmissions": 3,
+        "gateways": 1,
+        "latency": 0.0,
+    }
+    assert sorted(command for _, command in sent) == ["open_0", "open_1"]
+    delay = MOCK_CONFIG["travelling_time_down"] + START_GAP
+    for entity_id in awnings[2:]:
+        state = hass.states.get(entity_id)
+        assert state.state == "closing"
+        assert dt_util.parse_datetime(
+            state.attributes["travel_started_at"]
+        ) == now + timedelta(seconds=delay)
+
+    # The group channel is sent once, when its slot comes.
+    freezer.tick(timedelta(seconds=delay))
+    async_fire_time_changed_exact(hass)
+    await hass.async_block_till_done()
+    assert sent[2:] == [(pytest.approx(started + delay), "group")]
@@ -0,0 +1,82 @@
+"""Test the gateway command queues."""
+import pytest
+from homeassistant.core import HomeAssistant, ServiceCall
+
+from custom_components.rf_cover_time_based.backends import TransmitBackend
+from custom_components.rf_cover_time_based.gateway import (
+    CommandPriority,
+    GatewayQueue,
+    RemoteGateway,
+)
+
+
+def test_queue_orders_by_priority_then_submission() -> None:
+    """Test that interactive commands overtake maintenance ones."""
+    queue: GatewayQueue[str] = GatewayQueue()
+    queue.push("resync_1", CommandPriority.MAINTENANCE)
+    queue.push("open", CommandPriority.INTERACTIVE)
+    queue.push("resync_2", CommandPriority.MAINTENANCE)
+    queue.push("stop", CommandPriority.INTERACTIVE)
+
+    assert len(queue) == 4
+    assert queue.peak_depth == 4
+    assert [queue.pop() for _ in range(4)] == ["open", "stop", "resync_1", "resync_2"]
+    assert queue.pop() is None
+    assert queue.peak_depth == 4
+
+
+async def test_superseded_commands_are_dropped(hass: HomeAssistant) -> None:
+    """Test that only the latest intent of a sender is sent once queued."""
+    sent: list[str] = []
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.extend(call.data["command"])
+
+    hass.services.async_register("remote", "send_command", async_send_command)
+    gateway = RemoteGateway(hass, "remote.test_gateway")
+
+    # The worker only starts once the loop runs, so all of these are queued.
+    gateway.async_send("open_a", CommandPriority.INTERACTIVE, {"cover.a": 1})
+    gateway.async_send("close_a", CommandPriority.INTERACTIVE, {"cover.a": 2})
+    gateway.async_send("open_b", CommandPriority.INTERACTIVE, {"cover.b": 1})
+    gateway.async_send("stop_a", CommandPriority.INTERACTIVE, {"cover.a": 3})
+    gateway.async_send("stop_a_again", CommandPriority.INTERACTIVE, {"cover.a": 3})
+    gateway.async_send("other")
+    await hass.async_block_till_done()
+
+    assert sent == ["open_b", "stop_a", "stop_a_again", "other"]
+
+
+class FailingBackend(TransmitBackend):
+    """A backend failing on some commands in a way nobody expected."""
+
+    name = "failing"
+
+    def __init__(self, hass: HomeAssistant, entity_id: str) -> None:
+        """Initialize the backend."""
+        super().__init__(hass, entity_id)
+        self.sent: list[str] = []
+
+    async def async_send(self, command: str, repeats: int, delay: float) -> None:
+        """Record the command, unless it is a bad one."""
+        if command.startswith("bad"):
+            raise ValueError(f"Cannot encode {command}")
+        self.sent.append(command)
+
+
+async def test_failing_backend_keeps_the_queue_going(hass: HomeAssistant) -> None:
+    """Test that an unexpected error only loses the command that raised it."""
+    backend = FailingBackend(hass, "remote.test_gateway")
+    gateway = RemoteGateway(hass, "remote.test_gateway", backend)
+
+    gateway.async_send("bad_open")
+    gateway.async_send("close")
+    await hass.async_block_till_done()
+    assert backend.sent == ["close"]
+
+    # A caller waiting on the command gets the error, and nothing hangs.
+    with pytest.raises(ValueError):
+        await gateway.async_send_emergency("bad_retract")
+    gateway.async_send("stop")
+    await hass.async_block_till_done()
+    assert backend.sent == ["close", "stop"]
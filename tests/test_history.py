@@ -0,0 +1,193 @@
+"""Test the motion history and its position-at-time queries."""
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import (
+    SERVICE_CLOSE_COVER,
+    SERVICE_STOP_COVER,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.history import MAX_SAMPLES, MotionHistory
+from custom_components.rf_cover_time_based.travelcalculator import TravelCalculator
+from tests.const import MOCK_CONFIG, SetupCover
+
+
+class FakeClock:
+    """A clock advanced by hand."""
+
+    def __init__(self) -> None:
+        """Start the clock at 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def test_position_at() -> None:
+    """Test that each segment is evaluated from its start until the next."""
+    history = MotionHistory()
+    history.append(10.0, 100.0)
+    history.append(20.0, 100.0, -10.0, 0)
+    history.append(25.0, 50.0)
+    history.append(30.0, 50.0, 10.0, 80, delay=2.0)
+
+    assert history.position_at(5.0) is None
+    assert history.position_at(10.0) == 100
+    assert history.position_at(22.0) == 80
+    # Stopped halfway, before the target.
+    assert history.position_at(27.0) == 50
+    # The slats turn first, then the cover travels up to its target.
+    assert history.position_at(31.0) == 50
+    assert history.position_at(33.0) == 60
+    assert history.position_at(60.0) == 80
+    assert history.sample(20.0, 2.5, 3) == [100, 75, 50]
+
+
+def test_capacity() -> None:
+    """Test that the oldest half is dropped once the history is full."""
+    history = MotionHistory(capacity=4)
+    for second in range(5):
+        history.append(float(second), float(second))
+
+    assert len(history) == 3
+    assert history.position_at(1.5) is None
+    assert history.position_at(3.5) == 3
+    with pytest.raises(ValueError):
+        MotionHistory(capacity=1)
+
+
+def test_calculator_records_segments() -> None:
+    """Test that the transitions of a calculator replay from the history."""
+    clock = FakeClock()
+    history = MotionHistory()
+    calculator = TravelCalculator(10, 20, clock=clock, history=history)
+    calculator.set_known_position(100)
+    clock.now = 1.0
+    calculator.start_travel(0)
+    clock.now = 4.0
+    calculator.stop_travel()
+    clock.now = 6.0
+    calculator.start_travel(90)
+    clock.now = 20.0
+    calculator.update_position()
+
+    assert len(history) == 4
+    # Closing at 10% per second, then opening at 5% per second.
+    expected = {0.0: 100, 2.5: 85, 4.0: 70, 5.0: 70, 8.0: 80, 10.0: 90, 20.0: 90}
+    for when, position in expected.items():
+        assert history.position_at(when) == pytest.approx(position)
+
+
+async def _async_run(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, entity_id: str
+) -> None:
+    """Close the cover for 4 seconds, then leave it stopped for 6."""
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=4))
+    async_fire_time_changed(hass)
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_STOP_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=6))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_position_history_service(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that the service samples the past positions of the covers."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("history")
+    started = dt_util.utcnow()
+    await _async_run(hass, freezer, entity_id)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "position_history",
+        {
+            ATTR_ENTITY_ID: entity_id,
+            "start": started - timedelta(seconds=2),
+            "interval": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        entity_id: {
+            "start": (started - timedelta(seconds=2)).isoformat(),
+            "interval": 2.0,
+            "positions": [None, 100, 80, 60, 60, 60, 60],
+        }
+    }
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "position_history",
+            {
+                ATTR_ENTITY_ID: entity_id,
+                "start": started - timedelta(seconds=MAX_SAMPLES),
+                "interval": 0.5,
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_position_history_websocket(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    freezer: FrozenDateTimeFactory,
+    setup_cover: SetupCover,
+) -> None:
+    """Test that the websocket command answers for many covers at once."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("history")
+    started = dt_util.utcnow()
+    await _async_run(hass, freezer, entity_id)
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {
+            "type": f"{DOMAIN}/position_history",
+            "entity_ids": [entity_id, "cover.unknown"],
+            "start": started.isoformat(),
+            "end": (started + timedelta(seconds=4)).isoformat(),
+            "interval": 1,
+        }
+    )
+    result = await client.receive_json()
+    assert result["success"]
+    assert result["result"]["history"] == {
+        entity_id: {
+            "start": started.isoformat(),
+            "interval": 1.0,
+            "positions": [100, 90, 80, 70, 60],
+        }
+    }
+
+    await client.send_json_auto_id(
+        {
+            "type": f"{DOMAIN}/position_history",
+            "entity_ids": [entity_id],
+            "start": started.isoformat(),
+            "end": (started - timedelta(seconds=1)).isoformat(),
+        }
+    )
+    result = await client.receive_json()
+    assert not result["success"]
@@ -0,0 +1,170 @@
+"""Test learning the travel times from end-stop sensors."""
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import (
+    SERVICE_CLOSE_COVER,
+    SERVICE_OPEN_COVER,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.learning import (
+    STORAGE_KEY,
+    LearnedTravelTimes,
+    RunningEstimate,
+    TravelTimeStore,
+)
+from tests.const import MOCK_CONFIG, SetupCover
+
+CLOSED_SENSOR = "binary_sensor.shutter_closed"
+OPEN_SENSOR = "binary_sensor.shutter_open"
+
+
+async def _setup_learning_cover(hass: HomeAssistant, setup_cover: SetupCover) -> str:
+    """Set up a cover bound to end-stop sensors, standing open."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    hass.states.async_set(OPEN_SENSOR, "on")
+    hass.states.async_set(CLOSED_SENSOR, "off")
+    return await setup_cover(
+        "test-learning", closed_sensor=CLOSED_SENSOR, open_sensor=OPEN_SENSOR
+    )
+
+
+async def _tick(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: float
+) -> None:
+    """Advance the time and run what is due."""
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+def test_running_estimate():
+    """Test the running estimate and its outlier rejection."""
+    estimate = RunningEstimate(10)
+    for _ in range(3):
+        assert estimate.update(20)
+    assert estimate.value == pytest.approx(14.88)
+    assert estimate.samples == 3
+
+    assert not estimate.update(30)
+    assert estimate.value == pytest.approx(14.88)
+
+
+def test_learned_travel_times_round_trip():
+    """Test that the learned travel times survive storage."""
+    learned = LearnedTravelTimes.from_configured(10, 12)
+    learned.down.update(11)
+
+    assert LearnedTravelTimes.from_dict(learned.as_dict()) == learned
+
+
+async def test_store(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test loading, resetting and the batched saving of the store."""
+    stored = LearnedTravelTimes.from_configured(10, 10)
+    stored.down.update(15)
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {"kept": stored.as_dict(), "reset": stored.as_dict()},
+    }
+    store = TravelTimeStore(hass)
+    await store.async_load()
+
+    assert store.async_get("kept", 10, 10) == stored
+    # New configured travel times start over.
+    assert store.async_get("reset", 20, 10).down == RunningEstimate(20)
+
+    store.async_get("kept", 10, 10).up.update(5)
+    store.async_schedule_save()
+    store.async_get("kept", 10, 10).up.update(5)
+    store.async_schedule_save()
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["kept"] == stored.as_dict()
+
+    await _tick(hass, freezer, 61)
+    saved = hass_storage[STORAGE_KEY]["data"]
+    assert saved["kept"]["up"] == {"value": pytest.approx(8.2), "samples": 2}
+    assert saved["reset"]["configured"] == [20, 10]
+
+
+async def test_learns_from_end_stops(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that observed arrivals adjust the travel times without a reload."""
+    entity_id = await _setup_learning_cover(hass, setup_cover)
+    cover = hass.data[DOMAIN].covers[entity_id]
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await _tick(hass, freezer, 0.5)
+    hass.states.async_set(OPEN_SENSOR, "off")
+    await hass.async_block_till_done()
+    await _tick(hass, freezer, 11.5)
+    hass.states.async_set(CLOSED_SENSOR, "on")
+    await hass.async_block_till_done()
+
+    # Latency: 0.2 * 0.5 s; travel: 10 s + 0.2 * (12 s - 10 s).
+    assert cover._learned.latency.value == pytest.approx(0.1)
+    assert cover._learned.down.value == pytest.approx(10.4)
+    assert cover._learned.up.value == 10
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_OPEN_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    hass.states.async_set(CLOSED_SENSOR, "off")
+    await hass.async_block_till_done()
+    assert cover.travel_calculator.travel_plan().speed == pytest.approx(10)
+
+
+async def test_end_stop_reached_early(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that reaching the target end stop ends the movement right away."""
+    entity_id = await _setup_learning_cover(hass, setup_cover)
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await _tick(hass, freezer, 8)
+    hass.states.async_set(CLOSED_SENSOR, "on")
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.state == "closed"
+    assert state.attributes["current_position"] == 0
+
+    # The arrival timer was cancelled.
+    await _tick(hass, freezer, 3)
+    assert hass.states.get(entity_id).state == "closed"
+
+
+async def test_stopped_move_is_not_learned(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that a stopped movement teaches nothing."""
+    entity_id = await _setup_learning_cover(hass, setup_cover)
+    cover = hass.data[DOMAIN].covers[entity_id]
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await _tick(hass, freezer, 5)
+    await hass.services.async_call(
+        COVER_DOMAIN, "stop_cover", {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    hass.states.async_set(CLOSED_SENSOR, "on")
+    await hass.async_block_till_done()
+
+    assert cover._learned.down.samples == 0
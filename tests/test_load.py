@@ -0,0 +1,224 @@
+"""
+Load and latency benchmark against emulated gateways.
+
+Many covers share a few mock gateways, each transmission taking a while, so
+commands contend for airtime the way they do with real hardware. The run
+reports the command throughput and how far the positions the covers believe
+in drift from their motors. Its size can be raised with the
+RF_COVER_LOAD_COVERS environment variable.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import (
+    ATTR_POSITION,
+    SERVICE_CLOSE_COVER,
+    SERVICE_SET_COVER_POSITION,
+)
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed_exact,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.time_based_cover import TimeBasedCover
+from tests.const import MOCK_CONFIG
+from tests.mock_remote import (
+    MockGateway,
+    MockMotor,
+    async_setup_mock_gateways,
+    position_error,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+COVERS = int(os.environ.get("RF_COVER_LOAD_COVERS", "12"))
+GATEWAYS = 3
+TRANSMIT_TIME = 0.3
+TICK = 0.1
+REPEATS = 2
+REPEAT_DELAY = 0.1
+# Long enough for the queues to drain and the slowest cover to arrive.
+SETTLE = (
+    COVERS / GATEWAYS * (REPEATS + 1) * (TRANSMIT_TIME + REPEAT_DELAY)
+    + MOCK_CONFIG["travelling_time_down"]
+)
+
+
+async def _setup_fleet(
+    hass: HomeAssistant, gateways: list[MockGateway], **options: float
+) -> list[tuple[TimeBasedCover, MockMotor]]:
+    """Set up covers spread over the gateways, each bound to a motor."""
+    await async_setup_mock_gateways(hass, gateways)
+    fleet = []
+    for index in range(COVERS):
+        gateway = gateways[index % len(gateways)]
+        codes = {
+            f"{action}_command": f"{action}_{index}"
+            for action in ("open", "close", "stop")
+        }
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            data={
+                **MOCK_CONFIG,
+                **codes,
+                **options,
+                "remote_entity": gateway.entity_id,
+            },
+            entry_id=f"load-{index}",
+        )
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+        motor = MockMotor(since=time.monotonic())
+        gateway.async_bind(motor, *codes.values())
+        entity_id = async_get(hass).async_get_entity_id(
+            COVER_DOMAIN, DOMAIN, entry.entry_id
+        )
+        fleet.append((hass.data[DOMAIN].covers[entity_id], motor))
+    await hass.async_block_till_done()
+    return fleet
+
+
+async def _async_yield() -> None:
+    """
+    Let the woken tasks run.
+
+    Waiting for all tasks would wait for transmissions that only end when
+    more time passes.
+    """
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+async def _run_for(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    seconds: float,
+    fleet: list[tuple[TimeBasedCover, MockMotor]],
+) -> list[float]:
+    """Let time pass, sampling the position errors on every tick."""
+    errors = []
+    for _ in range(round(seconds / TICK)):
+        freezer.tick(timedelta(seconds=TICK))
+        async_fire_time_changed_exact(hass)
+        await _async_yield()
+        errors.extend(position_error(cover, motor) for cover, motor in fleet)
+    return errors
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Return a nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    return ordered[min(round(percent / 100 * len(ordered)), len(ordered) - 1)]
+
+
+async def test_throughput_and_position_error(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that contention delays commands without losing the positions."""
+    gateways = [
+        MockGateway(f"Gateway {index}", transmit_time=TRANSMIT_TIME)
+        for index in range(GATEWAYS)
+    ]
+    fleet = await _setup_fleet(hass, gateways)
+    entity_ids = [cover.entity_id for cover, _ in fleet]
+    rng = random.Random(41)
+
+    started = time.monotonic()
+    errors: list[float] = []
+    for _ in range(5):
+        for entity_id in entity_ids:
+            await hass.services.async_call(
+                COVER_DOMAIN,
+                SERVICE_SET_COVER_POSITION,
+                {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: rng.randrange(0, 101, 10)},
+                blocking=True,
+            )
+        errors += await _run_for(hass, freezer, 4, fleet)
+    elapsed = time.monotonic() - started
+    bursts = sum(gateway.bursts for gateway in gateways)
+    _LOGGER.info(
+        "%s covers on %s gateways: %.1f commands/s, position error p50 %.2f%%,"
+        " p95 %.2f%%, max %.2f%%",
+        COVERS,
+        GATEWAYS,
+        bursts / elapsed,
+        _percentile(errors, 50),
+        _percentile(errors, 95),
+        max(errors),
+    )
+
+    assert all(gateway.peak_on_air == 1 for gateway in gateways)
+    assert all(gateway.dropped == 0 for gateway in gateways)
+    # Queued commands reach the motors late, but never further off than
+    # the wait behind the other covers of the same gateway, twice over when
+    # a reversal takes a stop and a move, plus the tick the sample lands in.
+    lag = 2 * COVERS / GATEWAYS * TRANSMIT_TIME + TICK
+    assert max(errors) <= lag * 100 / MOCK_CONFIG["travelling_time_down"]
+
+    # The end stops take every motor back in line with its cover.
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    await _run_for(hass, freezer, SETTLE, fleet)
+    assert max(position_error(cover, motor) for cover, motor in fleet) == 0
+
+
+async def test_lossy_flapping_gateways(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that repetitions get commands through lossy, flapping gateways."""
+    gateways = [
+        MockGateway(
+            f"Gateway {index}",
+            transmit_time=TRANSMIT_TIME,
+            drop_probability=0.3,
+            seed=index,
+        )
+        for index in range(GATEWAYS)
+    ]
+    fleet = await _setup_fleet(
+        hass, gateways, repeats=REPEATS, repeat_delay=REPEAT_DELAY
+    )
+    entity_ids = [cover.entity_id for cover, _ in fleet]
+    cancel_flapping = [gateway.async_flap(period=7, downtime=1) for gateway in gateways]
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    errors = await _run_for(hass, freezer, SETTLE, fleet)
+    for cancel in cancel_flapping:
+        cancel()
+    final = [position_error(cover, motor) for cover, motor in fleet]
+    unreached = sum(not motor.received for _, motor in fleet)
+    _LOGGER.info(
+        "Lossy run: %s of %s bursts lost, p95 position error %.2f%%,"
+        " %s of %s covers never reached",
+        sum(gateway.dropped for gateway in gateways),
+        sum(gateway.bursts for gateway in gateways),
+        _percentile(errors, 95),
+        unreached,
+        COVERS,
+    )
+
+    assert all(
+        gateway.landed + gateway.dropped == gateway.bursts for gateway in gateways
+    )
+    # A cover is only left off when every burst of its command was lost, or
+    # the command was due while its gateway was away: Home Assistant skips
+    # unavailable entities, so an outage loses the rest of a deep queue.
+    for (_, motor), error in zip(fleet, final):
+        assert error <= 1 or not motor.received
+    assert unreached < COVERS
@@ -0,0 +1,78 @@
+"""Test the motor rules shared by the entity and the simulator."""
+from custom_components.rf_cover_time_based.circuits import START_GAP, CircuitScheduler
+from custom_components.rf_cover_time_based.motor import CoverMotor
+from custom_components.rf_cover_time_based.travelcalculator import (
+    TravelCalculator,
+    TravelStatus,
+)
+
+CIRCUIT = "ground floor"
+
+
+class Clock:
+    """A clock moved by hand."""
+
+    def __init__(self) -> None:
+        """Initialize the clock, at time 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the time."""
+        return self.now
+
+
+def _motor(scheduler: CircuitScheduler, name: str, clock: Clock) -> CoverMotor:
+    """Return the motor of an open cover taking 10 s each way."""
+    return CoverMotor(
+        TravelCalculator(10, 10, clock=clock), scheduler, name, CIRCUIT, clock
+    )
+
+
+def test_start_waits_for_circuit() -> None:
+    """Test that a start waits for a slot, and a running motor never does."""
+    clock = Clock()
+    scheduler = CircuitScheduler()
+    scheduler.async_set_limit(CIRCUIT, "entry", 1)
+    first = _motor(scheduler, "cover.first", clock)
+    second = _motor(scheduler, "cover.second", clock)
+
+    assert first.start_travel(0) == (TravelStatus.CLOSING, 0.0, None)
+    first.reserve()
+    assert second.start_travel(0) == (
+        TravelStatus.CLOSING,
+        10 + START_GAP,
+        10 + START_GAP,
+    )
+    second.reserve()
+    assert not second.running
+
+    # Reversing a running motor keeps it running.
+    clock.now = 5
+    assert first.start_travel(100) == (TravelStatus.OPENING, 0.0, None)
+
+
+def test_stop_and_arrival_commands() -> None:
+    """Test which stops and arrivals need a stop command."""
+    clock = Clock()
+    scheduler = CircuitScheduler()
+    scheduler.async_set_limit(CIRCUIT, "entry", 1)
+    first = _motor(scheduler, "cover.first", clock)
+    second = _motor(scheduler, "cover.second", clock)
+    assert first.stop() is None
+
+    first.start_travel(0)
+    first.reserve()
+    second.start_travel(0)
+    second.reserve()
+    # The second motor is still waiting for the first one.
+    assert second.stop() is False
+    assert first.stop() is True
+
+    # The end stops halt the motor, anywhere else it has to be told.
+    first.start_travel(40)
+    clock.now = 10
+    assert first.arrive() == (40, True)
+    first.start_travel(100)
+    clock.now = 20
+    assert first.arrive() == (100, False)
+    assert "cover.first" not in scheduler._runs[CIRCUIT]
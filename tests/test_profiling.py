@@ -0,0 +1,123 @@
+"""Test the on-demand profiler."""
+import asyncio
+import marshal
+from pathlib import Path
+
+import pytest
+
+from custom_components.rf_cover_time_based.profiling import (
+    MODE_DETERMINISTIC,
+    MODE_SAMPLING,
+    ProfileSession,
+)
+
+
+def _busy(iterations: int) -> int:
+    """Burn some CPU time."""
+    return sum(i * i for i in range(iterations))
+
+
+class Worker:
+    """A class with profiled and unprofiled methods."""
+
+    def step(self) -> int:
+        """A profiled sync method, calling another one."""
+        return self.inner()
+
+    def inner(self) -> int:
+        """A nested profiled method."""
+        return _busy(20000)
+
+    async def run(self) -> int:
+        """A profiled coroutine that suspends in the middle."""
+        first = _busy(20000)
+        await asyncio.sleep(0)
+        return first + self.step()
+
+    def unprofiled(self) -> int:
+        """A method left out of the session."""
+        return _busy(20000)
+
+
+def _names(stats: dict) -> set[str]:
+    """Return the function names in pstats-style stats."""
+    return {name for _, _, name in stats}
+
+
+async def test_deterministic_session(tmp_path) -> None:
+    """Test that only the profiled methods are measured and then restored."""
+    originals = {name: Worker.__dict__[name] for name in ("step", "inner", "run")}
+    session = ProfileSession(Worker, originals, MODE_DETERMINISTIC)
+    worker = Worker()
+
+    worker.unprofiled()
+    session.start()
+    assert Worker.__dict__["step"] is not originals["step"]
+    assert await worker.run() == 2 * _busy(20000)
+    _busy(20000)
+    session.stop()
+
+    for name, original in originals.items():
+        assert Worker.__dict__[name] is original
+
+    stats = session.stats()
+    assert {"run", "step", "inner", "_busy"} <= _names(stats)
+    assert "unprofiled" not in _names(stats)
+
+    pstats_path, collapsed_path = session.write(str(tmp_path / "profile"))
+    assert _names(marshal.loads(Path(pstats_path).read_bytes())) == _names(stats)
+    lines = Path(collapsed_path).read_text(encoding="utf-8").splitlines()
+    assert lines
+    for line in lines:
+        stack, weight = line.rsplit(" ", 1)
+        assert int(weight) > 0
+        assert stack
+    assert any("step (" in line and "_busy (" in line for line in lines)
+
+
+async def test_exception_propagates() -> None:
+    """Test that exceptions raised in profiled methods still propagate."""
+
+    class Failing:
+        async def run(self) -> None:
+            await asyncio.sleep(0)
+            raise ValueError
+
+    session = ProfileSession(Failing, ["run"])
+    session.start()
+    with pytest.raises(ValueError):
+        await Failing().run()
+    session.stop()
+
+
+def test_stale_wrapper_is_inactive() -> None:
+    """Test that a wrapper held past the session does not measure anymore."""
+    session = ProfileSession(Worker, ["inner"])
+    session.start()
+    stale = Worker().inner
+    session.stop()
+
+    stale()
+    assert "inner" not in _names(session.stats())
+
+
+def test_sampling_session(tmp_path) -> None:
+    """Test that the sampler records stacks inside the profiled methods."""
+    session = ProfileSession(Worker, ["inner"], MODE_SAMPLING, interval=0.0005)
+    session.start()
+    worker = Worker()
+    for _ in range(50):
+        worker.inner()
+    session.stop()
+
+    collapsed = session.collapsed()
+    assert collapsed
+    assert all("inner (" in stack for stack in collapsed)
+    stats = session.stats()
+    assert "inner" in _names(stats)
+
+    pstats_path, collapsed_path = session.write(str(tmp_path / "profile"))
+    with open(pstats_path, "rb") as file:
+        assert marshal.load(file) == stats
+    with open(collapsed_path, encoding="utf-8") as file:
+        assert file.read()
@@ -0,0 +1,78 @@
+"""Test tracking the presses of the physical remotes."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import SERVICE_CLOSE_COVER
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_CALL_SERVICE
+from homeassistant.core import Event, HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.rf_cover_time_based.const import EVENT_CODE_RECEIVED
+from tests.const import MOCK_CONFIG, SetupCover
+
+RECEIVER = "sensor.rf_receiver"
+TRACKED = {"track_remote_presses": True, "receiver_entity": RECEIVER}
+
+
+async def test_press_received_as_event(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that a sniffed press moves the cover without sending anything."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("test-tracked", **TRACKED)
+    service_events: list[Event] = async_capture_events(hass, EVENT_CALL_SERVICE)
+
+    hass.bus.async_fire(EVENT_CODE_RECEIVED, {"code": MOCK_CONFIG["close_command"]})
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "closing"
+
+    freezer.tick(timedelta(seconds=4))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    hass.bus.async_fire(EVENT_CODE_RECEIVED, {"code": MOCK_CONFIG["stop_command"]})
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.state == "open"
+    assert state.attributes["current_position"] == 60
+    assert not service_events
+
+
+async def test_press_received_as_receiver_state(
+    hass: HomeAssistant, setup_cover: SetupCover
+) -> None:
+    """Test that a code reported by a receiver sensor is followed."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("test-tracked", **TRACKED)
+
+    hass.states.async_set(RECEIVER, "b64:unrelated_code")
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "open"
+
+    hass.states.async_set(RECEIVER, MOCK_CONFIG["close_command"])
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "closing"
+
+
+async def test_own_transmission_is_ignored(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that hearing our own command does not restart the movement."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("test-tracked", **TRACKED)
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await hass.async_block_till_done()
+    started_at = hass.states.get(entity_id).attributes["travel_started_at"]
+
+    freezer.tick(timedelta(seconds=1))
+    hass.bus.async_fire(EVENT_CODE_RECEIVED, {"code": MOCK_CONFIG["close_command"]})
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes["travel_started_at"] == started_at
@@ -0,0 +1,282 @@
+"""Test the scene snapshots and their minimal-move restore."""
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+    async_fire_time_changed_exact,
+)
+
+from custom_components.rf_cover_time_based.circuits import START_GAP
+from custom_components.rf_cover_time_based.const import DOMAIN
+from tests.const import MOCK_CONFIG, SetupCover
+
+GATEWAY_A = "remote.gateway_a"
+GATEWAY_B = "remote.gateway_b"
+
+
+async def test_restore_scene(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that only covers out of the deadband move, with shared commands."""
+    hass.states.async_set(GATEWAY_A, "on")
+    hass.states.async_set(GATEWAY_B, "on")
+    # Two covers on the same group channel, one of their own, and one on
+    # another gateway.
+    left = await setup_cover("left", remote_entity=GATEWAY_A)
+    right = await setup_cover("right", remote_entity=GATEWAY_A)
+    study = await setup_cover(
+        "study", remote_entity=GATEWAY_A, open_command="b64:study_open"
+    )
+    kitchen = await setup_cover(
+        "kitchen", remote_entity=GATEWAY_B, open_command="b64:kitchen_open"
+    )
+    covers = hass.data[DOMAIN].covers
+    for entity_id, position in ((study, 30), (kitchen, 51)):
+        covers[entity_id].travel_calculator.set_known_position(position)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "snapshot_scene",
+        {"scene_id": "evening"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["positions"] == {left: 100, right: 100, study: 30, kitchen: 51}
+
+    for entity_id, position in ((left, 0), (right, 0), (study, 31), (kitchen, 20)):
+        covers[entity_id].travel_calculator.set_known_position(position)
+    sent: list[tuple[str, str]] = []
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.append((call.data[ATTR_ENTITY_ID], call.data["command"][0]))
+
+    # Replaces the service of the remote integration, loaded with ours.
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    now = dt_util.utcnow().isoformat()
+    response = await hass.services.async_call(
+        DOMAIN,
+        "restore_scene",
+        {"scene_id": "evening"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        "moved": sorted([left, right, kitchen]),
+        "stopped": [],
+        "skipped": [study],
+        "locked": [],
+        "motor_starts": {left: now, right: now, kitchen: now},
+        # One open for the group channel, and an open and a stop for the
+        # kitchen, which stops halfway.
+        "transmissions": 3,
+    }
+    for entity_id in (left, right, kitchen):
+        assert hass.states.get(entity_id).state == "opening"
+
+    freezer.tick(timedelta(seconds=11))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert sent == [
+        (GATEWAY_A, "b64:open_code"),
+        (GATEWAY_B, "b64:kitchen_open"),
+        (GATEWAY_B, "b64:stop_code"),
+    ]
+    assert hass.states.get(kitchen).attributes["current_position"] == 51
+    assert hass.states.get(left).attributes["current_position"] == 100
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, "restore_scene", {"scene_id": "morning"}, blocking=True
+        )
+
+
+async def test_partial_restore(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that locked, passing and removed covers are left out of the moves."""
+    hass.states.async_set(GATEWAY_A, "on")
+    hass.states.async_set(GATEWAY_B, "on")
+    left = await setup_cover("left", remote_entity=GATEWAY_A)
+    awning = await setup_cover(
+        "awning",
+        remote_entity=GATEWAY_A,
+        device_class="awning",
+        close_command="b64:awning_close",
+    )
+    passing = await setup_cover(
+        "passing", remote_entity=GATEWAY_B, open_command="b64:passing_open"
+    )
+    await setup_cover("gone", remote_entity=GATEWAY_B)
+    covers = hass.data[DOMAIN].covers
+    covers[passing].travel_calculator.set_known_position(50)
+    await hass.services.async_call(
+        DOMAIN, "snapshot_scene", {"scene_id": "evening"}, blocking=True
+    )
+
+    # One cover is removed, one locked out and one opening through its spot.
+    await hass.config_entries.async_remove("gone")
+    await hass.services.async_call(
+        DOMAIN, "emergency_retract", {"lockout": 60}, blocking=True
+    )
+    covers[left].travel_calculator.set_known_position(0)
+    covers[passing].travel_calculator.set_known_position(0)
+    await hass.services.async_call(
+        COVER_DOMAIN, "open_cover", {ATTR_ENTITY_ID: passing}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "restore_scene",
+        {"scene_id": "evening"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        "moved": [left],
+        "stopped": [passing],
+        "skipped": [],
+        "locked": [awning],
+        "motor_starts": {left: dt_util.utcnow().isoformat()},
+        "transmissions": 2,
+    }
+    await hass.async_block_till_done()
+    state = hass.states.get(passing)
+    assert state.state == "open"
+    assert state.attributes["current_position"] == 50
+    assert hass.states.get(awning).state == "closing"
+
+
+async def test_superseded_restore(hass: HomeAssistant, setup_cover: SetupCover) -> None:
+    """Test that a shared transmission is dropped once all its covers moved on."""
+    hass.states.async_set(GATEWAY_A, "on")
+    left = await setup_cover("left", remote_entity=GATEWAY_A)
+    right = await setup_cover("right", remote_entity=GATEWAY_A)
+    study = await setup_cover(
+        "study", remote_entity=GATEWAY_A, close_command="b64:study_close"
+    )
+    await hass.services.async_call(
+        DOMAIN,
+        "snapshot_scene",
+        {"scene_id": "evening", ATTR_ENTITY_ID: [left, right]},
+        blocking=True,
+    )
+    covers = hass.data[DOMAIN].covers
+    sent: list[str] = []
+    release = asyncio.Event()
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.append(call.data["command"][0])
+        if call.data["command"][0] == "b64:study_close":
+            # Keeps the gateway busy, so the next commands stay queued.
+            await release.wait()
+
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    async def _restore_while_busy(*superseding: str) -> None:
+        """Restore the scene behind a busy gateway, then close some covers."""
+        sent.clear()
+        release.clear()
+        for entity_id in (left, right):
+            covers[entity_id].travel_calculator.set_known_position(0)
+        covers[study].travel_calculator.set_known_position(100)
+        await hass.services.async_call(
+            COVER_DOMAIN, "close_cover", {ATTR_ENTITY_ID: study}, blocking=True
+        )
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert sent == ["b64:study_close"]
+        await hass.services.async_call(
+            DOMAIN, "restore_scene", {"scene_id": "evening"}, blocking=True
+        )
+        for entity_id in superseding:
+            await hass.services.async_call(
+                COVER_DOMAIN, "stop_cover", {ATTR_ENTITY_ID: entity_id}, blocking=True
+            )
+        release.set()
+        await hass.async_block_till_done()
+
+    # The group channel still opens the cover that kept the scene.
+    await _restore_while_busy(left)
+    assert sent == ["b64:study_close", "b64:open_code", "b64:stop_code"]
+    assert hass.states.get(right).state == "opening"
+
+    # Once both covers were told otherwise, the scene command is not sent.
+    await _restore_while_busy(left, right)
+    assert sent == ["b64:study_close", "b64:stop_code", "b64:stop_code"]
+
+
+async def test_restore_scene_on_circuit(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test that covers waiting for their circuit are grouped by start slot."""
+    hass.states.async_set(GATEWAY_A, "on")
+    # Two covers alone, and two on a group channel, two motors at a time.
+    covers = [
+        await setup_cover(
+            f"cover_{index}",
+            remote_entity=GATEWAY_A,
+            open_command=command,
+            circuit="ground floor",
+            circuit_limit=2,
+        )
+        for index, command in enumerate(["open_0", "open_1", "group", "group"])
+    ]
+    await hass.services.async_call(
+        DOMAIN, "snapshot_scene", {"scene_id": "morning"}, blocking=True
+    )
+    for entity_id in covers:
+        hass.data[DOMAIN].covers[entity_id].travel_calculator.set_known_position(0)
+    sent: list[tuple[float, str]] = []
+
+    async def async_send_command(call: ServiceCall) -> None:
+        sent.append((time.monotonic(), call.data["command"][0]))
+
+    hass.services.async_register("remote", "send_command", async_send_command)
+
+    started = time.monotonic()
+    now = dt_util.utcnow()
+    response = await hass.services.async_call(
+        DOMAIN,
+        "restore_scene",
+        {"scene_id": "morning"},
+        blocking=True,
+        return_response=True,
+    )
+    await hass.async_block_till_done()
+
+    delay = MOCK_CONFIG["travelling_time_up"] + START_GAP
+    later = (now + timedelta(seconds=delay)).isoformat()
+    assert response["motor_starts"] == {
+        covers[0]: now.isoformat(),
+        covers[1]: now.isoformat(),
+        covers[2]: later,
+        covers[3]: later,
+    }
+    # The group channel is not sent along with the covers starting now.
+    assert response["transmissions"] == 3
+    assert sorted(command for _, command in sent) == ["open_0", "open_1"]
+    assert hass.states.get(covers[3]).attributes["travel_started_at"] == later
+
+    # A cover stopped while waiting leaves the group channel to the other.
+    await hass.services.async_call(
+        COVER_DOMAIN, "stop_cover", {ATTR_ENTITY_ID: covers[2]}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=delay))
+    async_fire_time_changed_exact(hass)
+    await hass.async_block_till_done()
+    assert sent[2:] == [(pytest.approx(started + delay), "group")]
+    assert hass.states.get(covers[2]).attributes["current_position"] == 0
+    assert hass.states.get(covers[3]).state == "opening"
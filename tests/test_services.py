@@ -0,0 +1,113 @@
+"""Test the integration-wide services."""
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.time_based_cover import TimeBasedCover
+from tests.const import MOCK_CONFIG
+
+
+async def test_apply_calibration(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test that suggested travelling times are applied to the options."""
+    entity_id = async_get(hass).async_get_entity_id(
+        "cover", DOMAIN, init_integration.entry_id
+    )
+
+    await hass.services.async_call(
+        DOMAIN,
+        "apply_calibration",
+        {
+            "suggestions": [
+                {ATTR_ENTITY_ID: entity_id, "travelling_time_down": "21.4"},
+            ]
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert init_integration.options == {"travelling_time_down": 21.4}
+    cover = hass.data[DOMAIN].covers[entity_id]
+    assert cover._travel_time_down == 21.4
+    assert cover._travel_time_up == MOCK_CONFIG["travelling_time_up"]
+
+
+async def test_apply_calibration_unknown_cover(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> None:
+    """Test that nothing is applied if any cover is not ours."""
+    entity_id = async_get(hass).async_get_entity_id(
+        "cover", DOMAIN, init_integration.entry_id
+    )
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "apply_calibration",
+            {
+                "suggestions": [
+                    {ATTR_ENTITY_ID: entity_id, "travelling_time_down": 21},
+                    {ATTR_ENTITY_ID: "cover.other", "travelling_time_down": 21},
+                ]
+            },
+            blocking=True,
+        )
+    assert init_integration.options == {}
+
+
+async def test_profile(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+    tmp_path,
+) -> None:
+    """Test that a profiling session writes the stats of the callbacks."""
+    hass.config.config_dir = str(tmp_path)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = async_get(hass).async_get_entity_id(
+        "cover", DOMAIN, init_integration.entry_id
+    )
+    originals = {
+        name: TimeBasedCover.__dict__[name]
+        for name in ("async_update_position", "_async_trigger_travel")
+    }
+
+    await hass.services.async_call(DOMAIN, "profile", {"duration": 5}, blocking=True)
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(DOMAIN, "profile", {}, blocking=True)
+
+    await hass.services.async_call(
+        "cover", "close_cover", {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    for _ in range(6):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    for name, original in originals.items():
+        assert TimeBasedCover.__dict__[name] is original
+    assert hass.data[DOMAIN].profile is None
+
+    written = sorted(path.suffix for path in tmp_path.iterdir())
+    assert written == [".collapsed", ".pstats"]
+    collapsed = next(tmp_path.glob("*.collapsed")).read_text(encoding="utf-8")
+    assert "_async_trigger_travel" in collapsed
+    assert "async_update_position" in collapsed
+
+    # The position updates keep working with the original methods.
+    for _ in range(10):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes["current_position"] == 0
@@ -0,0 +1,153 @@
+"""Test the shadow evaluation of alternative travel models."""
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import (
+    ATTR_POSITION,
+    SERVICE_SET_COVER_POSITION,
+)
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.shadow import CURRENT, ShadowEvaluator
+from tests.const import MOCK_CONFIG, SetupCover
+
+
+def _scores(evaluator: ShadowEvaluator) -> dict[str, tuple[float, float]]:
+    """Return the mean and max errors of the models, most accurate first."""
+    return {
+        entry["name"]: (entry["mean_error"], entry["max_error"])
+        for entry in evaluator.leaderboard()
+    }
+
+
+def test_evaluator() -> None:
+    """Test that latency and speed errors show, even at the end stops."""
+    evaluator = ShadowEvaluator(
+        [
+            {
+                "name": "fast",
+                "travelling_time_down": 8,
+                "travelling_time_up": 8,
+            },
+            {
+                "name": "late",
+                "travelling_time_down": 10,
+                "travelling_time_up": 10,
+                "latency": 1,
+            },
+        ],
+        10,
+        10,
+        0,
+        100,
+        100,
+    )
+    assert list(_scores(evaluator)) == [CURRENT, "fast", "late"]
+
+    evaluator.start_travel(0, 0)
+    # The motor leaves the open end stop a second after the command...
+    evaluator.observe(1, 100, anchor=False)
+    # ...and reaches the closed one 10 seconds later, when the models too
+    # fast have been there for a while.
+    evaluator.observe(11, 0)
+    assert _scores(evaluator) == {
+        "late": (0, 0),
+        CURRENT: (10, 10),
+        "fast": (25, 37.5),
+    }
+
+    # Reaching the end stop anchored the models to it.
+    evaluator.start_travel(20, 100)
+    evaluator.stop_travel(22)
+    evaluator.observe(30, 10)
+    assert _scores(evaluator)["late"] == (pytest.approx(3.33), 10)
+
+    evaluator.set_current_travel_times(40, 5, 5)
+    assert evaluator.current.as_dict()["travelling_time_down"] == 5
+
+
+async def test_shadow_services(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, setup_cover: SetupCover
+) -> None:
+    """Test scoring the models on a manual correction, then promoting one."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_id = await setup_cover("shadow")
+    await hass.services.async_call(
+        DOMAIN,
+        "start_shadow",
+        {
+            ATTR_ENTITY_ID: entity_id,
+            "candidates": [
+                {"name": "slow", "travelling_time_down": 12.5},
+                {"name": "fast", "travelling_time_down": 8},
+            ],
+        },
+        blocking=True,
+    )
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "start_shadow",
+            {ATTR_ENTITY_ID: entity_id, "candidates": [{"name": CURRENT}]},
+            blocking=True,
+        )
+
+    await hass.services.async_call(
+        COVER_DOMAIN,
+        SERVICE_SET_COVER_POSITION,
+        {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: 50},
+        blocking=True,
+    )
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "correct_position",
+            {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: 60},
+            blocking=True,
+        )
+    freezer.tick(timedelta(seconds=5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    # The cover was slower than configured, and stopped at 60.
+    await hass.services.async_call(
+        DOMAIN,
+        "correct_position",
+        {ATTR_ENTITY_ID: entity_id, ATTR_POSITION: 60},
+        blocking=True,
+    )
+    assert hass.states.get(entity_id).attributes["current_position"] == 60
+    response = await hass.services.async_call(
+        DOMAIN,
+        "shadow_report",
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+        return_response=True,
+    )
+    assert [
+        (entry["name"], entry["mean_error"], entry["travelling_time_up"])
+        for entry in response[entity_id]["leaderboard"]
+    ] == [("slow", 0, 10), (CURRENT, 10, 10), ("fast", 22.5, 10)]
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "promote_shadow",
+            {ATTR_ENTITY_ID: entity_id, "name": "unknown"},
+            blocking=True,
+        )
+    await hass.services.async_call(
+        DOMAIN, "promote_shadow", {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await hass.async_block_till_done()
+    entry = hass.config_entries.async_get_entry("shadow")
+    assert entry.options["travelling_time_down"] == 12.5
+    assert entry.options["travelling_time_up"] == 10
@@ -0,0 +1,159 @@
+"""Test the offline fleet simulator."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.rf_cover_time_based.simulate import (
+    main,
+    parse_time,
+    simulate,
+)
+from tests.const import MOCK_CONFIG
+
+COVERS = [{**MOCK_CONFIG, "name": "shutter", "count": 4}]
+
+
+def test_parse_time():
+    """Test the scenario time formats."""
+    assert parse_time(90) == 90
+    assert parse_time("07:30") == 27000
+    assert parse_time("00:01:02.5") == 62.5
+    with pytest.raises(ValueError):
+        parse_time("7")
+
+
+def test_shared_gateway_queues_commands():
+    """Test that covers on one gateway wait for each other's transmissions."""
+    report = simulate(COVERS, [{"at": 0, "action": "close"}], transmit_time=1)
+
+    gateway = report.gateways[MOCK_CONFIG["remote_entity"]]
+    assert gateway.transmissions == 4
+    # All four are queued before the gateway starts sending.
+    assert gateway.peak_depth == 4
+    assert sorted(report.latencies) == [1, 2, 3, 4]
+    # The covers are already open, so only the closing takes 10 s.
+    assert sorted(report.completions) == [11, 12, 13, 14]
+    assert report.spreads == {0: 3}
+    assert report.duration == 10
+
+
+def test_intermediate_position_sends_stop():
+    """Test that a move to an intermediate position ends with a stop."""
+    report = simulate(
+        COVERS,
+        [{"at": "00:01", "covers": ["shutter_1"], "position": 40}],
+        transmit_time=0.5,
+    )
+
+    assert report.gateways[MOCK_CONFIG["remote_entity"]].transmissions == 2
+    assert report.completions == [6.5]
+
+
+def test_interrupted_move_is_not_completed():
+    """Test that a stopped movement does not count as completed."""
+    report = simulate(
+        COVERS,
+        [
+            {"at": 0, "covers": ["shutter_2"], "action": "close"},
+            {"at": 5, "covers": ["shutter_2"], "action": "stop"},
+        ],
+    )
+
+    assert report.completions == []
+    assert report.gateways[MOCK_CONFIG["remote_entity"]].transmissions == 2
+
+
+def test_maintenance_commands_yield():
+    """Test that maintenance commands are sent after interactive ones."""
+    report = simulate(
+        COVERS,
+        [
+            {
+                "at": 0,
+                "covers": ["shutter_1", "shutter_2"],
+                "action": "close",
+                "priority": "maintenance",
+            },
+            {"at": 0.1, "covers": ["shutter_3"], "action": "close"},
+        ],
+        transmit_time=1,
+    )
+
+    # The first maintenance command is already on air; the interactive one
+    # overtakes the second.
+    assert report.latencies == [1, 1.9, 3]
+
+
+def test_superseded_command_is_dropped():
+    """Test that a command superseded while queued is never sent."""
+    report = simulate(
+        COVERS,
+        [
+            {"at": 0, "action": "close"},
+            {"at": 0.5, "covers": ["shutter_4"], "action": "stop"},
+        ],
+        transmit_time=1,
+    )
+
+    gateway = report.gateways[MOCK_CONFIG["remote_entity"]]
+    # The closing of shutter_4 was still waiting, only its stop is sent.
+    assert gateway.transmissions == 4
+    assert gateway.dropped == 1
+    assert sorted(report.completions) == [11, 12, 13]
+
+
+def test_repeated_commands():
+    """Test that the repetitions hold the gateway, but the first one starts."""
+    report = simulate(
+        [{**COVERS[0], "count": 2, "repeats": 2, "repeat_delay": 0.4}],
+        [{"at": 0, "action": "close"}],
+        transmit_time=0.5,
+    )
+
+    gateway = report.gateways[MOCK_CONFIG["remote_entity"]]
+    assert gateway.airtime == pytest.approx(3)
+    assert report.latencies == pytest.approx([2.3, 4.6])
+    assert report.completions == pytest.approx([10.5, 12.8])
+
+
+def test_circuit_staggers_starts():
+    """Test that a motor waits for a free slot on its circuit."""
+    report = simulate(
+        [
+            {
+                **COVERS[0],
+                "count": 3,
+                "circuit": "ground floor",
+                "circuit_limit": 2,
+            }
+        ],
+        [
+            {"at": 0, "action": "close"},
+            {"at": 5, "covers": ["shutter_1"], "action": "open"},
+        ],
+        transmit_time=0.5,
+    )
+
+    # A running motor reverses at once, and the third one starts half a
+    # second after the first two were planned to stop.
+    assert sorted(report.completions) == pytest.approx([5.5, 11, 21])
+    assert report.duration == pytest.approx(20.5)
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    """Test the command line entry point."""
+    covers = tmp_path / "covers.json"
+    covers.write_text(json.dumps({"covers": COVERS}))
+    scenario = tmp_path / "scenario.json"
+    scenario.write_text(
+        json.dumps({"events": [{"at": "07:00", "action": "close"}]})
+    )
+
+    assert main([str(covers), str(scenario), "--transmit-time", "1"]) == 0
+
+    output = capsys.readouterr().out
+    assert "Simulated 4 covers on 1 gateways over 7:00:10" in output
+    assert "4 sent, 0 superseded, peak queue 4" in output
+    assert "Widest completion spread: 3.0 s (event 0 at 7:00:00)" in output
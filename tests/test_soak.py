@@ -0,0 +1,166 @@
+"""
+Soak test for listener, timer and object leaks.
+
+Cycles many config entries through setup, options reloads, unload and a
+large number of motion commands, and checks that the number of listeners,
+timers and live entities stays flat. The size of the run can be raised with
+the RF_COVER_SOAK_CYCLES environment variable for a long soak.
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import tracemalloc
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import (
+    ATTR_POSITION,
+    SERVICE_CLOSE_COVER,
+    SERVICE_OPEN_COVER,
+    SERVICE_SET_COVER_POSITION,
+    SERVICE_STOP_COVER,
+)
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from custom_components.rf_cover_time_based.time_based_cover import TimeBasedCover
+from tests.const import MOCK_CONFIG
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTRIES = 5
+CYCLES = int(os.environ.get("RF_COVER_SOAK_CYCLES", "4"))
+COMMANDS_PER_CYCLE = 20
+
+
+def _live_covers() -> list[TimeBasedCover]:
+    """Return the cover entities still alive after a full collection."""
+    gc.collect()
+    return [obj for obj in gc.get_objects() if isinstance(obj, TimeBasedCover)]
+
+
+def _pending_timers(hass: HomeAssistant) -> int:
+    """Return the number of timers scheduled on the event loop."""
+    return sum(
+        not handle.cancelled()
+        for handle in hass.loop._scheduled  # pylint: disable=protected-access
+    )
+
+
+def _bus_listeners(hass: HomeAssistant) -> int:
+    """Return the number of event bus listeners."""
+    return sum(hass.bus.async_listeners().values())
+
+
+async def _settle(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Let every movement in progress reach its target."""
+    for _ in range(12):
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+
+async def _run_commands(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, entity_ids: list[str]
+) -> None:
+    """Send a burst of motion commands to every cover."""
+    services = [
+        (SERVICE_CLOSE_COVER, {}),
+        (SERVICE_SET_COVER_POSITION, {ATTR_POSITION: 40}),
+        (SERVICE_STOP_COVER, {}),
+        (SERVICE_OPEN_COVER, {}),
+    ]
+    for index in range(COMMANDS_PER_CYCLE):
+        service, data = services[index % len(services)]
+        await hass.services.async_call(
+            COVER_DOMAIN,
+            service,
+            {ATTR_ENTITY_ID: entity_ids, **data},
+            blocking=True,
+        )
+        freezer.tick(timedelta(seconds=0.7))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+
+async def test_soak_setup_reload_unload(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that setup, reload, unload and motion cycles do not leak."""
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entries = [
+        MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id=f"soak-{index}")
+        for index in range(ENTRIES)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_registry = async_get(hass)
+    entity_ids = [
+        entity_registry.async_get_entity_id(COVER_DOMAIN, DOMAIN, entry.entry_id)
+        for entry in entries
+    ]
+
+    baseline = None
+    tracemalloc.start()
+    try:
+        for cycle in range(CYCLES):
+            await _run_commands(hass, freezer, entity_ids)
+            await _settle(hass, freezer)
+
+            # Every options change reloads the entry.
+            for entry in entries:
+                hass.config_entries.async_update_entry(
+                    entry, options={"travelling_time_down": 10 + cycle % 2}
+                )
+            await hass.async_block_till_done()
+
+            # Unload and set up again half of the entries.
+            for entry in entries[::2]:
+                await hass.config_entries.async_unload(entry.entry_id)
+                await hass.async_block_till_done()
+                await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            await _settle(hass, freezer)
+
+            covers = _live_covers()
+            snapshot = {
+                "update_listeners": [len(entry.update_listeners) for entry in entries],
+                "bus_listeners": _bus_listeners(hass),
+                "timers": _pending_timers(hass),
+                "covers": len(covers),
+                "running_updaters": sum(
+                    cover._updater_cancel_callback is not None
+                    or cover._arrival_cancel_callback is not None
+                    for cover in covers
+                ),
+            }
+            # Do not keep this cycle's entities alive into the next one.
+            del covers
+            memory, _ = tracemalloc.get_traced_memory()
+            _LOGGER.info("Soak cycle %s: %s, %s bytes", cycle, snapshot, memory)
+
+            assert snapshot["update_listeners"] == [1] * ENTRIES
+            assert snapshot["covers"] == ENTRIES
+            assert snapshot["running_updaters"] == 0
+            if baseline is None:
+                baseline = (snapshot, memory)
+                continue
+            assert snapshot == baseline[0]
+    finally:
+        tracemalloc.stop()
+
+    _LOGGER.info(
+        "Soak memory growth after the first cycle: %s bytes", memory - baseline[1]
+    )
@@ -0,0 +1,91 @@
+"""
+Startup benchmark.
+
+Sets up many config entries at once, as on a Home Assistant restart, with
+their entities already registered and their last states saved, and logs the
+time until every cover is available at its restored position. The number of
+entries can be raised with the RF_COVER_STARTUP_ENTRIES environment variable,
+e.g. to 500 to compare startup times.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, STATE_UNAVAILABLE
+from homeassistant.core import CoreState, HomeAssistant, State
+from homeassistant.helpers.entity_registry import async_get
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    mock_restore_cache,
+)
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from tests.const import MOCK_CONFIG
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTRIES = int(os.environ.get("RF_COVER_STARTUP_ENTRIES", "50"))
+
+
+async def test_startup_restores_all_covers(hass: HomeAssistant) -> None:
+    """Test that all covers come up at their last position and tilt."""
+    hass.set_state(CoreState.not_running)
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    entity_registry = async_get(hass)
+    positions = {}
+    for index in range(ENTRIES):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Cover {index}",
+            # Every other cover is a venetian blind.
+            data={**MOCK_CONFIG, "tilt_time": 2} if index % 2 else MOCK_CONFIG,
+            entry_id=f"startup-{index}",
+        )
+        entry.add_to_hass(hass)
+        entity_id = entity_registry.async_get_or_create(
+            "cover",
+            DOMAIN,
+            entry.entry_id,
+            config_entry=entry,
+            suggested_object_id=f"cover_{index}",
+        ).entity_id
+        positions[entity_id] = index % 101
+    mock_restore_cache(
+        hass,
+        [
+            State(
+                entity_id,
+                "open",
+                {"current_position": position, "current_tilt_position": 100 - position},
+            )
+            for entity_id, position in positions.items()
+        ],
+    )
+
+    started = time.perf_counter()
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - started
+    _LOGGER.info(
+        "Time to all %s covers available: %.3f s (%.2f ms per cover)",
+        ENTRIES,
+        elapsed,
+        elapsed / ENTRIES * 1000,
+    )
+
+    for index, (entity_id, position) in enumerate(positions.items()):
+        state = hass.states.get(entity_id)
+        assert state.state != STATE_UNAVAILABLE
+        assert state.attributes["current_position"] == position
+        assert state.attributes.get("current_tilt_position") == (
+            100 - position if index % 2 else None
+        )
+
+    # The positions read on startup are dropped once started.
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN].restored_positions is None
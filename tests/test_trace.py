@@ -0,0 +1,137 @@
+"""Test the motion trace of the covers."""
+
+import pytest
+
+from custom_components.rf_cover_time_based.trace import (
+    MotionTrace,
+    TraceCommand,
+    TraceEvent,
+    replay,
+)
+
+SECOND = 1_000_000_000
+
+
+def _record_close_and_stop(trace: MotionTrace, stop_position: float) -> None:
+    """Record a cover closing from open for 4 s, then stopped."""
+    trace.record(TraceEvent.KNOWN_POSITION, 100, monotonic_ns=0)
+    trace.record(TraceEvent.START, 100, 0, monotonic_ns=1 * SECOND)
+    trace.record(
+        TraceEvent.COMMAND, 100, command=TraceCommand.CLOSE, monotonic_ns=1 * SECOND
+    )
+    trace.record(TraceEvent.STOP, stop_position, monotonic_ns=5 * SECOND)
+    trace.record(
+        TraceEvent.COMMAND,
+        stop_position,
+        command=TraceCommand.STOP,
+        monotonic_ns=5 * SECOND,
+    )
+
+
+def test_ring_buffer_keeps_newest_records():
+    """Test that a full trace overwrites its oldest records."""
+    trace = MotionTrace(capacity=3)
+    for second in range(5):
+        trace.record(TraceEvent.KNOWN_POSITION, second, monotonic_ns=second)
+
+    assert len(trace) == 3
+    assert [record.monotonic_ns for record in trace.records()] == [2, 3, 4]
+
+
+def test_records_round_trip():
+    """Test that the compact columns read back as records."""
+    trace = MotionTrace()
+    trace.record(TraceEvent.START, 42.5, 10, remote=True, monotonic_ns=7)
+    trace.record(TraceEvent.COMMAND, 40, command=TraceCommand.STOP)
+
+    start, command = trace.records()
+    assert start.monotonic_ns == 7
+    assert start.event is TraceEvent.START
+    assert start.position == 42.5
+    assert start.target == 10
+    assert start.command is TraceCommand.NONE
+    assert start.remote
+    assert command.target is None
+    assert command.command is TraceCommand.STOP
+    assert not command.remote
+
+
+def test_invalid_capacity():
+    """Test that an empty trace is refused."""
+    with pytest.raises(ValueError):
+        MotionTrace(capacity=0)
+
+
+def test_replay_consistent_trace():
+    """Test that a trace matching the travel times replays without deviation."""
+    trace = MotionTrace()
+    _record_close_and_stop(trace, 60)
+    trace.record(TraceEvent.START, 60, 100, monotonic_ns=10 * SECOND)
+    trace.record(TraceEvent.ARRIVAL, 100, 100, monotonic_ns=14 * SECOND)
+
+    assert replay(trace.records(), 10, 10) == pytest.approx(0, abs=1e-4)
+
+
+def test_replay_detects_deviation():
+    """Test that a position the travel times cannot explain is reported."""
+    trace = MotionTrace()
+    _record_close_and_stop(trace, 50)
+
+    assert replay(trace.records(), 10, 10) == pytest.approx(10)
+
+
+def test_replay_starts_at_first_stationary_record():
+    """Test that a trace beginning mid-movement is seeded at the next stop."""
+    trace = MotionTrace(capacity=6)
+    _record_close_and_stop(trace, 60)
+    trace.record(TraceEvent.START, 60, 100, monotonic_ns=10 * SECOND)
+    trace.record(TraceEvent.ARRIVAL, 100, 100, monotonic_ns=14 * SECOND)
+
+    assert replay(trace.records(), 10, 10) == pytest.approx(0, abs=1e-4)
+
+
+def test_export():
+    """Test the plain data export of a trace."""
+    trace = MotionTrace()
+    _record_close_and_stop(trace, 60)
+
+    data = trace.as_dict(10, 10)
+    assert data["capacity"] == 512
+    assert data["replay_deviation"] == 0
+    assert data["records"][1] == {
+        "monotonic_ns": 1 * SECOND,
+        "event": "start",
+        "position": 100,
+        "target": 0,
+        "command": None,
+        "remote": False,
+    }
+    assert data["records"][2]["command"] == "close"
+
+
+def test_replay_tilt():
+    """Test that the slats turning first are replayed, and their tilt exported."""
+    trace = MotionTrace()
+    trace.record(TraceEvent.KNOWN_POSITION, 100, tilt=100, monotonic_ns=0)
+    trace.record(TraceEvent.TILT, 100, 50, tilt=100, monotonic_ns=1 * SECOND)
+    trace.record(TraceEvent.ARRIVAL, 100, 100, tilt=50, monotonic_ns=2 * SECOND)
+    # Closing first turns the slats the rest of the way, for 1 s.
+    trace.record(TraceEvent.START, 100, 0, tilt=50, monotonic_ns=3 * SECOND)
+    trace.record(TraceEvent.STOP, 70, tilt=0, monotonic_ns=7 * SECOND)
+
+    assert replay(trace.records(), 10, 10, tilt_time=2) == pytest.approx(
+        0, abs=1e-4
+    )
+    # Without the tilt time, the cover seems to travel sooner than it did.
+    assert replay(trace.records(), 10, 10) == pytest.approx(10)
+
+    data = trace.as_dict(10, 10, 2)
+    assert data["records"][1] == {
+        "monotonic_ns": 1 * SECOND,
+        "event": "tilt",
+        "position": 100,
+        "target": 50,
+        "command": None,
+        "remote": False,
+        "tilt": 100,
+    }
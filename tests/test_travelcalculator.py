@@ -6,6 +6,7 @@ from freezegun import freeze_time
 from custom_components.rf_cover_time_based.travelcalculator import (
     TravelCalculator,
     TravelStatus,
+    TravelStep,
 )
 from tests.const import MOCK_CONFIG
 
@@ -133,3 +134,261 @@ class TestTravelCalculatorCalculations:
 
         assert zero_time_calculator.current_position() == 0
         assert not is_moving, "Cover should not be moving after an instant travel"
+
+
+class TestTravelCalculatorPlan:
+    """Test the travel plan and ETA queries."""
+
+    def test_no_plan_when_stopped(self, calculator: TravelCalculator):
+        """Test that a stopped cover has no plan and nothing remaining."""
+        assert calculator.travel_plan() is None
+        assert calculator.time_remaining() == 0
+
+    @freeze_time("2023-01-01 12:00:00")
+    def test_plan_while_closing(self, calculator: TravelCalculator):
+        """Test the plan of a partial closing movement."""
+        calculator.start_travel(25)
+        plan = calculator.travel_plan()
+
+        assert plan is not None
+        assert plan.start_position == 100
+        assert plan.target_position == 25
+        assert plan.arrival_time - plan.start_time == pytest.approx(7.5)
+        assert plan.speed == pytest.approx(-10)
+        assert plan.profile == "linear"
+
+        with freeze_time("2023-01-01 12:00:05"):
+            calculator.update_position()
+            assert calculator.time_remaining() == pytest.approx(2.5)
+            # Updating the position does not move the plan's anchor.
+            assert calculator.travel_plan() == plan
+
+    @freeze_time("2023-01-01 12:00:00")
+    def test_estimated_position_has_no_side_effects(
+        self, calculator: TravelCalculator
+    ):
+        """Test that estimating the position does not advance the calculator."""
+        calculator.start_travel(0)
+
+        with freeze_time("2023-01-01 12:00:02"):
+            assert calculator.estimated_position() == pytest.approx(80)
+            assert calculator.current_position() == 100
+
+    def test_set_travel_times_while_moving(self):
+        """Test that new travel times apply from the current position."""
+        now = 0.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now)
+        calculator.start_travel(0)
+
+        now = 5.0
+        calculator.set_travel_times(20, 10)
+        plan = calculator.travel_plan()
+        assert plan.start_position == pytest.approx(50)
+        assert plan.start_time == 5
+        assert plan.arrival_time == pytest.approx(15)
+
+        with pytest.raises(ValueError):
+            calculator.set_travel_times(-1, 10)
+
+    def test_injected_clock(self):
+        """Test that the calculator runs on an injected clock."""
+        now = 1000.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now)
+        calculator.start_travel(0)
+
+        now += 4
+        assert calculator.estimated_position() == pytest.approx(60)
+        assert calculator.time_remaining() == pytest.approx(6)
+        assert calculator.travel_plan().start_time == 1000
+
+
+class TestTravelCalculatorClosedForm:
+    """Test the positions evaluated from the motion segment."""
+
+    def test_position_at_any_time(self):
+        """Test that positions are read at any time, without side effects."""
+        now = 100.0
+        calculator = TravelCalculator(10, 20, clock=lambda: now)
+        calculator.set_known_position(30)
+        calculator.start_travel(80)
+
+        assert calculator.position_at(90) == 30
+        assert calculator.position_at(105) == pytest.approx(55)
+        assert calculator.position_at(110) == 80
+        assert calculator.position_at(1000) == 80
+        # Nothing was updated by reading ahead.
+        assert calculator.current_position() == 30
+        assert calculator.is_moving()
+
+    def test_updates_do_not_accumulate_errors(self):
+        """Test that many small updates end exactly where a single one does."""
+        now = 0.0
+        calculator = TravelCalculator(7, 7, clock=lambda: now)
+        calculator.start_travel(0)
+        for _ in range(3000):
+            now += 0.001
+            calculator.update_position()
+
+        # Exactly the closed form, with no rounding built up along the way.
+        assert calculator.estimated_position() == 100 - 100 / 7 * now
+        assert calculator.travel_plan().start_position == 100
+
+    def test_tilt_at(self):
+        """Test that the tilt is evaluated from the same segment."""
+        now = 0.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now, tilt_time=2)
+        calculator.start_travel(0)
+
+        assert calculator.tilt_at(0.5) == pytest.approx(75)
+        assert calculator.position_at(0.5) == 100
+        assert calculator.tilt_at(3) == 0
+        assert calculator.position_at(3) == pytest.approx(90)
+
+
+class TestTravelCalculatorSequence:
+    """Test the sequence API of the TravelCalculator."""
+
+    def test_sequence_progress(self, calculator: TravelCalculator):
+        """Test that the steps are consumed in order."""
+        calculator.start_sequence([TravelStep(0, 2), TravelStep(20)])
+        assert calculator.sequence_progress() is None
+
+        assert calculator.advance_sequence() == TravelStep(0, 2)
+        assert calculator.sequence_progress() == (1, 2)
+        assert calculator.advance_sequence() == TravelStep(20)
+        assert calculator.sequence_progress() == (2, 2)
+
+        assert calculator.advance_sequence() is None
+        assert calculator.sequence_step is None
+        assert calculator.sequence_progress() is None
+
+    def test_cancel_sequence(self, calculator: TravelCalculator):
+        """Test that cancelling drops the remaining steps."""
+        calculator.start_sequence([TravelStep(0), TravelStep(20)])
+        calculator.advance_sequence()
+        calculator.cancel_sequence()
+
+        assert calculator.sequence_step is None
+        assert calculator.advance_sequence() is None
+
+    def test_finish_travel(self, calculator: TravelCalculator):
+        """Test that finishing a travel lands exactly on the target."""
+        calculator.start_travel(35)
+        assert calculator.finish_travel() == 35
+        assert calculator.current_position() == 35
+        assert not calculator.is_moving()
+
+
+class TestTravelCalculatorUncertainty:
+    """Test the position uncertainty bound."""
+
+    def test_partial_moves_and_reversals(self, calculator: TravelCalculator):
+        """Test that partial moves and reversals add to the uncertainty."""
+        calculator.start_travel(50)
+        calculator.finish_travel()
+        assert calculator.uncertainty == pytest.approx(1.0)
+
+        # A reversal adds the backlash on top of the travelled distance.
+        calculator.start_travel(75)
+        calculator.finish_travel()
+        assert calculator.uncertainty == pytest.approx(2.5)
+
+    def test_end_stop_clears_uncertainty(self, calculator: TravelCalculator):
+        """Test that reaching an end stop confirms the position."""
+        calculator.start_travel(50)
+        calculator.finish_travel()
+        calculator.start_travel(0)
+        assert calculator.uncertainty > 0
+
+        calculator.finish_travel()
+        assert calculator.uncertainty == 0
+
+    def test_known_position_clears_uncertainty(self, calculator: TravelCalculator):
+        """Test that setting a known position clears the uncertainty."""
+        calculator.start_travel(50)
+        calculator.stop_travel()
+        calculator.set_known_position(30)
+        assert calculator.uncertainty == 0
+
+
+class TestTravelCalculatorTilt:
+    """Test the tilt of the slats, followed on the same timeline."""
+
+    def test_no_tilt_by_default(self, calculator: TravelCalculator):
+        """Test that covers without a tilt time report no tilt in their plan."""
+        calculator.start_travel(0)
+        plan = calculator.travel_plan()
+        assert not calculator.supports_tilt
+        assert plan.start_tilt is None
+        assert plan.tilt_duration == 0
+
+    def test_tilt_before_travel(self):
+        """Test that the slats turn all the way before the cover travels."""
+        now = 0.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now, tilt_time=2)
+        calculator.set_known_tilt(50)
+        calculator.start_travel(0)
+
+        plan = calculator.travel_plan()
+        assert plan.profile == "tilt_first"
+        assert plan.start_tilt == 50
+        assert plan.target_tilt == 0
+        assert plan.tilt_duration == pytest.approx(1)
+        assert plan.arrival_time == pytest.approx(11)
+
+        now = 0.5
+        assert calculator.estimated_tilt() == pytest.approx(25)
+        assert calculator.estimated_position() == 100
+        now = 3.0
+        assert calculator.update_position()
+        assert calculator.current_tilt() == 0
+        assert calculator.current_position() == 80
+
+        # Reversing turns the slats the other way first.
+        calculator.start_travel(100)
+        now = 4.0
+        assert calculator.estimated_tilt() == pytest.approx(50)
+        assert calculator.estimated_position() == pytest.approx(80)
+        now = 6.0
+        assert calculator.estimated_position() == pytest.approx(90)
+
+    def test_tilt_only(self):
+        """Test that a tilt move turns the slats without moving the cover."""
+        now = 0.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now, tilt_time=2)
+        calculator.set_known_position(40)
+        assert calculator.start_tilt(100) is None
+
+        assert calculator.start_tilt(30) == TravelStatus.CLOSING
+        assert calculator.tilt_only
+        plan = calculator.travel_plan()
+        assert plan.speed == 0
+        assert plan.arrival_time == pytest.approx(1.4)
+
+        now = 5.0
+        assert not calculator.update_position()
+        assert calculator.current_tilt() == 30
+        assert calculator.current_position() == 40
+        # Turning the slats adds nothing to the position error.
+        assert calculator.uncertainty == 0
+
+    def test_stop_while_tilting(self):
+        """Test that stopping keeps the slats where they are."""
+        now = 0.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now, tilt_time=2)
+        calculator.start_tilt(0)
+        now = 1.5
+        calculator.stop_travel()
+        assert calculator.current_tilt() == 25
+        assert calculator.current_position() == 100
+        now = 3.0
+        assert calculator.estimated_tilt() == pytest.approx(25)
+
+    def test_finish_travel_sets_tilt(self):
+        """Test that arriving on the timer also ends the turn of the slats."""
+        now = 0.0
+        calculator = TravelCalculator(10, 10, clock=lambda: now, tilt_time=2)
+        calculator.start_tilt(60)
+        assert calculator.finish_travel() == 100
+        assert calculator.current_tilt() == 60
+        assert calculator.current_position() == 100
@@ -0,0 +1,56 @@
+"""Test the RF Cover Time Based websocket API."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.cover import DOMAIN as COVER_DOMAIN
+from homeassistant.components.cover import SERVICE_CLOSE_COVER
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_registry import async_get
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.rf_cover_time_based.const import DOMAIN
+from tests.const import MOCK_CONFIG
+
+
+async def test_subscribe_motion(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    init_integration: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that position frames are streamed while the cover moves."""
+    entity_id = async_get(hass).async_get_entity_id(
+        COVER_DOMAIN, DOMAIN, init_integration.entry_id
+    )
+    hass.states.async_set(MOCK_CONFIG["remote_entity"], "on")
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {
+            "type": f"{DOMAIN}/subscribe_motion",
+            "entity_ids": [entity_id],
+            "interval": 0.5,
+        }
+    )
+    result = await client.receive_json()
+    assert result["success"]
+
+    # The current frame of every subscribed cover is sent right away.
+    event = await client.receive_json(timeout=2)
+    assert event["event"] == {"frames": {entity_id: [100, "s"]}}
+
+    await hass.services.async_call(
+        COVER_DOMAIN, SERVICE_CLOSE_COVER, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    freezer.tick(timedelta(seconds=0.5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    event = await client.receive_json(timeout=2)
+    assert event["event"] == {"frames": {entity_id: [95, "c"]}}